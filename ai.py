@@ -0,0 +1,23 @@
+"""
+Thin `ai` entry point: `python ai.py ...` behaves like `python main.py ...`,
+but asks a running `ai daemon` first, before Typer or anything else heavy
+is imported.
+"""
+
+import sys
+
+import daemon
+
+
+def run() -> None:
+    exit_code = daemon.forward(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+    from main import app
+
+    app(prog_name="ai")
+
+
+if __name__ == "__main__":
+    run()
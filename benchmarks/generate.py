@@ -0,0 +1,152 @@
+"""
+Seeded synthetic data for benchmarks: N years of workouts, guitar sessions,
+other activities, notes, tags and goals, ending today.
+
+    FORGELOG_DB=/tmp/bench.sqlite python -m benchmarks.generate --years 3
+"""
+
+import argparse
+import random
+from datetime import datetime, time, timedelta, timezone
+from typing import Any, Iterator
+
+from sqlalchemy.orm import Session
+
+from config import GuitarFocus
+from model import Goal
+
+WORKOUT_METRICS = {
+    "pushups": (10, 60, "rep"),
+    "pullups": (3, 20, "rep"),
+    "dips": (5, 40, "rep"),
+    "rows": (10, 50, "rep"),
+    "situps": (10, 80, "rep"),
+    "squats": (10, 100, "rep"),
+    "planks": (30, 240, "sec"),
+}
+ACTIVITIES = ["reading", "running", "gaming", "walking", "cooking", "meditation"]
+TAGS = ["home", "gym", "outdoors", "travel", "morning", "evening", "sick", "pr"]
+NOTE_WORDS = (
+    "felt strong tired slow easy hard great focus tempo chords scale song "
+    "improvised practiced learned rested sore fresh tempo metronome riff"
+).split()
+
+
+def generate_records(
+    years: float, *, seed: int = 42, today: datetime | None = None
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield event records (the shape services.events.bulk_log_events takes)
+    in timestamp order, about 2-4 per day.
+    """
+    rng = random.Random(seed)
+    today = (today or datetime.now(timezone.utc)).date()
+    days = max(int(years * 365), 1)
+
+    for offset in range(days - 1, -1, -1):
+        day = today - timedelta(days=offset)
+        day_events = []
+
+        if rng.random() < 0.7:
+            chosen = rng.sample(sorted(WORKOUT_METRICS), rng.randint(2, 5))
+            day_events.append(
+                {
+                    "type": "workout",
+                    "title": f"workout {day.strftime('%d-%m-%Y')}",
+                    "metrics": [
+                        {
+                            "name": name,
+                            "value": float(rng.randint(*WORKOUT_METRICS[name][:2])),
+                            "unit": WORKOUT_METRICS[name][2],
+                        }
+                        for name in chosen
+                    ],
+                }
+            )
+        if rng.random() < 0.6:
+            focus = rng.choice(list(GuitarFocus))
+            day_events.append(
+                {
+                    "type": "guitar",
+                    "title": f"guitar {day.strftime('%d-%m-%Y')}",
+                    "metrics": [
+                        {
+                            "name": f"guitar_{focus.value}",
+                            "value": round(rng.uniform(10, 90), 2),
+                            "unit": "min",
+                        }
+                    ],
+                }
+            )
+        for _ in range(rng.choice([0, 0, 1, 1, 2])):
+            name = rng.choice(ACTIVITIES)
+            day_events.append(
+                {
+                    "type": "activity",
+                    "title": f"{name} {day.strftime('%d-%m-%Y')}",
+                    "metrics": [{"name": name, "value": round(rng.uniform(5, 120), 2)}],
+                }
+            )
+        if rng.random() < 0.15:
+            day_events.append(
+                {"type": "note", "title": f"note {day.strftime('%d-%m-%Y')}"}
+            )
+
+        seconds = sorted(rng.sample(range(6 * 3600, 23 * 3600), len(day_events)))
+        for event, second in zip(day_events, seconds):
+            event["timestamp"] = datetime.combine(day, time()) + timedelta(
+                seconds=second
+            )
+            if rng.random() < 0.5:
+                event["notes"] = " ".join(rng.choices(NOTE_WORDS, k=rng.randint(3, 15)))
+            if rng.random() < 0.4:
+                event["tags"] = rng.sample(TAGS, rng.randint(1, 2))
+            event.setdefault("metrics", [])
+            yield event
+
+
+def generate_goals() -> list[Goal]:
+    return [
+        Goal(name="Pushups", metric_name="pushups", period="weekly", target_value=200),
+        Goal(name="Squats", metric_name="squats", period="weekly", target_value=300),
+        Goal(
+            name="Daily song",
+            metric_name="guitar_song",
+            period="daily",
+            target_value=20,
+        ),
+        Goal(
+            name="Scales", metric_name="guitar_scale", period="weekly", target_value=120
+        ),
+        Goal(name="Reading", metric_name="reading", period="monthly", target_value=600),
+        Goal(name="Running", metric_name="running", period="monthly", target_value=400),
+    ]
+
+
+def populate(session: Session, years: float, *, seed: int = 42) -> int:
+    """
+    Fill the database behind `session`; returns the number of events.
+    """
+    from services import events
+
+    count = events.bulk_log_events(session, generate_records(years, seed=seed))
+    session.add_all(generate_goals())
+    session.commit()
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Fill FORGELOG_DB with synthetic data."
+    )
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    import db
+    import migrations
+
+    migrations.migrate(db.get_engine())
+    with Session(db.get_engine()) as session:
+        n = populate(session, args.years, seed=args.seed)
+    print(f"Generated {n} events over {args.years} years")
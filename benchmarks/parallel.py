@@ -0,0 +1,97 @@
+"""
+Scaling of partitioned report generation (services.summarize.split_range)
+across worker processes.
+
+Fills a temporary database with `--years` of seeded events, then times
+splitting the whole span into chunks in-process and with each worker count:
+
+    python -m benchmarks.parallel --years 10 --workers 1,2,4,8
+
+Speedups are relative to the in-process run; expect none on a single core,
+where the pool only adds its start-up cost.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+def run(years: float, seed: int, repeat: int, workers: list[int]) -> dict:
+    from datetime import timedelta
+
+    from sqlalchemy.orm import Session
+
+    import db
+    import migrations
+    from benchmarks.generate import populate
+    from benchmarks.run import measure
+    from config import today_local
+    from services import events, summarize
+
+    engine = db.get_engine()
+    migrations.migrate(engine)
+    with Session(engine) as session:
+        n_events = populate(session, years, seed=seed)
+
+    end = today_local()
+    start = end - timedelta(days=round(years * 365))
+    report = {"events": n_events, "cpus": os.cpu_count(), "results": {}}
+    for granularity in summarize.GRANULARITIES:
+
+        def serial():
+            with Session(db.get_read_engine()) as session:
+                return summarize.split_events(
+                    events.iter_event_dicts_by_date(session, start, end), granularity
+                )
+
+        expected = serial()
+        results = {"in-process": measure(serial, repeat=repeat)}
+        for n in workers:
+            chunks = summarize.split_range(start, end, granularity, workers=n)
+            if chunks != expected:
+                raise AssertionError(f"{n} workers changed the {granularity} chunks")
+            results[f"{n} workers"] = measure(
+                lambda: summarize.split_range(start, end, granularity, workers=n),
+                repeat=repeat,
+            )
+        baseline = results["in-process"]["median_ms"]
+        for result in results.values():
+            result["speedup"] = round(baseline / result["median_ms"], 2)
+        report["results"][granularity] = results
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark parallel report splits.")
+    parser.add_argument("--years", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--workers", default="1,2,4", help="comma separated worker counts"
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON results.")
+    args = parser.parse_args()
+    workers = [int(n) for n in args.workers.split(",")]
+
+    with tempfile.TemporaryDirectory(prefix="forgelog-parallel-") as tmp:
+        # config reads FORGELOG_DB at import time, so set it before importing
+        os.environ["FORGELOG_DB"] = str(Path(tmp) / "parallel.sqlite")
+        report = run(args.years, args.seed, args.repeat, workers)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['events']} events, {report['cpus']} CPUs")
+    for granularity, results in report["results"].items():
+        print(f"  {granularity} chunks")
+        for name, result in results.items():
+            print(
+                f"    {name:<12} {result['median_ms']:>8.1f} ms "
+                f"(x{result['speedup']:.2f})"
+            )
+
+
+if __name__ == "__main__":
+    main()
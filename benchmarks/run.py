@@ -0,0 +1,355 @@
+"""
+Benchmarks for the log, select, serialize and analytics hot paths.
+
+Each data size runs in a fresh interpreter against its own temporary
+database filled by benchmarks.generate, so engines and caches never leak
+between sizes. Results are written as JSON and can be compared against a
+stored baseline:
+
+    python -m benchmarks.run --years 0.25,1,3 --output bench.json
+    python -m benchmarks.run --save-baseline            # -> benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.25
+
+The comparison exits non-zero when any median is slower than the baseline
+by more than the threshold. The committed baseline.json records the machine
+it was measured on under "meta"; timings from another machine are only
+comparable after re-saving it there. It was recorded with the optional
+orjson JSON backend ("json_backend" in "meta"); without orjson installed
+the serialize.* timings fall back to the stdlib json module and are not
+comparable either.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+
+def measure(fn: Callable[[], Any], *, repeat: int = 5) -> dict[str, float]:
+    fn()  # warm-up: statement cache, mapper configuration, page cache
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+    }
+
+
+####################
+##### ONE SIZE #####
+####################
+
+
+def run_size(years: float, seed: int, repeat: int) -> dict[str, Any]:
+    """
+    Benchmark one data size. Must run in a process whose FORGELOG_DB points
+    at an empty temporary database (see `main`).
+    """
+    import io
+
+    from sqlalchemy.orm import Session
+
+    import db
+    import migrations
+    import serialization_helpers as sh
+    import serializers
+    from benchmarks.generate import populate
+    from config import EventTypes, GuitarFocus, TimeRange
+    from services import analytics, events, goals, range_cache, search
+
+    engine = db.get_engine()
+    migrations.migrate(engine)
+    results: dict[str, dict[str, float]] = {}
+    checks: dict[str, bool] = {}
+
+    started = time.perf_counter()
+    with Session(engine) as session:
+        n_events = populate(session, years, seed=seed)
+    elapsed = round((time.perf_counter() - started) * 1000, 3)
+    results["generate.bulk_log_events"] = {"median_ms": elapsed, "min_ms": elapsed}
+
+    with Session(engine) as session:
+        results["log.workout"] = measure(
+            lambda: events.log_workout(
+                session,
+                dips=10,
+                planks=60,
+                pushups=20,
+                pullups=5,
+                rows=None,
+                situps=None,
+                squats=30,
+                notes="bench",
+            ),
+            repeat=repeat,
+        )
+        results["log.guitar"] = measure(
+            lambda: events.log_guitar(session, GuitarFocus.SONG, 20.0, None),
+            repeat=repeat,
+        )
+        results["log.activity"] = measure(
+            lambda: events.log_activity(session, "reading", 30.0, None),
+            repeat=repeat,
+        )
+
+    with Session(db.get_read_engine()) as session:
+        for time_range in TimeRange:
+            name = time_range.name.lower()
+            results[f"select.orm.{name}"] = measure(
+                lambda: (
+                    events.select_events_between(session, time_range),
+                    session.expunge_all(),
+                ),
+                repeat=repeat,
+            )
+            results[f"select.core.{name}"] = measure(
+                lambda: events.select_event_dicts_between(session, time_range),
+                repeat=repeat,
+            )
+            results[f"analytics.{name}"] = measure(
+                lambda: analytics.analyze_range(session, time_range),
+                repeat=repeat,
+            )
+        results["goals.evaluate"] = measure(
+            lambda: goals.evaluate_goals(session), repeat=repeat
+        )
+        results["search.word"] = measure(
+            lambda: search.search_events(session, "strong"), repeat=repeat
+        )
+        results["search.phrase_filtered"] = measure(
+            lambda: search.search_events(
+                session, '"felt strong"', types=[EventTypes.WORKOUT], tag="gym"
+            ),
+            repeat=repeat,
+        )
+
+        year = events.select_event_dicts_between(session, TimeRange.YEAR)
+        with Session(db.get_cache_engine()) as cache:
+
+            def cached_year():
+                return list(
+                    range_cache.iter_cached_event_dicts_between(
+                        session, cache, TimeRange.YEAR
+                    )
+                )
+
+            def today_changed():
+                # a write elsewhere invalidates only today's cached day
+                with Session(engine) as writer:
+                    range_cache.touch_days(writer, [events.get_range_bounds(1)[1]])
+                    writer.commit()
+                return cached_year()
+
+            results["range_cache.year.warm"] = measure(cached_year, repeat=repeat)
+            results["range_cache.year.today_changed"] = measure(
+                today_changed, repeat=repeat
+            )
+            checks["range_cache.parity"] = cached_year() == year
+        results["serialize.json"] = measure(
+            lambda: sh.format_events_as_json(year), repeat=repeat
+        )
+        results["serialize.compact"] = measure(
+            lambda: sh.format_events_as_compact_json(year), repeat=repeat
+        )
+        results["serialize.msgpack"] = measure(
+            lambda: sh.write_events_as_msgpack(
+                year, io.BytesIO(), event_count=len(year)
+            ),
+            repeat=repeat,
+        )
+        results["export.stream_json.year"] = measure(
+            lambda: sh.write_events_range_as_json(
+                session, TimeRange.YEAR, io.StringIO()
+            ),
+            repeat=repeat,
+        )
+
+    # both JSON backends must produce the same documents
+    checks["serializers.json_parity"] = _backends_agree(
+        lambda: serializers.dumps(year, indent=True)
+    )
+    checks["serializers.compact_parity"] = _backends_agree(
+        lambda: sh.format_events_as_compact_json(year)
+    )
+    checks["serializers.msgpack_roundtrip"] = serializers.unpackb(
+        serializers.packb(year[:100])
+    ) == serializers.loads(serializers.dumps(year[:100]))
+
+    return {
+        "years": years,
+        "events": n_events,
+        "year_events": len(year),
+        "results": results,
+        "checks": checks,
+    }
+
+
+def _backends_agree(render: Callable[[], str]) -> bool:
+    import serializers
+
+    if serializers.orjson is None:
+        return True
+    native = render()
+    backend, serializers.orjson = serializers.orjson, None
+    try:
+        return render() == native
+    finally:
+        serializers.orjson = backend
+
+
+##################
+##### DRIVER #####
+##################
+
+
+def run_isolated(years: float, seed: int, repeat: int) -> dict[str, Any]:
+    """
+    Run `run_size` in a child interpreter against a throwaway database.
+    """
+    with tempfile.TemporaryDirectory(prefix="forgelog-bench-") as tmp:
+        env = dict(os.environ)
+        env["FORGELOG_DB"] = str(Path(tmp) / "bench.sqlite")
+        env["FORGELOG_CACHE_DB"] = str(Path(tmp) / "bench.cache.sqlite")
+        proc = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.run",
+                "--child",
+                "--years",
+                str(years),
+                "--seed",
+                str(seed),
+                "--repeat",
+                str(repeat),
+            ],
+            cwd=REPO_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"benchmark for {years} years failed")
+    return json.loads(proc.stdout)
+
+
+def compare(
+    report: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """
+    Return one line per benchmark whose median regressed past `threshold`.
+    """
+    regressions = []
+    previous = {run["years"]: run["results"] for run in baseline["runs"]}
+    for run in report["runs"]:
+        for name, result in run["results"].items():
+            old = previous.get(run["years"], {}).get(name)
+            if old is None or old["median_ms"] <= 0:
+                continue
+            change = result["median_ms"] / old["median_ms"] - 1
+            if change > threshold:
+                regressions.append(
+                    f"{run['years']}y {name}: {old['median_ms']:.2f} -> "
+                    f"{result['median_ms']:.2f} ms (+{change:.0%})"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the ForgeLog benchmarks.")
+    parser.add_argument(
+        "--years", default="0.25,1,3", help="comma separated data sizes in years"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    parser.add_argument("--baseline", type=Path, help="compare against this report")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed median slowdown vs the baseline (0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help=f"write the report to {DEFAULT_BASELINE.relative_to(REPO_ROOT)}",
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # keep stdout for the report; anything the code under test prints
+        # goes to stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            run = run_size(float(args.years), args.seed, args.repeat)
+        print(json.dumps(run))
+        return
+
+    import serializers
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "json_backend": serializers.JSON_BACKEND,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "runs": [],
+    }
+    for years in (float(y) for y in args.years.split(",")):
+        run = run_isolated(years, args.seed, args.repeat)
+        report["runs"].append(run)
+        print(f"{years:g} years, {run['events']} events", file=sys.stderr)
+        for name, result in run["results"].items():
+            print(
+                f"  {name:<28} {result['median_ms']:>10.2f} ms "
+                f"(min {result['min_ms']:.2f})",
+                file=sys.stderr,
+            )
+        for name, ok in run["checks"].items():
+            print(f"  {name:<28} {'ok' if ok else 'FAILED'}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    if args.save_baseline:
+        DEFAULT_BASELINE.write_text(text + "\n")
+    if not args.output and not args.save_baseline:
+        print(text)
+
+    failed = [
+        f"{run['years']}y {name}"
+        for run in report["runs"]
+        for name, ok in run["checks"].items()
+        if not ok
+    ]
+    if args.baseline:
+        failed += compare(report, json.loads(args.baseline.read_text()), args.threshold)
+    if failed:
+        print("Regressions:", file=sys.stderr)
+        for line in failed:
+            print(f"  {line}", file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Full-text search latency on a large journal.
+
+Fills a temporary database with `--events` seeded events whose notes draw
+from a Zipf-distributed vocabulary (a few very common words, a long tail
+of rare ones, like real writing), then times services.search queries:
+
+    python -m benchmarks.search --events 100000
+
+Exits non-zero with --check when any median exceeds --budget-ms.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from collections import deque
+from pathlib import Path
+
+VOCABULARY_SIZE = 5000
+
+QUERIES = {
+    "common word": ("w0", {}),
+    "mid-frequency word": ("w40", {}),
+    "rare word": ("w3000", {}),
+    "two words": ("w3 w17", {}),
+    "prefix": ("w12*", {}),
+    "phrase": ('"w1 w2"', {}),
+    "common word, type filter": ("w0", {"types": "workout"}),
+    "common word, tag filter": ("w0", {"tag": "gym"}),
+    "common word, last 30 days": ("w0", {"days": 30}),
+    "rare word, last year": ("w3000", {"days": 365}),
+    "common word, page 5": ("w0", {"page": 5}),
+}
+
+
+def run(n_events: int, seed: int, repeat: int) -> dict:
+    from datetime import timedelta
+
+    from sqlalchemy.orm import Session
+
+    import db
+    import migrations
+    from benchmarks.generate import generate_records
+    from benchmarks.run import measure
+    from config import EventTypes, today_local
+    from services import events, search
+
+    engine = db.get_engine()
+    migrations.migrate(engine)
+
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY_SIZE)]
+
+    def records():
+        # generate_records yields roughly 820 events per year; keep the most
+        # recent n_events so the data ends today like a real journal
+        generated = deque(generate_records(n_events / 700, seed=seed), n_events)
+        for record in generated:
+            words = rng.choices(range(VOCABULARY_SIZE), weights=weights, k=12)
+            record["notes"] = " ".join(f"w{word}" for word in words)
+            yield record
+
+    with Session(engine) as session:
+        inserted = events.bulk_log_events(session, records())
+        search.rebuild_search_index(session)
+        session.commit()
+
+    results = {}
+    with Session(db.get_read_engine()) as session:
+        for name, (query, options) in QUERIES.items():
+            kwargs = {
+                "types": [EventTypes(options["types"])] if "types" in options else (),
+                "tag": options.get("tag"),
+                "page": options.get("page", 1),
+            }
+            if "days" in options:
+                kwargs["start"] = today_local() - timedelta(days=options["days"])
+            results[name] = measure(
+                lambda: search.search_events(session, query, **kwargs), repeat=repeat
+            )
+            results[name]["hits"] = len(
+                search.search_events(session, query, **kwargs).hits
+            )
+    return {"events": inserted, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark full-text search.")
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=10.0)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--json", action="store_true", help="Print JSON results.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="forgelog-search-") as tmp:
+        # config reads FORGELOG_DB at import time, so set it before importing
+        os.environ["FORGELOG_DB"] = str(Path(tmp) / "search.sqlite")
+        report = run(args.events, args.seed, args.repeat)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['events']} events")
+        for name, result in report["results"].items():
+            print(
+                f"  {name:<28} {result['median_ms']:>7.2f} ms "
+                f"(min {result['min_ms']:.2f})"
+            )
+    slow = [
+        name
+        for name, result in report["results"].items()
+        if result["median_ms"] > args.budget_ms
+    ]
+    if args.check and slow:
+        print(f"Over {args.budget_ms} ms: {', '.join(slow)}", file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
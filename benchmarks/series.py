@@ -0,0 +1,156 @@
+"""
+Dense metric storage: the same samples logged as EventMetric rows and as
+one EventMetricSeries blob per event, each in its own temporary database.
+
+    python -m benchmarks.series --samples 200000 --per-event 3600
+
+Reports database bytes per sample and the time to rebuild the rollups and
+to read the events back as dicts.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+def run(layout: str, samples: int, per_event: int, seed: int, repeat: int) -> dict:
+    """
+    Fill the database named by FORGELOG_DB with `samples` heart-rate samples
+    stored as `layout` ("rows" or "series") and time the read paths.
+    """
+    from datetime import timedelta
+
+    from sqlalchemy import text
+    from sqlalchemy.orm import Session
+
+    import db
+    import migrations
+    from benchmarks.run import measure
+    from config import EventTypes, TimeRange, get_date
+    from services import events, rollups
+
+    engine = db.get_engine()
+    migrations.migrate(engine)
+    with engine.connect() as conn:
+        empty_pages = conn.exec_driver_sql("PRAGMA page_count").scalar()
+
+    rng = random.Random(seed)
+    start = get_date().replace(tzinfo=None) - timedelta(hours=1)
+    records = []
+    for first in range(0, samples, per_event):
+        values = [
+            round(rng.gauss(140, 12), 1) for _ in range(min(per_event, samples - first))
+        ]
+        record = {"type": EventTypes.WORKOUT, "timestamp": start, "title": "run"}
+        if layout == "series":
+            record["series"] = [
+                {
+                    "name": "heart_rate",
+                    "unit": "bpm",
+                    "interval_s": 1.0,
+                    "values": values,
+                }
+            ]
+        else:
+            record["metrics"] = [
+                {"name": "heart_rate", "value": v, "unit": "bpm"} for v in values
+            ]
+        records.append(record)
+    with Session(engine) as session:
+        events.bulk_log_events(session, records)
+
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.exec_driver_sql("VACUUM")
+        page_size = conn.exec_driver_sql("PRAGMA page_size").scalar()
+        pages = conn.exec_driver_sql("PRAGMA page_count").scalar() - empty_pages
+        heart_rate = conn.execute(
+            text(
+                "SELECT sum(count), round(sum(sum), 1) FROM daily_metric_rollup "
+                "WHERE metric_name = 'heart_rate'"
+            )
+        ).one()
+
+    with Session(engine) as session:
+        rebuild = measure(
+            lambda: (rollups.rebuild_rollups(session), session.rollback()),
+            repeat=repeat,
+        )
+    with Session(db.get_read_engine()) as session:
+        read = measure(
+            lambda: events.select_event_dicts_between(session, TimeRange.TODAY),
+            repeat=repeat,
+        )
+    return {
+        "layout": layout,
+        "bytes": pages * page_size,
+        "bytes_per_sample": round(pages * page_size / samples, 2),
+        "rollup": list(heart_rate),
+        "results": {"rollups.rebuild": rebuild, "select.core.today": read},
+    }
+
+
+def run_isolated(layout: str, args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory(prefix="forgelog-series-") as tmp:
+        env = dict(os.environ)
+        env["FORGELOG_DB"] = str(Path(tmp) / "series.sqlite")
+        command = [
+            sys.executable,
+            "-m",
+            "benchmarks.series",
+            "--child",
+            layout,
+            "--samples",
+            str(args.samples),
+            "--per-event",
+            str(args.per_event),
+            "--seed",
+            str(args.seed),
+            "--repeat",
+            str(args.repeat),
+        ]
+        output = subprocess.run(
+            command, env=env, check=True, capture_output=True, text=True
+        ).stdout
+    return json.loads(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark dense metric storage.")
+    parser.add_argument("--samples", type=int, default=200_000)
+    parser.add_argument("--per-event", type=int, default=3600)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print JSON results.")
+    parser.add_argument("--child", choices=["rows", "series"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        report = run(args.child, args.samples, args.per_event, args.seed, args.repeat)
+        print(json.dumps(report))
+        return
+
+    reports = [run_isolated(layout, args) for layout in ("rows", "series")]
+    if reports[0]["rollup"] != reports[1]["rollup"]:
+        raise AssertionError(f"rollups differ: {[r['rollup'] for r in reports]}")
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+    print(f"{args.samples} samples, {args.per_event} per event")
+    for report in reports:
+        results = report["results"]
+        print(
+            f"  {report['layout']:<7} {report['bytes'] / 1e6:>8.2f} MB "
+            f"({report['bytes_per_sample']:>6.2f} B/sample)  "
+            f"rebuild rollups {results['rollups.rebuild']['median_ms']:>8.1f} ms  "
+            f"read today {results['select.core.today']['median_ms']:>8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
+import os
 from enum import Enum
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 
 # --------------------
@@ -28,6 +30,10 @@ class TimeRangeStr(str, Enum):
     year = "year"
 
 
+def to_time_range(value: TimeRangeStr) -> TimeRange:
+    return TimeRange[value.name.upper()]
+
+
 class GuitarFocus(Enum):
     COURSE = "course"
     SCALE = "scale"
@@ -36,8 +42,140 @@ class GuitarFocus(Enum):
     THEORY = "theory"
 
 
-sqlite_engine_uri = "sqlite:///forgelog.sqlite"
+# Absolute, so a long-lived process (ai daemon) is unaffected by its cwd.
+sqlite_path = os.path.abspath(os.environ.get("FORGELOG_DB", "forgelog.sqlite"))
+sqlite_engine_uri = f"sqlite:///{sqlite_path}"
+sqlite_readonly_uri = f"sqlite:///file:{sqlite_path}?mode=ro&uri=true"
+# asyncio (aiosqlite) equivalents, see db.get_async_engine
+sqlite_async_engine_uri = f"sqlite+aiosqlite:///{sqlite_path}"
+sqlite_async_readonly_uri = f"sqlite+aiosqlite:///file:{sqlite_path}?mode=ro&uri=true"
+
+
+# --------------------
+# Engine profiles
+# --------------------
+# PRAGMAs applied to every new SQLite connection, per profile.
+#   durable  - WAL + synchronous=FULL: every commit survives power loss
+#   fast     - WAL + synchronous=NORMAL: commits survive app crashes; the last
+#              few may be lost on power loss. No fsync per `ai log ...`.
+#   readonly - opened through a mode=ro URI for query commands; never blocks
+#              (or is blocked by) writers under WAL.
+ENGINE_PROFILES: dict[str, dict[str, str | int]] = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16_000,  # KiB
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5_000,  # ms
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64_000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5_000,
+    },
+    "readonly": {
+        "query_only": "ON",
+        "cache_size": -64_000,
+        "mmap_size": 1024 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5_000,
+    },
+}
+
+# Profile used by commands that write.
+engine_profile = os.environ.get("FORGELOG_ENGINE_PROFILE", "fast")
+
+# Disposable caches (LLM responses, ...) live in their own database file so
+# query commands can use them without write access to the main database.
+cache_path = os.path.abspath(
+    os.environ.get(
+        "FORGELOG_CACHE_DB", os.path.splitext(sqlite_path)[0] + ".cache.sqlite"
+    )
+)
+cache_engine_uri = f"sqlite:///{cache_path}"
+
+
+# --------------------
+# LLM (local ollama)
+# --------------------
+ollama_host = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
+llm_model = os.environ.get("FORGELOG_LLM_MODEL", "llama3.2")
+llm_timeout_s = float(os.environ.get("FORGELOG_LLM_TIMEOUT", "300"))
+# Concurrent requests while summarizing chunks of a long range.
+llm_concurrency = int(os.environ.get("FORGELOG_LLM_CONCURRENCY", "2"))
+
+# Response cache eviction: entries older than the max age go first, then the
+# least recently used until the cache fits in the byte budget.
+llm_cache_max_age_days = int(os.environ.get("FORGELOG_LLM_CACHE_MAX_AGE_DAYS", "90"))
+llm_cache_max_bytes = int(os.environ.get("FORGELOG_LLM_CACHE_MAX_BYTES", "50000000"))
+
+# Per-day range result cache (services.range_cache): least recently used
+# days are evicted beyond this many bytes.
+range_cache_max_bytes = int(
+    os.environ.get("FORGELOG_RANGE_CACHE_MAX_BYTES", "100000000")
+)
+
+# Unix socket of the optional `ai daemon`, in a directory only this user can
+# write to: $XDG_RUNTIME_DIR, or a per-user 0700 directory under /tmp.
+daemon_socket_path = os.environ.get(
+    "FORGELOG_SOCKET",
+    os.path.join(
+        os.environ.get("XDG_RUNTIME_DIR") or f"/tmp/forgelog-{os.getuid()}",
+        "forgelog.sock",
+    ),
+)
+
+# `ai search` ranks results by relevance (bm25) up to this many matches;
+# broader queries are listed most recently added first, which stays fast at
+# any size.
+search_rank_limit = int(os.environ.get("FORGELOG_SEARCH_RANK_LIMIT", "1000"))
+
+# Rows per transaction for `ai import`.
+import_batch_size = int(os.environ.get("FORGELOG_IMPORT_BATCH_SIZE", "1000"))
+
+
+# --------------------
+# timezone
+# --------------------
+# Timestamps are stored in UTC; "today", ranges, rollups and goals use the
+# user's local calendar days. Every event stores its local_date at insert,
+# so after changing the timezone run `ai db rebuild-local-dates`.
+
+
+def _detect_timezone() -> ZoneInfo:
+    candidates = [os.environ.get("FORGELOG_TZ"), os.environ.get("TZ")]
+    if os.path.islink("/etc/localtime"):
+        target = os.path.realpath("/etc/localtime")
+        candidates.append(target.partition("/zoneinfo/")[2])
+    for name in candidates:
+        if not name:
+            continue
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            continue
+    return ZoneInfo("UTC")
+
+
+user_timezone = _detect_timezone()
 
 
 def get_date() -> datetime:
     return datetime.now(timezone.utc)
+
+
+def to_local(timestamp: datetime) -> datetime:
+    """
+    Convert a stored timestamp (naive means UTC) to the user's timezone.
+    """
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(user_timezone)
+
+
+def today_local() -> date:
+    return datetime.now(user_timezone).date()
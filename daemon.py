@@ -0,0 +1,246 @@
+"""
+Optional long-lived `ai daemon` that keeps a warm process (imports, engine,
+mapper configuration, statement cache) behind a Unix socket.
+
+The client half only uses the standard library so forwarding a command
+costs no more than starting the interpreter; when no daemon answers, the
+CLI simply runs the command in-process.
+"""
+
+import contextlib
+import http.client
+import io
+import json
+import os
+import socket
+import stat
+import sys
+import time
+import traceback
+
+import config
+
+# Never forwarded: daemon management itself, anything that reads stdin or
+# needs a terminal, and startup profiling (which must run in a fresh process).
+LOCAL_COMMANDS = {"daemon", "dashboard"}
+LOCAL_FLAGS = {"--session", "-s", "--profile-startup"}
+
+CLIENT_TIMEOUT = 300.0
+
+
+##################
+##### CLIENT #####
+##################
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+def request(
+    path: str,
+    payload: dict | None = None,
+    *,
+    socket_path: str = config.daemon_socket_path,
+    timeout: float = CLIENT_TIMEOUT,
+) -> tuple[int, dict] | None:
+    """
+    POST `payload` to the daemon. Returns (status, json body), or None when
+    no daemon is listening.
+    """
+    if not _is_own_socket(socket_path):
+        return None
+    conn = _UnixHTTPConnection(socket_path, timeout)
+    try:
+        conn.request(
+            "POST",
+            path,
+            body=json.dumps(payload or {}),
+            headers={"Content-Type": "application/json"},
+        )
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or b"{}")
+    except (OSError, ValueError):
+        return None
+    finally:
+        conn.close()
+
+
+def _is_own_socket(path: str) -> bool:
+    """
+    True when `path` is a socket (not a symlink) that belongs to this user;
+    anything else at the path is never talked to or removed.
+    """
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+
+def forward(argv: list[str]) -> int | None:
+    """
+    Run `argv` on the daemon and replay its output. Returns the exit code,
+    or None if the command must (or can only) run in-process.
+    """
+    if not argv or argv[0] in LOCAL_COMMANDS or LOCAL_FLAGS.intersection(argv):
+        return None
+    reply = request(
+        "/run",
+        {"argv": argv, "cwd": os.getcwd(), "db": config.sqlite_path},
+    )
+    if reply is None or reply[0] != 200:
+        return None
+    result = reply[1]
+    sys.stdout.write(result["stdout"])
+    sys.stderr.write(result["stderr"])
+    return result["exit_code"]
+
+
+##################
+##### SERVER #####
+##################
+
+
+def _run_cli(argv: list[str], cwd: str) -> dict:
+    """
+    Run one CLI invocation inside the daemon, capturing its output.
+    Invocations are serialized by the caller: cwd and stdio are process-wide.
+    """
+    from main import app
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    previous_cwd = os.getcwd()
+    exit_code = 0
+    try:
+        os.chdir(cwd)
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                app(argv, prog_name="ai")
+            except SystemExit as exc:
+                code = exc.code
+                if code is None or isinstance(code, int):
+                    exit_code = code or 0
+                else:
+                    exit_code = 1
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+    finally:
+        os.chdir(previous_cwd)
+    return {
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+        "exit_code": exit_code,
+    }
+
+
+def _prepare_socket_dir(directory: str) -> None:
+    """
+    Create the socket's directory (0700) if needed, and refuse one another
+    user could swap the socket in: it must belong to this user or root, and
+    be writable by nobody else unless sticky (like /tmp).
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.stat(directory)
+    shared = st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    if st.st_uid not in (os.getuid(), 0) or (shared and not st.st_mode & stat.S_ISVTX):
+        raise RuntimeError(
+            f"{directory} is not private to this user; set FORGELOG_SOCKET "
+            "to a path in a directory you own"
+        )
+
+
+def serve(socket_path: str = config.daemon_socket_path) -> None:
+    """
+    Run the daemon in the foreground until `ai daemon stop` (or Ctrl-C).
+    """
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    from aiohttp import web
+
+    _prepare_socket_dir(os.path.dirname(os.path.abspath(socket_path)))
+    if request("/status", socket_path=socket_path, timeout=2.0) is not None:
+        raise RuntimeError(f"A daemon is already listening on {socket_path}")
+    if os.path.lexists(socket_path):
+        if not _is_own_socket(socket_path):
+            raise RuntimeError(
+                f"{socket_path} exists and is not this user's socket; "
+                "remove it or set FORGELOG_SOCKET"
+            )
+        os.unlink(socket_path)
+
+    # Warm up in the worker thread that will run every command: imports,
+    # engine, migrations and mapper configuration.
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="forgelog-cli")
+    executor.submit(_run_cli, ["db", "migrate"], os.getcwd()).result()
+
+    started = time.time()
+    stats = {"commands": 0}
+
+    async def run(req: web.Request) -> web.Response:
+        payload = await req.json()
+        if payload.get("db") != config.sqlite_path:
+            return web.json_response(
+                {"error": f"daemon serves {config.sqlite_path}"}, status=409
+            )
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            executor, _run_cli, payload["argv"], payload["cwd"]
+        )
+        stats["commands"] += 1
+        return web.json_response(result)
+
+    async def status(_req: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "pid": os.getpid(),
+                "db": config.sqlite_path,
+                "socket": socket_path,
+                "uptime_s": round(time.time() - started, 1),
+                "commands": stats["commands"],
+            }
+        )
+
+    async def shutdown(_req: web.Request) -> web.Response:
+        stop.set()
+        return web.json_response({"stopping": True})
+
+    async def main() -> None:
+        app = web.Application()
+        app.router.add_post("/run", run)
+        app.router.add_post("/status", status)
+        app.router.add_post("/shutdown", shutdown)
+        runner = web.AppRunner(app, handle_signals=True)
+        await runner.setup()
+        # created 0600 by bind itself, never briefly open to other users
+        previous_umask = os.umask(0o077)
+        try:
+            await web.UnixSite(runner, socket_path).start()
+        finally:
+            os.umask(previous_umask)
+        bound = os.lstat(socket_path).st_ino
+        try:
+            await stop.wait()
+        finally:
+            await runner.cleanup()
+            # unless a newer daemon has already replaced it
+            with contextlib.suppress(FileNotFoundError):
+                if os.lstat(socket_path).st_ino == bound:
+                    os.unlink(socket_path)
+
+    stop = asyncio.Event()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown()
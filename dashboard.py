@@ -0,0 +1,365 @@
+"""
+`ai dashboard`: a Textual view of today's events, this week's metric totals
+and goal progress that refreshes itself as events are logged.
+
+The aggregates are loaded once and then kept in memory. Each poll asks
+SQLite for `PRAGMA data_version`, which only changes when another
+connection commits, and on a change reads just the events with
+`id > last_seen_id`, folding them into the cached totals and goal progress
+and updating only the affected table cells. Anything that is not a plain
+insert (a delete, a new goal, a rebuild) or a new local day falls back to
+a full reload, which reads the rollup table rather than the events.
+
+All database work runs in a worker thread on one pinned read connection;
+the UI thread only touches the cached data between polls.
+"""
+
+import bisect
+from dataclasses import dataclass, field
+from datetime import date
+
+from sqlalchemy import Connection, func, select
+from sqlalchemy.orm import Session
+from textual import work
+from textual.app import App, ComposeResult
+from textual.widgets import DataTable, Footer, Header, Static
+
+import config
+from model import DailyMetricRollup, Event
+from services import events, goals
+
+event_table = Event.__table__
+
+TODAY_COLUMNS = ("time", "type", "title", "metrics", "tags")
+WEEK_COLUMNS = ("metric", "unit", "count", "total")
+GOAL_COLUMNS = ("goal", "period", "progress", "percent", "projected")
+
+
+@dataclass
+class MetricTotal:
+    unit: str | None
+    count: int
+    total: float
+
+
+@dataclass
+class DashboardUpdate:
+    reloaded: bool = False
+    new_events: list[dict] = field(default_factory=list)
+    changed_metrics: set[str] = field(default_factory=set)
+    changed_goals: set[int] = field(default_factory=set)
+
+    @property
+    def changed(self) -> bool:
+        return bool(
+            self.reloaded
+            or self.new_events
+            or self.changed_metrics
+            or self.changed_goals
+        )
+
+
+################
+##### DATA #####
+################
+
+
+class DashboardData:
+    """
+    Cached dashboard aggregates plus the bookkeeping to keep them current.
+    Not thread-safe: call `load` and `poll` from one thread at a time.
+    """
+
+    def __init__(self, conn: Connection):
+        self.conn = conn
+        self.day: date | None = None
+        self.week_start: date | None = None
+        self.today_events: list[dict] = []
+        self.week_totals: dict[str, MetricTotal] = {}
+        self.goals: dict[int, goals.GoalProgress] = {}
+        self.last_seen_id = 0
+        self.data_version: int | None = None
+        # events on or after window_start (the earliest day any cached
+        # aggregate covers), used to notice deletes between polls
+        self.window_start: date | None = None
+        self.window_count = 0
+
+    def load(self) -> DashboardUpdate:
+        """
+        (Re)load every aggregate.
+        """
+        self.data_version = self._data_version()
+        self.day = config.today_local()
+        self.week_start, _ = events.get_range_bounds(config.TimeRange.WEEK)
+        with Session(bind=self.conn) as session:
+            self.last_seen_id = session.scalar(select(func.max(Event.id))) or 0
+            self.today_events = events.select_event_dicts_between(
+                session, config.TimeRange.TODAY
+            )
+            self.week_totals = self._week_totals(session)
+            self.goals = {p.goal.id: p for p in goals.evaluate_goals(session, self.day)}
+            self.window_start = min(
+                [self.week_start] + [p.period_start for p in self.goals.values()]
+            )
+            self.window_count = self._window_count(session)
+        return DashboardUpdate(reloaded=True)
+
+    def poll(self) -> DashboardUpdate:
+        """
+        Fold in events logged since the last poll; reload when anything else
+        changed. Costs one PRAGMA when nothing did.
+        """
+        version = self._data_version()
+        if config.today_local() != self.day:
+            return self.load()
+        if version == self.data_version:
+            return DashboardUpdate()
+
+        with Session(bind=self.conn) as session:
+            rows = session.execute(
+                select(event_table)
+                .where(event_table.c.id > self.last_seen_id)
+                .order_by(event_table.c.id)
+            ).all()
+            in_window = sum(1 for r in rows if r.local_date >= self.window_start)
+            if not rows or self._window_count(session) != self.window_count + in_window:
+                return self.load()
+            new_events = events.event_rows_to_dicts(session, rows)
+
+        self.data_version = version
+        self.last_seen_id = rows[-1].id
+        self.window_count += in_window
+        update = DashboardUpdate()
+        local_dates = {r.id: r.local_date for r in rows}
+        for e in new_events:
+            self._fold(e, local_dates[e["id"]], update)
+        return update
+
+    def _fold(self, event: dict, day: date, update: DashboardUpdate) -> None:
+        if day == self.day:
+            bisect.insort(self.today_events, event, key=_event_order)
+            update.new_events.append(event)
+        for name, unit, count, value in _metric_totals(event):
+            if self.week_start <= day <= self.day:
+                total = self.week_totals.setdefault(
+                    name, MetricTotal(unit=unit, count=0, total=0.0)
+                )
+                total.count += count
+                total.total += value
+                update.changed_metrics.add(name)
+            for goal_id, progress in self.goals.items():
+                if progress.goal.metric_name != name:
+                    continue
+                updated = goals.add_progress(progress, day, value, self.day)
+                if updated is not progress:
+                    self.goals[goal_id] = updated
+                    update.changed_goals.add(goal_id)
+
+    def _week_totals(self, session: Session) -> dict[str, MetricTotal]:
+        stmt = (
+            select(
+                DailyMetricRollup.metric_name,
+                func.max(DailyMetricRollup.unit),
+                func.sum(DailyMetricRollup.count),
+                func.sum(DailyMetricRollup.sum),
+            )
+            .where(DailyMetricRollup.day.between(self.week_start, self.day))
+            .group_by(DailyMetricRollup.metric_name)
+            .order_by(DailyMetricRollup.metric_name)
+        )
+        return {
+            name: MetricTotal(unit=unit, count=count, total=total)
+            for name, unit, count, total in session.execute(stmt)
+        }
+
+    def _window_count(self, session: Session) -> int:
+        stmt = select(func.count(Event.id)).where(Event.local_date >= self.window_start)
+        return session.scalar(stmt) or 0
+
+    def _data_version(self) -> int:
+        version = self.conn.exec_driver_sql("PRAGMA data_version").scalar()
+        self.conn.rollback()
+        return version
+
+
+##############
+##### UI #####
+##############
+
+
+class DashboardApp(App):
+    TITLE = "ForgeLog"
+    CSS = """
+    .heading {
+        text-style: bold;
+        padding: 1 1 0 1;
+    }
+    DataTable {
+        height: auto;
+        max-height: 16;
+    }
+    """
+    BINDINGS = [("q", "quit", "Quit"), ("r", "reload", "Reload")]
+
+    def __init__(self, data: DashboardData, interval: float):
+        super().__init__()
+        self.data = data
+        self.interval = interval
+        self._busy = False
+        self._reload_pending = False
+
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=True)
+        yield Static("Today", classes="heading")
+        yield DataTable(id="today", cursor_type="row", zebra_stripes=True)
+        yield Static("Last 7 days", classes="heading")
+        yield DataTable(id="week", cursor_type="row")
+        yield Static("Goals", classes="heading")
+        yield DataTable(id="goals", cursor_type="row")
+        yield Footer()
+
+    def on_mount(self) -> None:
+        for table_id, columns in (
+            ("today", TODAY_COLUMNS),
+            ("week", WEEK_COLUMNS),
+            ("goals", GOAL_COLUMNS),
+        ):
+            table = self.query_one(f"#{table_id}", DataTable)
+            for column in columns:
+                table.add_column(column, key=column)
+        self._refresh(reload=True)
+        self.set_interval(self.interval, self._refresh)
+
+    def action_reload(self) -> None:
+        self._refresh(reload=True)
+
+    def _refresh(self, reload: bool = False) -> None:
+        if self._busy:
+            self._reload_pending = self._reload_pending or reload
+            return
+        self._busy = True
+        self._fetch(reload)
+
+    @work(thread=True)
+    def _fetch(self, reload: bool) -> None:
+        update = self.data.load() if reload else self.data.poll()
+        self.call_from_thread(self._apply, update)
+
+    def _apply(self, update: DashboardUpdate) -> None:
+        self._busy = False
+        if update.reloaded:
+            self._render_all()
+        elif update.changed:
+            self._render_changes(update)
+        if update.changed:
+            self.sub_title = (
+                f"{len(self.data.today_events)} events today, "
+                f"updated {config.to_local(config.get_date()):%H:%M:%S}"
+            )
+        if self._reload_pending:
+            self._reload_pending = False
+            self._refresh(reload=True)
+
+    def _render_all(self) -> None:
+        today = self.query_one("#today", DataTable)
+        today.clear()
+        for e in self.data.today_events:
+            today.add_row(*_event_cells(e), key=str(e["id"]))
+
+        week = self.query_one("#week", DataTable)
+        week.clear()
+        for name, total in self.data.week_totals.items():
+            week.add_row(*_total_cells(name, total), key=name)
+
+        goal_table = self.query_one("#goals", DataTable)
+        goal_table.clear()
+        for goal_id, progress in self.data.goals.items():
+            goal_table.add_row(*_goal_cells(progress), key=str(goal_id))
+
+    def _render_changes(self, update: DashboardUpdate) -> None:
+        today = self.query_one("#today", DataTable)
+        for e in update.new_events:
+            today.add_row(*_event_cells(e), key=str(e["id"]))
+        if update.new_events:
+            # usually appended in order; backdated imports need a re-sort
+            if self.data.today_events[-1] is not update.new_events[-1]:
+                today.sort(key=lambda row: row[0])
+            today.move_cursor(row=today.get_row_index(str(update.new_events[-1]["id"])))
+
+        week = self.query_one("#week", DataTable)
+        for name in sorted(update.changed_metrics):
+            cells = _total_cells(name, self.data.week_totals[name])
+            if name in week.rows:
+                for column, value in zip(WEEK_COLUMNS, cells):
+                    week.update_cell(name, column, value)
+            else:
+                week.add_row(*cells, key=name)
+
+        goal_table = self.query_one("#goals", DataTable)
+        for goal_id in update.changed_goals:
+            cells = _goal_cells(self.data.goals[goal_id])
+            for column, value in zip(GOAL_COLUMNS, cells):
+                goal_table.update_cell(str(goal_id), column, value)
+
+
+def _metric_totals(event: dict):
+    """
+    (name, unit, count, sum) per metric value and per sample series, the
+    way the rollup counts them.
+    """
+    for m in event["metrics"]:
+        yield m["name"], m["unit"], 1, m["value"]
+    for series in event.get("series", ()):
+        yield series["name"], series["unit"], len(series["values"]), sum(
+            series["values"]
+        )
+
+
+def _event_order(event: dict) -> tuple:
+    return event["timestamp"], event["id"]
+
+
+def _event_cells(event: dict) -> tuple[str, ...]:
+    metrics = [
+        f"{m['name']} {m['value']:g}{' ' + m['unit'] if m['unit'] else ''}"
+        for m in event["metrics"]
+    ]
+    metrics.extend(
+        f"{s['name']} avg {sum(s['values']) / len(s['values']):.3g}"
+        f"{' ' + s['unit'] if s['unit'] else ''} (n={len(s['values'])})"
+        for s in event.get("series", ())
+    )
+    return (
+        f"{config.to_local(event['timestamp']):%H:%M}",
+        event["type"],
+        event["title"] or "",
+        ", ".join(metrics),
+        " ".join(f"#{t['name']}" for t in event["tags"]),
+    )
+
+
+def _total_cells(name: str, total: MetricTotal) -> tuple[str, ...]:
+    return (name, total.unit or "", str(total.count), f"{total.total:g}")
+
+
+def _goal_cells(progress: goals.GoalProgress) -> tuple[str, ...]:
+    g = progress.goal
+    eta = (
+        f"done {progress.projected_completion.isoformat()}"
+        if progress.projected_completion
+        else "off pace"
+    )
+    return (
+        g.name,
+        f"{g.period} {g.metric_name}",
+        f"{progress.progress:g}/{g.target_value:g}",
+        f"{progress.percent:.0f}%",
+        f"{progress.projected_total:.1f} by {progress.period_end.isoformat()}, {eta}",
+    )
+
+
+def run(interval: float = 2.0) -> None:
+    import db
+
+    with db.get_read_engine().connect() as conn:
+        DashboardApp(DashboardData(conn), interval).run()
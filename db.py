@@ -1,14 +1,125 @@
-from sqlalchemy import create_engine, Engine
+from typing import TYPE_CHECKING
 
-from config import sqlite_engine_uri
+from sqlalchemy import create_engine, event, Engine
 
+from config import (
+    ENGINE_PROFILES,
+    cache_engine_uri,
+    engine_profile,
+    sqlite_async_engine_uri,
+    sqlite_async_readonly_uri,
+    sqlite_engine_uri,
+    sqlite_readonly_uri,
+)
 
-# Create Connection to sqlite
-_engine = None
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 
-def get_engine() -> Engine:
-    global _engine
-    if _engine is None:
-        _engine = create_engine(sqlite_engine_uri, echo=False, future=True)
-    return _engine
+# Create Connection to sqlite, one engine per profile
+_engines: dict[str, Engine] = {}
+
+
+def _check_profile(profile: str | None) -> str:
+    profile = profile or engine_profile
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(
+            f"Unknown engine profile {profile!r}; "
+            f"expected one of {', '.join(ENGINE_PROFILES)}"
+        )
+    return profile
+
+
+def get_engine(profile: str | None = None) -> Engine:
+    profile = _check_profile(profile)
+    if profile not in _engines:
+        uri = sqlite_readonly_uri if profile == "readonly" else sqlite_engine_uri
+        engine = create_engine(uri, echo=False, future=True)
+        _set_pragmas_on_connect(engine, ENGINE_PROFILES[profile])
+        _engines[profile] = engine
+    return _engines[profile]
+
+
+def get_read_engine() -> Engine:
+    """
+    Read-only engine for query commands (today, analyze, blog, ...).
+    """
+    return get_engine("readonly")
+
+
+def reset_after_fork() -> None:
+    """
+    Process pool initializer: drop the pooled connections inherited from the
+    parent (without closing them under it), so this process opens its own on
+    first use. Engines and their settings are kept.
+    """
+    for engine in _engines.values():
+        engine.dispose(close=False)
+
+
+# asyncio engines (aiosqlite), one per profile like the sync ones
+_async_engines: dict[str, "AsyncEngine"] = {}
+
+
+def get_async_engine(profile: str | None = None) -> "AsyncEngine":
+    """
+    asyncio counterpart of `get_engine`, with the same profiles and PRAGMAs.
+    Each pooled connection runs on its own thread, so concurrent sessions
+    read in parallel without blocking the event loop. An engine must not
+    outlive its event loop: `await engine.dispose()` before the loop ends.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    profile = _check_profile(profile)
+    if profile not in _async_engines:
+        uri = (
+            sqlite_async_readonly_uri
+            if profile == "readonly"
+            else sqlite_async_engine_uri
+        )
+        engine = create_async_engine(uri, echo=False)
+        _set_pragmas_on_connect(engine.sync_engine, ENGINE_PROFILES[profile])
+        _async_engines[profile] = engine
+    return _async_engines[profile]
+
+
+def get_async_read_engine() -> "AsyncEngine":
+    return get_async_engine("readonly")
+
+
+def get_async_session(readonly: bool = False) -> "AsyncSession":
+    """
+    New AsyncSession; objects stay loaded after commit (no implicit IO on
+    attribute access, which asyncio cannot do).
+    """
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    engine = get_async_read_engine() if readonly else get_async_engine()
+    return AsyncSession(engine, expire_on_commit=False)
+
+
+_cache_engine = None
+
+
+def get_cache_engine() -> Engine:
+    """
+    Engine for the disposable cache database; its tables are created on
+    first use instead of going through migrations.
+    """
+    global _cache_engine
+    if _cache_engine is None:
+        from model import CacheBase
+
+        _cache_engine = create_engine(cache_engine_uri, echo=False, future=True)
+        _set_pragmas_on_connect(_cache_engine, ENGINE_PROFILES["fast"])
+        CacheBase.metadata.create_all(_cache_engine)
+    return _cache_engine
+
+
+def _set_pragmas_on_connect(engine: Engine, pragmas: dict[str, str | int]) -> None:
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
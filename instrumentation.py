@@ -0,0 +1,376 @@
+"""
+Per-command tracing for the `ai` CLI (`ai --trace ...`, `ai --trace-file`).
+
+While a trace is active, every SQL statement run by any engine is counted
+and timed (rows fetched or written included), and functions decorated with
+`traced` record timing spans. Statements are attributed to the innermost
+span that ran them. `note` replaces debug prints: it records key/value
+pairs on the trace and does nothing otherwise.
+
+Nothing is hooked while no trace is active; `traced` then costs a single
+global lookup per call (async generators are still stepped one item at a
+time).
+"""
+
+import contextvars
+import functools
+import inspect
+import re
+import sqlite3
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_trace: "Trace | None" = None
+_current_span: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "forgelog_span", default=None
+)
+
+
+@dataclass
+class Statement:
+    sql: str
+    span: str | None
+    elapsed_ms: float = 0.0
+    rows: int = 0
+    executemany: bool = False
+
+    def count_row(self, cursor: Any, row: tuple) -> tuple:
+        # sqlite3 cursor row_factory: called once per fetched row
+        self.rows += 1
+        return row
+
+
+@dataclass
+class Span:
+    calls: int = 0
+    total_ms: float = 0.0
+
+
+@dataclass
+class Trace:
+    command: str
+    started: float = field(default_factory=time.perf_counter)
+    finished: float | None = None
+    statements: list[Statement] = field(default_factory=list)
+    spans: dict[str, Span] = field(default_factory=lambda: defaultdict(Span))
+    notes: list[tuple[str | None, str, dict[str, Any]]] = field(default_factory=list)
+
+    @property
+    def total_ms(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return (end - self.started) * 1000
+
+    def statement_groups(self) -> list[dict[str, Any]]:
+        """
+        Statements grouped by normalized SQL text, slowest total first.
+        """
+        groups: dict[str, dict[str, Any]] = {}
+        for stmt in self.statements:
+            group = groups.setdefault(
+                stmt.sql, {"sql": stmt.sql, "count": 0, "total_ms": 0.0, "rows": 0}
+            )
+            group["count"] += 1
+            group["total_ms"] += stmt.elapsed_ms
+            group["rows"] += stmt.rows
+        return sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)
+
+    def span_rows(self) -> list[dict[str, Any]]:
+        sql_by_span: dict[str | None, list[Statement]] = defaultdict(list)
+        for stmt in self.statements:
+            sql_by_span[stmt.span].append(stmt)
+        rows = []
+        for name, span in self.spans.items():
+            stmts = sql_by_span.get(name, [])
+            rows.append(
+                {
+                    "name": name,
+                    "calls": span.calls,
+                    "total_ms": span.total_ms,
+                    "statements": len(stmts),
+                    "sql_ms": sum(s.elapsed_ms for s in stmts),
+                    "rows": sum(s.rows for s in stmts),
+                }
+            )
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "command": self.command,
+            "total_ms": round(self.total_ms, 3),
+            "statements": len(self.statements),
+            "sql_ms": round(sum(s.elapsed_ms for s in self.statements), 3),
+            "rows": sum(s.rows for s in self.statements),
+            "spans": [_rounded(row) for row in self.span_rows()],
+            "queries": [_rounded(group) for group in self.statement_groups()],
+            "notes": [
+                {"span": span, "name": name, **fields}
+                for span, name, fields in self.notes
+            ],
+        }
+
+
+def _rounded(row: dict[str, Any]) -> dict[str, Any]:
+    return {k: round(v, 3) if isinstance(v, float) else v for k, v in row.items()}
+
+
+#####################
+##### LIFECYCLE #####
+#####################
+
+
+def start(command: str) -> Trace:
+    """
+    Begin tracing; SQL hooks are attached to every engine until `stop`.
+    """
+    global _trace
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    _trace = Trace(command=command)
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    return _trace
+
+
+def stop() -> "Trace | None":
+    global _trace
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    trace, _trace = _trace, None
+    if trace is None:
+        return None
+    trace.finished = time.perf_counter()
+    event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+    return trace
+
+
+def active() -> bool:
+    return _trace is not None
+
+
+#####################
+##### SQL HOOKS #####
+#####################
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = _trace
+    if trace is None:
+        return
+    stmt = Statement(
+        sql=_WHITESPACE.sub(" ", statement).strip(),
+        span=_current_span.get(),
+        executemany=executemany,
+    )
+    trace.statements.append(stmt)
+    if isinstance(cursor, sqlite3.Cursor):  # adapted (aiosqlite) cursors: no rows
+        cursor.row_factory = stmt.count_row
+    conn.info.setdefault("forgelog_trace", []).append((stmt, time.perf_counter()))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    pending = conn.info.get("forgelog_trace")
+    if not pending:
+        return
+    stmt, started = pending.pop()
+    stmt.elapsed_ms = (time.perf_counter() - started) * 1000
+    if cursor.rowcount > 0:  # writes; selects report -1 and count rows as fetched
+        stmt.rows += cursor.rowcount
+
+
+#################
+##### SPANS #####
+#################
+
+
+def traced(fn: F) -> F:
+    """
+    Record a timing span named `<module>.<function>` for each call.
+    Generators count as one call from first step to exhaustion (or close);
+    the span covers only the time spent inside the generator, not in the
+    consumer between items.
+    """
+    name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+    if inspect.isasyncgenfunction(fn):
+
+        @functools.wraps(fn)
+        async def async_gen_wrapper(*args, **kwargs):
+            # stepped by hand even when not tracing, so asend/athrow reach fn
+            agen = fn(*args, **kwargs)
+            elapsed = 0.0
+            step = agen.asend(None)
+            try:
+                while True:
+                    token, started = _enter(name)
+                    try:
+                        item = await step
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        elapsed += _leave(token, started)
+                    try:
+                        sent = yield item
+                    except GeneratorExit:
+                        raise
+                    except BaseException as e:
+                        step = agen.athrow(e)
+                    else:
+                        step = agen.asend(sent)
+            finally:
+                token, started = _enter(name)
+                try:
+                    await agen.aclose()
+                finally:
+                    elapsed += _leave(token, started)
+                    _record(name, elapsed)
+
+        return async_gen_wrapper  # type: ignore[return-value]
+
+    if inspect.isgeneratorfunction(fn):
+
+        @functools.wraps(fn)
+        def gen_wrapper(*args, **kwargs):
+            gen = fn(*args, **kwargs)
+            if _trace is None:
+                return (yield from gen)
+            elapsed = 0.0
+            step = functools.partial(gen.send, None)
+            try:
+                while True:
+                    token, started = _enter(name)
+                    try:
+                        item = step()
+                    except StopIteration as stop:
+                        return stop.value
+                    finally:
+                        elapsed += _leave(token, started)
+                    try:
+                        sent = yield item
+                    except GeneratorExit:
+                        raise
+                    except BaseException as e:
+                        step = functools.partial(gen.throw, e)
+                    else:
+                        step = functools.partial(gen.send, sent)
+            finally:
+                token, started = _enter(name)
+                try:
+                    gen.close()
+                finally:
+                    elapsed += _leave(token, started)
+                    _record(name, elapsed)
+
+        return gen_wrapper  # type: ignore[return-value]
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            if _trace is None:
+                return await fn(*args, **kwargs)
+            token, started = _enter(name)
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                _record(name, _leave(token, started))
+
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _trace is None:
+            return fn(*args, **kwargs)
+        token, started = _enter(name)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _record(name, _leave(token, started))
+
+    return wrapper  # type: ignore[return-value]
+
+
+def _enter(name: str) -> tuple[contextvars.Token, float]:
+    return _current_span.set(name), time.perf_counter()
+
+
+def _leave(token: contextvars.Token, started: float) -> float:
+    """
+    Restore the enclosing span; returns the milliseconds spent in this one.
+    """
+    _current_span.reset(token)
+    return (time.perf_counter() - started) * 1000
+
+
+def _record(name: str, elapsed_ms: float) -> None:
+    trace = _trace
+    if trace is not None:
+        span = trace.spans[name]
+        span.calls += 1
+        span.total_ms += elapsed_ms
+
+
+def note(name: str, **fields: Any) -> None:
+    """
+    Attach debug values to the active trace (no-op when not tracing).
+    """
+    if _trace is not None:
+        _trace.notes.append((_current_span.get(), name, fields))
+
+
+##################
+##### REPORT #####
+##################
+
+
+def format_report(trace: Trace, top: int = 8) -> str:
+    lines = []
+    sql_ms = sum(s.elapsed_ms for s in trace.statements)
+    rows = sum(s.rows for s in trace.statements)
+    lines.append(
+        f"trace: ai {trace.command}: {trace.total_ms:.1f} ms total, "
+        f"{len(trace.statements)} statements ({sql_ms:.1f} ms SQL), {rows} rows"
+    )
+
+    spans = trace.span_rows()
+    if spans:
+        width = max(len(row["name"]) for row in spans)
+        lines.append("")
+        lines.append(
+            f"  {'span':<{width}} {'calls':>5} {'total ms':>9} {'stmts':>5} "
+            f"{'sql ms':>8} {'rows':>7}"
+        )
+        for row in spans:
+            lines.append(
+                f"  {row['name']:<{width}} {row['calls']:>5} {row['total_ms']:>9.1f} "
+                f"{row['statements']:>5} {row['sql_ms']:>8.1f} {row['rows']:>7}"
+            )
+
+    groups = trace.statement_groups()
+    if groups:
+        lines.append("")
+        lines.append(f"  slowest statements (top {min(top, len(groups))}):")
+        for group in groups[:top]:
+            sql = group["sql"]
+            if len(sql) > 90:
+                sql = sql[:87] + "..."
+            lines.append(
+                f"  {group['total_ms']:>8.1f} ms  x{group['count']:<4} "
+                f"{group['rows']:>7} rows  {sql}"
+            )
+
+    if trace.notes:
+        lines.append("")
+        lines.append("  notes:")
+        for span, name, fields in trace.notes:
+            values = " ".join(f"{k}={v}" for k, v in fields.items())
+            lines.append(f"  [{span or '-'}] {name}: {values}")
+    return "\n".join(lines)
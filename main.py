@@ -3,35 +3,41 @@ Main CLI entrypoint for your local AI life tracker.
 
 Commands (high-level):
 
-    ai log workout ...
-    ai log study ...
-    ai log guitar ...
-    ai log note ...
+    ai log workout|study|guitar|activity ...
+    ai delete ID
 
     ai today
-    ai analyze week
-    ai blog week
+    ai list --type guitar --since 2026-01-01
+    ai search "scales dorian"
+    ai dashboard
+
+    ai analyze range week month
+    ai blog generate week
     ai goals add ...
     ai goals status
 
-For now, everything is just stubbed out with Typer.
-You can wire in DB + LLM logic step by step.
+    ai import FILE / ai export week --format json|compact|columnar|msgpack
+    ai db migrate|rebuild-rollups|rebuild-local-dates|rebuild-search|...
+    ai daemon start|stop|status
+
+Events live in SQLite (see db.py and services/); analyses, goals and blog
+posts are computed from them, with a local Ollama model writing the prose.
 """
 
-from typing import Annotated, Optional
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Annotated, Optional
+import sys
 import typer
-from sqlalchemy.orm import Session
 import time
 
-from config import TimeRange, TimeRangeStr
+from config import TimeRange, TimeRangeStr, to_time_range
 import config
-import db
-from model import Base
-from services import events
-from serialization_helpers import (
-    format_events_today_as_json,
-    format_events_week_as_json,
-)
+
+# SQLAlchemy, the models, services and NumPy are imported inside the commands
+# that use them, so `ai --help` and friends never pay for them.
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
 
 # Root Typer app
 app = typer.Typer(help="Local AI life tracker (workout, study, guitar, journaling).")
@@ -43,6 +49,8 @@ log_app = typer.Typer(
 analyze_app = typer.Typer(help="Analyze your data over different time ranges.")
 blog_app = typer.Typer(help="Generate markdown blog posts from your logs.")
 goals_app = typer.Typer(help="Create and inspect goals.")
+db_app = typer.Typer(help="Database maintenance: migrations and index checks.")
+daemon_app = typer.Typer(help="Keep a warm background process for fast commands.")
 
 
 # Attach sub-apps to main app
@@ -50,6 +58,8 @@ app.add_typer(log_app, name="log")
 app.add_typer(analyze_app, name="analyze")
 app.add_typer(blog_app, name="blog")
 app.add_typer(goals_app, name="goals")
+app.add_typer(db_app, name="db")
+app.add_typer(daemon_app, name="daemon")
 
 
 # --------------------
@@ -140,7 +150,9 @@ def log_workout(
     """
     Log a workout (run, PT, etc.).
     """
-    with Session(db.get_engine()) as session:
+    from services import events
+
+    with _session() as session:
         event = events.log_workout(
             session,
             dips=dips,
@@ -214,6 +226,8 @@ def log_guitar(
     """
     Log a guitar practice session.
     """
+    from services import events
+
     if record_session:
         typer.echo("🎸 Starting practice session…")
         typer.echo("Press ENTER to end the session.")
@@ -232,7 +246,7 @@ def log_guitar(
     if minutes is None:
         raise typer.BadParameter("You must provide --minutes or use --session.")
     if focus and focus in config.GuitarFocus:
-        with Session(db.get_engine()) as session:
+        with _session() as session:
             event = events.log_guitar(
                 session=session, name=focus, value=minutes, notes=notes
             )
@@ -318,6 +332,8 @@ def log_activity(
     """
     Log an activity that isn't covered by other subcommands.
     """
+    from services import events
+
     if record_activity:
         typer.echo("Starting activity…")
         typer.echo("Press ENTER to end the session.")
@@ -336,7 +352,7 @@ def log_activity(
     if minutes is None:
         raise typer.BadParameter("You must provide --minutes or use --session.")
     if name:
-        with Session(db.get_engine()) as session:
+        with _session() as session:
             event = events.log_activity(
                 session=session, name=name, value=minutes, notes=notes
             )
@@ -348,6 +364,189 @@ def log_activity(
     typer.echo(f"  notes={notes}")
 
 
+# --------------
+# import command
+# --------------
+
+
+@app.command("import")
+def import_events(
+    path: Annotated[
+        Path,
+        typer.Argument(
+            exists=True,
+            dir_okay=False,
+            help="File to import: a JSON export (.json), .jsonl or .csv.",
+        ),
+    ],
+    batch_size: Annotated[
+        int,
+        typer.Option(
+            "--batch-size",
+            "-b",
+            min=1,
+            help="Events per transaction.",
+        ),
+    ] = config.import_batch_size,
+):
+    """
+    Backfill events from a file in bulk.
+    """
+    from serialization_helpers import read_event_records
+    from services import events
+
+    try:
+        records = read_event_records(path)
+        with _session() as session:
+            count = events.bulk_log_events(session, records, batch_size=batch_size)
+    except (KeyError, ValueError) as exc:
+        raise typer.BadParameter(f"Invalid record in {path}: {exc}")
+    typer.echo(f"Imported {count} events from {path}")
+
+
+# --------------
+# delete command
+# --------------
+
+
+@app.command("delete")
+def delete_event(
+    event_id: Annotated[int, typer.Argument(help="Id of the event to delete.")],
+):
+    """
+    Delete a logged event with its metrics and tags.
+    """
+    from services import events
+
+    with _session() as session:
+        deleted = events.delete_event(session, event_id)
+    if not deleted:
+        raise typer.BadParameter(f"No event with id {event_id}")
+    typer.echo(f"Deleted event {event_id}")
+
+
+# --------------
+# export command
+# --------------
+
+EXPORT_FORMATS = ("json", "compact", "columnar", "msgpack")
+
+
+@app.command("export")
+def export_events(
+    range: TimeRangeStr = typer.Argument(
+        TimeRangeStr.week, help="Time range to export."
+    ),
+    format: Annotated[
+        str,
+        typer.Option(
+            "--format",
+            "-f",
+            help=(
+                "json (schema 1, re-importable), compact (schema 2 rows), "
+                "columnar (schema 2 columns) or msgpack (schema 1, binary, "
+                "re-importable)."
+            ),
+        ),
+    ] = "json",
+    output: Annotated[
+        Optional[Path],
+        typer.Option("--output", "-o", help="Write to a file instead of stdout."),
+    ] = None,
+    stats: Annotated[
+        bool,
+        typer.Option("--stats", help="Compare bytes and tokens of every format."),
+    ] = False,
+):
+    """
+    Export events in a time range.
+    """
+    import serialization_helpers as sh
+    from services import events
+
+    if format not in EXPORT_FORMATS:
+        raise typer.BadParameter(
+            f"must be one of {', '.join(EXPORT_FORMATS)}", param_hint="--format"
+        )
+    time_range = to_time_range(range)
+
+    if format == "msgpack":
+        if output is None:
+            raise typer.BadParameter(
+                "msgpack is binary; pass --output FILE.msgpack", param_hint="--format"
+            )
+        with _session(readonly=True) as session, output.open("wb") as fp:
+            sh.write_events_range_as_msgpack(session, time_range, fp, label=range.value)
+        typer.echo(f"Exported {range.value} to {output}")
+        return
+
+    if stats:
+        with _session(readonly=True) as session:
+            event_dicts = events.select_event_dicts_between(session, time_range)
+        _echo_export_stats(event_dicts, range.value)
+        return
+
+    with _session(readonly=True) as session, _open_output(output) as fp:
+        if format == "json":
+            sh.write_events_range_as_json(session, time_range, fp, label=range.value)
+        else:
+            fp.write(
+                sh.format_events_as_compact_json(
+                    events.iter_event_dicts_between(session, time_range),
+                    label=range.value,
+                    columnar=format == "columnar",
+                )
+            )
+        fp.write("\n")
+    if output:
+        typer.echo(f"Exported {range.value} to {output}")
+
+
+def _echo_export_stats(event_dicts: list, label: str) -> None:
+    import io
+
+    import serialization_helpers as sh
+
+    texts = {
+        "json": sh.format_events_as_json(event_dicts, label=label),
+        "compact": sh.format_events_as_compact_json(event_dicts, label=label),
+        "columnar": sh.format_events_as_compact_json(
+            event_dicts, label=label, columnar=True
+        ),
+    }
+    sizes = {name: sh.payload_stats(text) for name, text in texts.items()}
+    packed = io.BytesIO()
+    sh.write_events_as_msgpack(
+        event_dicts, packed, event_count=len(event_dicts), label=label
+    )
+    sizes["msgpack"] = {"bytes": packed.tell(), "tokens": None}
+
+    baseline = sizes["json"]
+    typer.echo(f"{len(event_dicts)} events ({label})")
+    for name, size in sizes.items():
+        tokens = (
+            f"~{size['tokens']:>9} tokens ({_pct(size['tokens'], baseline['tokens'])})"
+            if size["tokens"] is not None
+            else "(binary)"
+        )
+        typer.echo(
+            f"  {name:<9} {size['bytes']:>10} bytes "
+            f"({_pct(size['bytes'], baseline['bytes'])})  {tokens}"
+        )
+
+
+def _pct(value: int, baseline: int) -> str:
+    return f"{(value - baseline) / baseline * 100:+.0f}%" if baseline else "n/a"
+
+
+def _open_output(output: Optional[Path]):
+    import contextlib
+
+    if output is None:
+        return contextlib.nullcontext(sys.stdout)
+    return output.open("w", encoding="utf-8")
+
+
 # --------------
 # today command
 # --------------
@@ -366,11 +565,222 @@ def show_today(
     """
     Show all events logged today.
     """
-    with Session(db.get_engine()) as session:
-        json_events = format_events_today_as_json(session)
-        # json_events = format_events_week_as_json(session)
-    # TODO: Create display meaningful content
-    typer.echo(json_events)
+    from serialization_helpers import write_events_as_json
+    from services import events, range_cache
+
+    with _session(readonly=True) as session, _cache_session() as cache:
+        # TODO: Create display meaningful content
+        write_events_as_json(
+            range_cache.iter_cached_event_dicts_between(
+                session, cache, TimeRange.TODAY
+            ),
+            sys.stdout,
+            label="today",
+            event_count=events.count_events_between(session, TimeRange.TODAY),
+        )
+    typer.echo()
+
+
+# ------------
+# list command
+# ------------
+
+
+@app.command("list")
+def list_events(
+    types: Annotated[
+        Optional[list[config.EventTypes]],
+        typer.Option("--type", "-t", help="Only events of this type (repeatable)."),
+    ] = None,
+    tag: Annotated[
+        Optional[str], typer.Option("--tag", help="Only events with this tag.")
+    ] = None,
+    metric: Annotated[
+        Optional[str],
+        typer.Option("--metric", help="Only events with this metric, e.g. pushups."),
+    ] = None,
+    since: Annotated[
+        Optional[datetime],
+        typer.Option("--since", formats=["%Y-%m-%d"], help="First local day."),
+    ] = None,
+    until: Annotated[
+        Optional[datetime],
+        typer.Option("--until", formats=["%Y-%m-%d"], help="Last local day."),
+    ] = None,
+    oldest_first: Annotated[
+        bool,
+        typer.Option("--oldest-first", help="List oldest events first."),
+    ] = False,
+    limit: Annotated[
+        int, typer.Option("--limit", "-l", min=1, help="Events per page.")
+    ] = 20,
+    after: Annotated[
+        Optional[str],
+        typer.Option("--after", help="Continue from the cursor printed by a page."),
+    ] = None,
+    all_pages: Annotated[
+        bool,
+        typer.Option("--all", help="Keep fetching pages until the end."),
+    ] = False,
+    as_json: Annotated[
+        bool,
+        typer.Option("--json", help="Print one JSON object per page."),
+    ] = False,
+):
+    """
+    List events page by page, newest first.
+    """
+    import serializers
+    from services import events
+
+    filters = dict(
+        page_size=limit,
+        descending=not oldest_first,
+        types=types or (),
+        tag=tag,
+        metric=metric,
+        start=since.date() if since else None,
+        end=until.date() if until else None,
+    )
+    with _session(readonly=True) as session:
+        try:
+            pages = events.iter_event_pages(session, after=after, **filters)
+            for page in pages:
+                if as_json:
+                    typer.echo(
+                        serializers.dumps(
+                            {"events": page.events, "next_cursor": page.next_cursor}
+                        )
+                    )
+                else:
+                    for e in page.events:
+                        _echo_event_line(e)
+                if not all_pages:
+                    break
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc), param_hint="--after")
+
+    if not as_json:
+        if page.next_cursor and not all_pages:
+            typer.echo(f"(more: ai list --after {page.next_cursor})")
+        elif not page.events and after is None:
+            typer.echo("No events.")
+
+
+def _echo_event_line(event: dict) -> None:
+    local = config.to_local(event["timestamp"])
+    metrics = ", ".join(
+        f"{m['name']} {m['value']:g}{' ' + m['unit'] if m['unit'] else ''}"
+        for m in event["metrics"]
+    )
+    tags = " ".join(f"#{t['name']}" for t in event["tags"])
+    typer.echo(
+        f"[{event['id']}] {local:%Y-%m-%d %H:%M} {event['type']:<9} "
+        f"{event['title'] or ''}"
+        + (f"  ({metrics})" if metrics else "")
+        + (f"  {tags}" if tags else "")
+    )
+
+
+# -----------------
+# dashboard command
+# -----------------
+
+
+@app.command("dashboard")
+def show_dashboard(
+    interval: Annotated[
+        float,
+        typer.Option(
+            "--interval", "-i", min=0.2, help="Seconds between checks for new events."
+        ),
+    ] = 2.0,
+):
+    """
+    Live view of today's events, this week's metric totals and goal progress.
+    """
+    import dashboard
+
+    _ensure_migrated()
+    dashboard.run(interval=interval)
+
+
+# --------------
+# search command
+# --------------
+
+
+@app.command("search")
+def search_events(
+    query: Annotated[
+        str,
+        typer.Argument(
+            help='Words to find in titles, notes and raw text. "Quoted phrases" '
+            "and prefix* terms work."
+        ),
+    ],
+    types: Annotated[
+        Optional[list[config.EventTypes]],
+        typer.Option("--type", "-t", help="Only events of this type (repeatable)."),
+    ] = None,
+    tag: Annotated[
+        Optional[str], typer.Option("--tag", help="Only events with this tag.")
+    ] = None,
+    since: Annotated[
+        Optional[datetime],
+        typer.Option("--since", formats=["%Y-%m-%d"], help="First local day."),
+    ] = None,
+    until: Annotated[
+        Optional[datetime],
+        typer.Option("--until", formats=["%Y-%m-%d"], help="Last local day."),
+    ] = None,
+    page: Annotated[int, typer.Option("--page", "-p", min=1)] = 1,
+    limit: Annotated[
+        int, typer.Option("--limit", "-l", min=1, help="Results per page.")
+    ] = 20,
+    raw: Annotated[
+        bool,
+        typer.Option("--raw", help="Pass the query to SQLite FTS5 unchanged."),
+    ] = False,
+):
+    """
+    Full-text search over event titles, notes and raw text, best match first.
+    """
+    from sqlalchemy.exc import OperationalError
+
+    from services import search
+
+    with _session(readonly=True) as session:
+        try:
+            result = search.search_events(
+                session,
+                query,
+                types=types or (),
+                tag=tag,
+                start=since.date() if since else None,
+                end=until.date() if until else None,
+                page=page,
+                page_size=limit,
+                raw=raw,
+            )
+        except OperationalError as exc:
+            raise typer.BadParameter(f"invalid FTS5 query: {exc.orig}")
+
+    if not result.hits:
+        typer.echo("No matching events.")
+        return
+    for hit in result.hits:
+        typer.echo(
+            f"[{hit.id}] {hit.local_date.isoformat()} {hit.type.value:<9} "
+            f"{hit.title or ''}"
+        )
+        typer.echo(f"    {hit.snippet}")
+    first = (result.page - 1) * result.page_size + 1
+    more = f"; more with --page {result.page + 1}" if result.has_more else ""
+    order = (
+        "" if result.ranked else "; too many matches to rank, most recently added first"
+    )
+    typer.echo(f"(results {first}-{first + len(result.hits) - 1}{more}{order})")
 
 
 # --------------------
@@ -380,14 +790,109 @@ def show_today(
 
 @analyze_app.command("range")
 def analyze_range(
-    range: TimeRange = typer.Argument(TimeRangeStr.week, help="Time range to analyze."),
+    ranges: Annotated[
+        Optional[list[TimeRangeStr]],
+        typer.Argument(
+            help="Time ranges to analyze (default: week). Several are fetched "
+            "concurrently."
+        ),
+    ] = None,
+    as_json: Annotated[
+        bool,
+        typer.Option("--json", help="Print the analysis as JSON."),
+    ] = False,
+    summary: Annotated[
+        bool,
+        typer.Option("--summary", help="Add a summary from the local LLM."),
+    ] = False,
+    model: Annotated[
+        str,
+        typer.Option("--model", help="Local ollama model to use with --summary."),
+    ] = config.llm_model,
 ):
     """
-    Analyze your data for a given time range (today, week, month).
+    Analyze your data for one or more time ranges (today, week, month, year).
+    """
+    import asyncio
+
+    import serializers
+
+    time_ranges = [to_time_range(r) for r in ranges or [TimeRangeStr.week]]
+    try:
+        results = asyncio.run(
+            _analyze_ranges(time_ranges, model=model if summary else None)
+        )
+    except RuntimeError as exc:
+        typer.echo(str(exc), err=True)
+        raise typer.Exit(code=1)
+
+    if as_json:
+        dicts = [analysis.to_dict() for analysis, _ in results]
+        payload = dicts[0] if len(dicts) == 1 else dicts
+        typer.echo(serializers.dumps(payload))
+        return
+
+    for i, (analysis, markdown) in enumerate(results):
+        if i:
+            typer.echo()
+        _echo_analysis(analysis)
+        if markdown is not None:
+            typer.echo()
+            typer.echo(markdown)
+
+
+async def _analyze_ranges(time_ranges: list[TimeRange], model: Optional[str]):
+    """
+    Analyze every range on its own async session. With a model, each range
+    goes to the LLM as soon as its analysis is ready, so the remaining
+    database reads overlap the requests in flight.
+    Returns [(analysis, markdown or None)] in input order.
     """
-    # TODO: query DB, aggregate metrics, optionally call LLM for summary.
-    typer.echo(f"Analyzing range: {range.value}")
-    typer.echo("TODO: implement analytics + optional LLM summary.")
+    import asyncio
+    import contextlib
+
+    import db
+    import serializers
+    from services import analytics, llm
+
+    _ensure_migrated()
+    engine = db.get_async_read_engine()
+
+    async def one(time_range: TimeRange, cache: Optional["Session"]):
+        async with db.get_async_session(readonly=True) as session:
+            analysis = await analytics.aanalyze_range(session, time_range)
+        if cache is None or not analysis.metrics:
+            return analysis, None
+        markdown, _ = await llm.agenerate_cached(
+            cache, "analysis", serializers.dumps(analysis.to_dict()), model=model
+        )
+        return analysis, markdown
+
+    try:
+        with _cache_session() if model else contextlib.nullcontext() as cache:
+            return await asyncio.gather(*(one(r, cache) for r in time_ranges))
+    finally:
+        await engine.dispose()
+
+
+def _echo_analysis(analysis) -> None:
+    typer.echo(
+        f"Analysis for {analysis.label} "
+        f"({analysis.start.isoformat()} to {analysis.end.isoformat()})"
+    )
+    if not analysis.metrics:
+        typer.echo("No metrics logged in this range.")
+        return
+    typer.echo(
+        f"  {'metric':<16} {'total':>10} {'unit':<5} {'vs prev':>9} "
+        f"{'days':>5} {'streak':>6} {'best':>5}"
+    )
+    for m in analysis.metrics:
+        delta = f"{m.delta_pct:+.0f}%" if m.delta_pct is not None else "new"
+        typer.echo(
+            f"  {m.name:<16} {m.total:>10.1f} {m.unit or '':<5} {delta:>9} "
+            f"{m.active_days:>5} {m.current_streak:>6} {m.longest_streak:>5}"
+        )
 
 
 # --------------------
@@ -397,24 +902,85 @@ def analyze_range(
 
 @blog_app.command("generate")
 def blog_generate(
-    range: TimeRange = typer.Argument(
+    range: TimeRangeStr = typer.Argument(
         TimeRangeStr.week, help="Time range for the blog post."
     ),
     output: Optional[str] = typer.Option(
+        None,
         "--output",
         "-o",
         help="Optional path to write markdown output to a file.",
     ),
+    model: Annotated[
+        str,
+        typer.Option("--model", help="Local ollama model to use."),
+    ] = config.llm_model,
+    chunk: Annotated[
+        Optional[str],
+        typer.Option(
+            "--chunk",
+            help=(
+                "Summarize per 'day' or 'week' first, then combine. "
+                "Defaults to day for month and week for year."
+            ),
+        ),
+    ] = None,
+    workers: Annotated[
+        int,
+        typer.Option(
+            "--workers",
+            "-w",
+            min=1,
+            help=(
+                "Processes that read and format chunks in parallel. Needs "
+                "chunking (--chunk, or a month/year range); reads the "
+                "database directly instead of the range cache."
+            ),
+        ),
+    ] = 1,
 ):
     """
     Generate a markdown blog post from your logs for a given time range.
     """
-    typer.echo(f"Generating blog post for range: {range.value}")
-    typer.echo(f"Output file: {output}")
-    # TODO:
-    # 1. Fetch events for range.
-    # 2. Build prompt & call local LLM.
-    # 3. Print markdown and/or save to file.
+    from serialization_helpers import format_events_as_compact_json
+    from services import events, range_cache, summarize
+
+    granularity = chunk or {TimeRangeStr.month: "day", TimeRangeStr.year: "week"}.get(
+        range
+    )
+    if granularity and granularity not in summarize.GRANULARITIES:
+        raise typer.BadParameter("must be 'day' or 'week'", param_hint="--chunk")
+    if workers > 1 and not granularity:
+        raise typer.BadParameter(
+            f"needs chunking; pass --chunk day or week for a {range.value} range",
+            param_hint="--workers",
+        )
+
+    if workers > 1:
+        # partitions are read in the workers, bypassing the range cache
+        _ensure_migrated()
+        start, end = events.get_range_bounds(to_time_range(range))
+        chunks = summarize.split_range(start, end, granularity, workers=workers)
+    else:
+        with _session(readonly=True) as session, _cache_session() as cache:
+            event_dicts = range_cache.iter_cached_event_dicts_between(
+                session, cache, to_time_range(range)
+            )
+            if granularity:
+                chunks = summarize.split_events(event_dicts, granularity)
+            else:
+                payload = format_events_as_compact_json(event_dicts, label=range.value)
+
+    if granularity:
+        markdown = _llm_summarize(chunks, range.value, model)
+    else:
+        markdown = _llm_markdown("blog", payload, model)
+
+    if output:
+        Path(output).write_text(markdown, encoding="utf-8")
+        typer.echo(f"Wrote blog post to {output}")
+    else:
+        typer.echo(markdown)
 
 
 # --------------------
@@ -447,24 +1013,211 @@ def goals_add(
     """
     Add a new goal.
     """
-    typer.echo("Adding goal:")
-    typer.echo(f"  name={name}")
+    from services import goals
+
+    if period not in goals.GOAL_PERIODS:
+        raise typer.BadParameter(
+            f"period must be one of {', '.join(goals.GOAL_PERIODS)}",
+            param_hint="--period",
+        )
+    with _session() as session:
+        goal = goals.add_goal(
+            session,
+            name=name,
+            metric_name=metric_name,
+            target_value=target_value,
+            period=period,
+        )
+        typer.echo(f"Added goal {goal.name!r} with id {goal.id}")
+
     typer.echo(f"  metric_name={metric_name}")
     typer.echo(f"  target_value={target_value}")
     typer.echo(f"  period={period}")
-    # TODO: insert Goal into DB.
 
 
 @goals_app.command("status")
 def goals_status():
     """
-    Show current goals and (eventually) progress for each.
+    Show current goals and progress for each.
+    """
+    from services import goals
+
+    with _session(readonly=True) as session:
+        progress = goals.evaluate_goals(session)
+
+        if not progress:
+            typer.echo("No active goals. Add one with `ai goals add`.")
+            return
+        for p in progress:
+            g = p.goal
+            eta = (
+                p.projected_completion.isoformat()
+                if p.projected_completion
+                else "off pace"
+            )
+            typer.echo(
+                f"{g.name} ({g.period} {g.metric_name}): "
+                f"{p.progress:g}/{g.target_value:g} ({p.percent:.0f}%), "
+                f"{p.remaining:g} to go, projected {p.projected_total:.1f} by "
+                f"{p.period_end.isoformat()}, done {eta}"
+            )
+
+
+# --------------------
+# db subcommands
+# --------------------
+
+
+@db_app.command("migrate")
+def db_migrate():
+    """
+    Bring the database schema (tables and indexes) up to date.
+    """
+    import db
+    import migrations
+
+    version = migrations.migrate(db.get_engine())
+    typer.echo(f"Schema version: {version}")
+
+
+@db_app.command("rebuild-rollups")
+def db_rebuild_rollups():
+    """
+    Recompute the daily metric rollup table from raw metrics.
+    """
+    from services import rollups
+
+    with _session() as session:
+        count = rollups.rebuild_rollups(session)
+        session.commit()
+    typer.echo(f"Rebuilt {count} daily rollup rows.")
+
+
+@db_app.command("rebuild-local-dates")
+def db_rebuild_local_dates():
+    """
+    Recompute every event's local date (and the rollups) after changing
+    the timezone (FORGELOG_TZ).
+    """
+    from services import events, rollups
+
+    with _session() as session:
+        changed = events.rebuild_local_dates(session)
+        rows = rollups.rebuild_rollups(session)
+        session.commit()
+    typer.echo(
+        f"Updated {changed} event dates for {config.user_timezone.key}; "
+        f"rebuilt {rows} rollup rows."
+    )
+
+
+@db_app.command("rebuild-search")
+def db_rebuild_search():
+    """
+    Rebuild the full-text search index from the events table.
+    """
+    from services import search
+
+    with _session() as session:
+        count = search.rebuild_search_index(session)
+        session.commit()
+    typer.echo(f"Indexed {count} events for search.")
+
+
+@db_app.command("clear-cache")
+def db_clear_cache():
+    """
+    Drop every cached day of range results (they are rebuilt on demand).
+    """
+    from services import range_cache
+
+    with _cache_session() as cache:
+        count = range_cache.clear(cache)
+        cache.commit()
+    typer.echo(f"Dropped {count} cached days.")
+
+
+@db_app.command("check-plans")
+def db_check_plans():
+    """
+    Fail if any hot-path query falls back to a full table scan.
+    """
+    import db
+    import migrations
+
+    problems = migrations.check_query_plans(db.get_engine())
+    if problems:
+        for problem in problems:
+            typer.echo(f"Full scan: {problem}", err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"All {len(migrations.PLAN_CHECKS)} query plans use indexes.")
+
+
+# --------------------
+# daemon subcommands
+# --------------------
+
+
+@daemon_app.command("start")
+def daemon_start(
+    background: Annotated[
+        bool,
+        typer.Option("--background", "-b", help="Detach and run in the background."),
+    ] = False,
+):
+    """
+    Serve `ai` commands from a warm process on a Unix socket.
+    While it runs, the CLI forwards commands to it automatically.
     """
-    typer.echo("Showing goal status.")
-    # TODO:
-    # 1. Fetch goals from DB.
-    # 2. Compute progress from EventMetric.
-    # 3. Print in a readable table.
+    import daemon
+
+    if background:
+        import subprocess
+
+        subprocess.Popen(
+            [sys.executable, __file__, "daemon", "start"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        typer.echo(f"Daemon starting on {config.daemon_socket_path}")
+        return
+
+    typer.echo(f"Daemon listening on {config.daemon_socket_path} (Ctrl-C to stop)")
+    try:
+        daemon.serve()
+    except RuntimeError as exc:
+        typer.echo(str(exc), err=True)
+        raise typer.Exit(code=1)
+
+
+@daemon_app.command("stop")
+def daemon_stop():
+    """
+    Stop the running daemon.
+    """
+    import daemon
+
+    if daemon.request("/shutdown") is None:
+        typer.echo("No daemon is running.")
+    else:
+        typer.echo("Daemon stopped.")
+
+
+@daemon_app.command("status")
+def daemon_status():
+    """
+    Show whether a daemon is running and what it serves.
+    """
+    import daemon
+
+    reply = daemon.request("/status")
+    if reply is None:
+        typer.echo("No daemon is running.")
+        raise typer.Exit(code=1)
+    for key, value in reply[1].items():
+        typer.echo(f"  {key}={value}")
 
 
 # --------------------
@@ -472,8 +1225,154 @@ def goals_status():
 # --------------------
 
 
+def _session(readonly: bool = False) -> "Session":
+    """
+    Open a session, migrating the database first if its schema is behind.
+    """
+    from sqlalchemy.orm import Session
+
+    import db
+
+    _ensure_migrated()
+    return Session(db.get_read_engine() if readonly else db.get_engine())
+
+
+def _ensure_migrated() -> None:
+    import db
+    import migrations
+
+    if migrations.on_disk_version(config.sqlite_path) < migrations.SCHEMA_VERSION:
+        migrations.migrate(db.get_engine())
+
+
+def _cache_session() -> "Session":
+    from sqlalchemy.orm import Session
+
+    import db
+
+    return Session(db.get_cache_engine())
+
+
+def _llm_markdown(template_name: str, payload: str, model: str) -> str:
+    """
+    Cached LLM call for a command; reports failures as a clean CLI error.
+    """
+    from services import llm
+
+    try:
+        with _cache_session() as cache:
+            markdown, cached = llm.generate_cached(
+                cache, template_name, payload, model=model
+            )
+    except RuntimeError as exc:
+        typer.echo(str(exc), err=True)
+        raise typer.Exit(code=1)
+    if cached:
+        typer.echo("(cached response; events unchanged)", err=True)
+    return markdown
+
+
+def _llm_summarize(chunks: list, label: str, model: str) -> str:
+    """
+    Map-reduce summary of event chunks; reports failures as a clean CLI error.
+    """
+    import asyncio
+
+    from services import summarize
+
+    try:
+        with _cache_session() as cache:
+            markdown, stats = asyncio.run(
+                summarize.summarize_chunks(cache, chunks, label=label, model=model)
+            )
+    except RuntimeError as exc:
+        typer.echo(str(exc), err=True)
+        raise typer.Exit(code=1)
+    typer.echo(
+        f"({stats.chunks} chunks: {stats.cached} cached, "
+        f"{stats.generated} summarized)",
+        err=True,
+    )
+    return markdown
+
+
+def _profile_startup(ctx: typer.Context, value: bool) -> None:
+    if not value or ctx.resilient_parsing:
+        return
+    import profiling
+
+    argv = [arg for arg in sys.argv[1:] if arg != "--profile-startup"]
+    typer.echo(profiling.profile_startup(argv))
+    raise typer.Exit()
+
+
+def _start_trace(ctx: typer.Context, echo: bool, trace_file: Optional[Path]) -> None:
+    import instrumentation
+    import serializers
+
+    command = " ".join([ctx.invoked_subcommand or "", *ctx.args]).strip()
+    instrumentation.start(command)
+
+    def finish() -> None:
+        trace = instrumentation.stop()
+        if trace is None:
+            return
+        if echo:
+            typer.echo(instrumentation.format_report(trace), err=True)
+        if trace_file:
+            trace_file.write_text(
+                serializers.dumps(trace.to_dict(), indent=True, default=str)
+            )
+
+    ctx.call_on_close(finish)
+
+
+@app.callback()
+def root(
+    ctx: typer.Context,
+    profile_startup: Annotated[
+        bool,
+        typer.Option(
+            "--profile-startup",
+            is_eager=True,
+            callback=_profile_startup,
+            help=(
+                "Run the rest of the command line under `python -X importtime` "
+                "and report where startup time goes. The command really runs."
+            ),
+        ),
+    ] = False,
+    trace: Annotated[
+        bool,
+        typer.Option(
+            "--trace",
+            help=(
+                "Report SQL statements, rows and time per service call "
+                "on stderr when the command finishes."
+            ),
+        ),
+    ] = False,
+    trace_file: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--trace-file",
+            help="Write the trace as JSON to this file (implies tracing).",
+        ),
+    ] = None,
+):
+    """
+    Local AI life tracker (workout, study, guitar, journaling).
+    """
+    if trace or trace_file:
+        _start_trace(ctx, echo=trace, trace_file=trace_file)
+
+
 def main():
-    Base.metadata.create_all(db.get_engine())
+    import daemon
+
+    exit_code = daemon.forward(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
     app()
 
 
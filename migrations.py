@@ -0,0 +1,282 @@
+"""
+Schema versioning for the ForgeLog database.
+
+`Base.metadata.create_all` only creates missing tables; it never touches
+tables that already exist, so new indexes/columns on an existing
+forgelog.sqlite need an explicit step. The applied version is stored in
+SQLite's `PRAGMA user_version` and each step runs once, in order.
+"""
+
+import re
+import sqlite3
+import time
+from typing import Callable
+
+from sqlalchemy import Connection, DateTime, Engine, inspect, text
+
+from config import to_local
+from model import Base
+
+#################
+##### STEPS #####
+#################
+
+# Each step is pinned to the schema of its own version: it runs raw SQL
+# against the tables as they were then, never the current models or
+# services, which may need columns a later step adds.
+
+V1_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_event_timestamp ON event (timestamp)",
+    "CREATE INDEX IF NOT EXISTS ix_event_type_timestamp ON event (type, timestamp)",
+    "CREATE INDEX IF NOT EXISTS ix_event_metric_name_event_id "
+    "ON event_metric (name, event_id)",
+    "CREATE INDEX IF NOT EXISTS ix_event_tag_tag_id ON event_tag (tag_id)",
+]
+
+# Rollups over event_metric only (there are no series before version 6),
+# by the given day expression.
+ROLLUP_BACKFILL_SQL = """
+    INSERT INTO daily_metric_rollup
+        (day, event_type, metric_name, unit, count, sum, min, max)
+    SELECT {day}, event.type, event_metric.name, max(event_metric.unit),
+        count(*), sum(event_metric.value), min(event_metric.value),
+        max(event_metric.value)
+    FROM event_metric JOIN event ON event.id = event_metric.event_id
+    GROUP BY 1, event.type, event_metric.name
+"""
+
+V4_SEARCH = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS event_fts USING fts5(
+        title, notes, raw_text,
+        content='event', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2',
+        prefix='2 3 4'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_fts_ai AFTER INSERT ON event BEGIN
+        INSERT INTO event_fts (rowid, title, notes, raw_text)
+        VALUES (new.id, new.title, new.notes, new.raw_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_fts_ad AFTER DELETE ON event BEGIN
+        INSERT INTO event_fts (event_fts, rowid, title, notes, raw_text)
+        VALUES ('delete', old.id, old.title, old.notes, old.raw_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_fts_au
+    AFTER UPDATE OF title, notes, raw_text ON event BEGIN
+        INSERT INTO event_fts (event_fts, rowid, title, notes, raw_text)
+        VALUES ('delete', old.id, old.title, old.notes, old.raw_text);
+        INSERT INTO event_fts (rowid, title, notes, raw_text)
+        VALUES (new.id, new.title, new.notes, new.raw_text);
+    END
+    """,
+]
+
+V6_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS metric_name (
+        id INTEGER NOT NULL,
+        name VARCHAR(25) NOT NULL,
+        unit VARCHAR(10),
+        PRIMARY KEY (id),
+        UNIQUE (name, unit)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS event_metric_series (
+        id INTEGER NOT NULL,
+        event_id INTEGER NOT NULL,
+        metric_name_id INTEGER NOT NULL,
+        start_time DATETIME NOT NULL,
+        interval_s FLOAT NOT NULL,
+        samples BLOB NOT NULL,
+        count INTEGER NOT NULL,
+        sum FLOAT NOT NULL,
+        min FLOAT NOT NULL,
+        max FLOAT NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(event_id) REFERENCES event (id),
+        FOREIGN KEY(metric_name_id) REFERENCES metric_name (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_event_metric_series_event_id "
+    "ON event_metric_series (event_id)",
+    "CREATE INDEX IF NOT EXISTS ix_event_metric_series_metric_name_id "
+    "ON event_metric_series (metric_name_id)",
+]
+
+
+def _create_missing_indexes(conn: Connection) -> None:
+    for ddl in V1_INDEXES:
+        conn.exec_driver_sql(ddl)
+
+
+def _backfill_rollups(conn: Connection) -> None:
+    # UTC days until step 3 adds event.local_date
+    conn.exec_driver_sql("DELETE FROM daily_metric_rollup")
+    conn.exec_driver_sql(ROLLUP_BACKFILL_SQL.format(day="date(event.timestamp)"))
+
+
+def _add_event_local_date(conn: Connection) -> None:
+    columns = {c["name"] for c in inspect(conn).get_columns("event")}
+    if "local_date" not in columns:
+        conn.exec_driver_sql("ALTER TABLE event ADD COLUMN local_date DATE")
+    # DST rules come from zoneinfo, so the dates are computed here
+    rows = conn.execute(
+        text("SELECT id, timestamp FROM event").columns(timestamp=DateTime())
+    ).all()
+    if rows:
+        conn.execute(
+            text("UPDATE event SET local_date = :day WHERE id = :event_id"),
+            [
+                {"event_id": event_id, "day": to_local(timestamp).date().isoformat()}
+                for event_id, timestamp in rows
+            ],
+        )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_event_local_date_timestamp "
+        "ON event (local_date, timestamp)"
+    )
+    # rollups move from UTC days to local days
+    conn.exec_driver_sql("DELETE FROM daily_metric_rollup")
+    conn.exec_driver_sql(ROLLUP_BACKFILL_SQL.format(day="event.local_date"))
+
+
+def _create_event_search(conn: Connection) -> None:
+    for ddl in V4_SEARCH:
+        conn.exec_driver_sql(ddl)
+    conn.exec_driver_sql("INSERT INTO event_fts (event_fts) VALUES ('rebuild')")
+
+
+def _seed_day_generations(conn: Connection) -> None:
+    # start every existing day at a fresh generation, so a range cache kept
+    # from another database at this path is never taken as current
+    conn.execute(
+        text(
+            "INSERT INTO day_generation (day, generation) "
+            "SELECT DISTINCT local_date, :now FROM event "
+            "WHERE local_date IS NOT NULL "
+            "ON CONFLICT (day) DO UPDATE "
+            "SET generation = max(generation + 1, excluded.generation)"
+        ),
+        {"now": time.time_ns() // 1000},
+    )
+
+
+def _create_metric_series(conn: Connection) -> None:
+    for ddl in V6_TABLES:
+        conn.exec_driver_sql(ddl)
+
+
+# (version, step) pairs; append new steps, never reorder or edit old ones.
+MIGRATIONS: list[tuple[int, Callable[[Connection], None]]] = [
+    (1, _create_missing_indexes),
+    (2, _backfill_rollups),
+    (3, _add_event_local_date),
+    (4, _create_event_search),
+    (5, _seed_day_generations),
+    (6, _create_metric_series),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+#####################
+##### MIGRATING #####
+#####################
+
+
+def get_schema_version(conn: Connection) -> int:
+    return conn.exec_driver_sql("PRAGMA user_version").scalar() or 0
+
+
+def on_disk_version(path: str) -> int:
+    """
+    Cheap startup check: read user_version with the stdlib driver, without
+    reflecting any tables. A missing database reports version 0.
+    """
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    except sqlite3.OperationalError:
+        return 0
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def migrate(engine: Engine) -> int:
+    """
+    Create missing tables, then apply every pending migration step.
+    Returns the schema version the database ends up at.
+    """
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        version = get_schema_version(conn)
+        for target, step in MIGRATIONS:
+            if version < target:
+                step(conn)
+                conn.exec_driver_sql(f"PRAGMA user_version = {target}")
+                version = target
+    return version
+
+
+############################
+##### QUERY PLAN CHECK #####
+############################
+
+# Representative hot-path queries. Each must be answered through an index;
+# a plain "SCAN <table>" in its plan means a regression to a full scan
+# ("SCAN <table> USING [COVERING] INDEX ..." still goes through an index).
+PLAN_CHECKS: dict[str, tuple[str, dict]] = {
+    "events in range": (
+        "SELECT * FROM event WHERE local_date BETWEEN :start AND :end "
+        "ORDER BY timestamp, id",
+        {"start": "2000-01-01", "end": "2000-01-02"},
+    ),
+    "event page after cursor": (
+        "SELECT * FROM event WHERE (timestamp, id) > (:timestamp, :id) "
+        "ORDER BY timestamp, id LIMIT 51",
+        {"timestamp": "2000-01-01 00:00:00", "id": 1},
+    ),
+    "events of type in range": (
+        "SELECT * FROM event WHERE type = :type "
+        "AND timestamp >= :start AND timestamp < :end",
+        {"type": "WORKOUT", "start": "2000-01-01", "end": "2000-01-02"},
+    ),
+    "metrics by name": (
+        "SELECT event_id, value FROM event_metric WHERE name = :name",
+        {"name": "pushups"},
+    ),
+    "series by event": (
+        "SELECT * FROM event_metric_series WHERE event_id IN (:first, :second)",
+        {"first": 1, "second": 2},
+    ),
+    "events by tag": (
+        "SELECT event_id FROM event_tag WHERE tag_id = :tag_id",
+        {"tag_id": 1},
+    ),
+}
+
+
+_TABLE_SCAN = re.compile(r"SCAN \w+$")
+
+
+def check_query_plans(engine: Engine) -> list[str]:
+    """
+    Run EXPLAIN QUERY PLAN for each entry in PLAN_CHECKS and return a
+    description of every query that falls back to a full table scan.
+    """
+    problems = []
+    with engine.connect() as conn:
+        for name, (sql, params) in PLAN_CHECKS.items():
+            plan = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).all()
+            for row in plan:
+                if _TABLE_SCAN.match(row.detail):
+                    problems.append(f"{name}: {row.detail}")
+    return problems
@@ -1,7 +1,19 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, Enum, ForeignKey, String, Text, Boolean, Date, func
+from sqlalchemy import (
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+    Boolean,
+    Date,
+    func,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 from config import EventTypes
@@ -13,10 +25,17 @@ class Base(DeclarativeBase):
 
 class Event(Base):
     __tablename__ = "event"
+    __table_args__ = (
+        Index("ix_event_type_timestamp", "type", "timestamp"),
+        Index("ix_event_local_date_timestamp", "local_date", "timestamp"),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
     timestamp: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False, server_default=func.now()
+        DateTime(timezone=True), nullable=False, server_default=func.now(), index=True
     )
+    # The timestamp's calendar day in config.user_timezone, set at insert.
+    local_date: Mapped[date] = mapped_column(Date(), nullable=False)
     type: Mapped[EventTypes] = mapped_column(
         Enum(EventTypes, name="event_type"),
         nullable=False,
@@ -34,6 +53,9 @@ class Event(Base):
         back_populates="event",
         cascade="all, delete-orphan",
     )
+    metric_series: Mapped[list["EventMetricSeries"]] = relationship(
+        back_populates="event", cascade="all, delete-orphan"
+    )
 
     def __repr__(self) -> str:
         return (
@@ -46,6 +68,8 @@ class Event(Base):
 
 class EventMetric(Base):
     __tablename__ = "event_metric"
+    __table_args__ = (Index("ix_event_metric_name_event_id", "name", "event_id"),)
+
     id: Mapped[int] = mapped_column(primary_key=True)
     event_id: Mapped[int] = mapped_column(
         ForeignKey("event.id"), nullable=False, index=True
@@ -63,6 +87,62 @@ class EventMetric(Base):
     )
 
 
+class MetricName(Base):
+    """
+    Interned (name, unit) pairs for EventMetricSeries, so each series row
+    stores a small integer instead of repeating the strings.
+    """
+
+    __tablename__ = "metric_name"
+    __table_args__ = (UniqueConstraint("name", "unit"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(25), nullable=False)
+    unit: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"MetricName(id={self.id!r}, name={self.name!r}, unit={self.unit!r})"
+
+
+class EventMetricSeries(Base):
+    """
+    A dense run of samples of one metric (heart rate, per-set reps, tempo)
+    taken every `interval_s` seconds from `start_time`, stored as one blob
+    of little-endian float64 values instead of one EventMetric row each.
+    count/sum/min/max are computed at insert so rollups never unpack it.
+    The samples count towards the event's local_date.
+    """
+
+    __tablename__ = "event_metric_series"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    event_id: Mapped[int] = mapped_column(
+        ForeignKey("event.id"), nullable=False, index=True
+    )
+    event: Mapped["Event"] = relationship(back_populates="metric_series")
+    metric_name_id: Mapped[int] = mapped_column(
+        ForeignKey("metric_name.id"), nullable=False, index=True
+    )
+    metric: Mapped["MetricName"] = relationship(lazy="joined")
+
+    start_time: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    interval_s: Mapped[float] = mapped_column(nullable=False)
+    samples: Mapped[bytes] = mapped_column(LargeBinary(), nullable=False)
+
+    count: Mapped[int] = mapped_column(nullable=False)
+    sum: Mapped[float] = mapped_column(nullable=False)
+    min: Mapped[float] = mapped_column(nullable=False)
+    max: Mapped[float] = mapped_column(nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"EventMetricSeries(id={self.id!r}, event_id={self.event_id!r}, "
+            f"metric_name_id={self.metric_name_id!r}, count={self.count!r})"
+        )
+
+
 class Tag(Base):
     __tablename__ = "tag"
 
@@ -101,6 +181,8 @@ class EventTag(Base):
     tag_id: Mapped[int] = mapped_column(
         ForeignKey("tag.id"),
         primary_key=True,
+        # the PK only covers tag_id as its second column
+        index=True,
     )
 
     created_at: Mapped[datetime] = mapped_column(
@@ -116,6 +198,36 @@ class EventTag(Base):
         return f"EventTag(event_id={self.event_id!r}, tag_id={self.tag_id!r})"
 
 
+class DailyMetricRollup(Base):
+    """
+    Per-day aggregate of EventMetric values.
+    Kept in step with every write by services.rollups.
+    """
+
+    __tablename__ = "daily_metric_rollup"
+    __table_args__ = (
+        Index("ix_daily_metric_rollup_metric_name_day", "metric_name", "day"),
+    )
+
+    day: Mapped[date] = mapped_column(Date(), primary_key=True)
+    event_type: Mapped[EventTypes] = mapped_column(
+        Enum(EventTypes, name="event_type"), primary_key=True
+    )
+    metric_name: Mapped[str] = mapped_column(String(25), primary_key=True)
+    unit: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)
+
+    count: Mapped[int] = mapped_column(nullable=False)
+    sum: Mapped[float] = mapped_column(nullable=False)
+    min: Mapped[float] = mapped_column(nullable=False)
+    max: Mapped[float] = mapped_column(nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"DailyMetricRollup(day={self.day!r}, event_type={self.event_type!r}, "
+            f"metric_name={self.metric_name!r}, sum={self.sum!r})"
+        )
+
+
 class Goal(Base):
     __tablename__ = "goal"
 
@@ -155,3 +267,81 @@ class Goal(Base):
             f"metric_name={self.metric_name!r}, period={self.period!r}, "
             f"target_value={self.target_value!r}, is_active={self.is_active!r})"
         )
+
+
+class DayGeneration(Base):
+    """
+    Write generation per local day: bumped by services.range_cache.touch_days
+    in the same transaction as every write that changes the day's events, so
+    cached results for other days stay valid. Days without a row have never
+    been written since the table was created and were empty then.
+    """
+
+    __tablename__ = "day_generation"
+
+    day: Mapped[date] = mapped_column(Date(), primary_key=True)
+    # microseconds since the epoch of the last write, strictly increasing
+    # per day, so generations never repeat even across a recreated database
+    generation: Mapped[int] = mapped_column(nullable=False)
+
+    def __repr__(self) -> str:
+        return f"DayGeneration(day={self.day!r}, generation={self.generation!r})"
+
+
+# --------------------
+# Cache database (config.cache_path)
+# --------------------
+
+
+class CacheBase(DeclarativeBase):
+    """
+    Tables of the disposable cache database. Deleting the file is always safe.
+    """
+
+
+class LlmResponse(CacheBase):
+    """
+    Content-addressed LLM output: `key` hashes the normalized payload,
+    model name and prompt template that produced `response`.
+    """
+
+    __tablename__ = "llm_response"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    response: Mapped[str] = mapped_column(Text(), nullable=False)
+    size_bytes: Mapped[int] = mapped_column(nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    last_used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), index=True
+    )
+
+    def __repr__(self) -> str:
+        return f"LlmResponse(key={self.key!r}, model={self.model!r})"
+
+
+class RangeCacheDay(CacheBase):
+    """
+    One local day of serialized range-query results (msgpack), valid while
+    `generation` matches the day's DayGeneration in the main database.
+    `variant` names the query and schema version that produced it.
+    """
+
+    __tablename__ = "range_cache_day"
+
+    variant: Mapped[str] = mapped_column(String(100), primary_key=True)
+    day: Mapped[date] = mapped_column(Date(), primary_key=True)
+    generation: Mapped[int] = mapped_column(nullable=False)
+    payload: Mapped[bytes] = mapped_column(LargeBinary(), nullable=False)
+    size_bytes: Mapped[int] = mapped_column(nullable=False)
+    last_used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), index=True
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"RangeCacheDay(variant={self.variant!r}, day={self.day!r}, "
+            f"generation={self.generation!r})"
+        )
@@ -0,0 +1,56 @@
+"""
+Startup profiling for the `ai` CLI (`ai --profile-startup ...`).
+"""
+
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def profile_startup(argv: list[str], top: int = 15) -> str:
+    """
+    Run `main.py <argv>` in a fresh interpreter with `-X importtime` and
+    summarize the import cost: total wall time, heaviest top-level packages
+    (by self time) and heaviest individual modules (by cumulative time).
+    """
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", MAIN_PATH, *argv],
+        capture_output=True,
+        text=True,
+        stdin=subprocess.DEVNULL,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    modules = []  # (self_us, cumulative_us, name, depth)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((int(self_us), int(cumulative_us), name.strip(), depth))
+
+    by_package: dict[str, int] = defaultdict(int)
+    for self_us, _, name, _ in modules:
+        by_package[name.split(".")[0]] += self_us
+    imports_ms = sum(m[0] for m in modules) / 1000
+
+    lines = [
+        f"ai {' '.join(argv)}".rstrip(),
+        f"  exit code:   {proc.returncode}",
+        f"  wall time:   {wall_ms:8.1f} ms (fresh interpreter)",
+        f"  imports:     {imports_ms:8.1f} ms across {len(modules)} modules",
+        "",
+        "  top packages (self time):",
+    ]
+    for package, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]:
+        lines.append(f"    {us / 1000:8.1f} ms  {package}")
+    lines += ["", "  top-level imports (cumulative):"]
+    roots = [m for m in modules if m[3] == 0]
+    for _, cumulative_us, name, _ in sorted(roots, key=lambda m: -m[1])[:top]:
+        lines.append(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+    return "\n".join(lines)
@@ -1,13 +1,21 @@
-import json
-from datetime import datetime, timezone
+import csv
+import re
+from datetime import date, datetime, timezone
+from pathlib import Path
 from sqlalchemy.orm import Session
-from typing import Iterable, Optional
+from typing import IO, Iterable, Iterator, Optional
 
-from model import Event, EventMetric, Tag
+import serializers
+from config import TimeRange, to_local
+from instrumentation import traced
+from model import Event, EventMetric, EventMetricSeries, Tag
 from services import events
 
 # --- serialization helpers ---
 
+# Event dicts keep datetimes as datetime objects; serializers.dumps/packb
+# render them (as isoformat text) while encoding.
+
 
 def event_metric_to_dict(m: EventMetric) -> dict:
     return {
@@ -16,7 +24,7 @@ def event_metric_to_dict(m: EventMetric) -> dict:
         "name": m.name,
         "value": m.value,
         "unit": m.unit,
-        "created_at": m.created_at.isoformat() if m.created_at else None,
+        "created_at": m.created_at,
     }
 
 
@@ -25,57 +33,335 @@ def tag_to_dict(t: Tag) -> dict:
         "id": t.id,
         "name": t.name,
         "color": t.color,
-        "created_at": t.created_at.isoformat() if t.created_at else None,
+        "created_at": t.created_at,
     }
 
 
-def event_to_dict(e: Event) -> dict:
+def metric_series_to_dict(s: EventMetricSeries) -> dict:
     return {
+        "id": s.id,
+        "event_id": s.event_id,
+        "name": s.metric.name,
+        "unit": s.metric.unit,
+        "start": s.start_time,
+        "interval_s": s.interval_s,
+        "values": events.unpack_samples(s.samples),
+    }
+
+
+def event_to_dict(e: Event) -> dict:
+    d = {
         "id": e.id,
-        "timestamp": e.timestamp.isoformat() if e.timestamp else None,
+        "timestamp": e.timestamp,
         "type": e.type.value if hasattr(e.type, "value") else str(e.type),
         "title": e.title,
         "raw_text": e.raw_text,
         "notes": e.notes,
-        "created_at": e.created_at.isoformat() if e.created_at else None,
+        "created_at": e.created_at,
         "metrics": [event_metric_to_dict(m) for m in e.metrics],
         "tags": [tag_to_dict(et.tag) for et in e.event_tags if et.tag],
     }
+    # like the Core read path, only events with sample series get the key
+    if e.metric_series:
+        d["series"] = [metric_series_to_dict(s) for s in e.metric_series]
+    return d
 
 
 # --- GENERAL formatter ---
 
 
+@traced
 def format_events_as_json(
-    events: Iterable[Event],
+    events: Iterable[Event | dict],
     *,
     label: Optional[str] = None,
 ) -> str:
     """
-    Format an iterable of Event objects (with relationships loaded)
-    into a JSON string that is easy for LLMs to consume.
+    Format an iterable of Event objects (with relationships loaded), or of
+    event dicts from the services.events Core read path, into a JSON string
+    that is easy for LLMs to consume.
     """
     events_list = list(events)
+    return "".join(
+        iter_events_as_json(events_list, label=label, event_count=len(events_list))
+    )
+
+
+def iter_events_as_json(
+    events: Iterable[Event | dict],
+    *,
+    label: Optional[str] = None,
+    event_count: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Yield the same document as `format_events_as_json` piece by piece,
+    serializing one event at a time.
 
-    payload = {
+    When `event_count` is known up front it is written in the envelope as
+    usual; otherwise it is counted while streaming and written as a trailer
+    after the events.
+    """
+    header = {
         "schema_version": 1,
-        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "generated_at": datetime.now(timezone.utc),
         "label": label,  # e.g. "today", "this_week", "custom_range"
-        "event_count": len(events_list),
-        "events": [event_to_dict(e) for e in events_list],
     }
+    if event_count is not None:
+        header["event_count"] = event_count
+    # Reuse the encoder for the envelope, minus its closing brace.
+    yield serializers.dumps(header, indent=True)[:-2] + ",\n"
+
+    yield '  "events": ['
+    count = 0
+    for e in events:
+        event_dict = e if isinstance(e, dict) else event_to_dict(e)
+        event_json = serializers.dumps(event_dict, indent=True)
+        yield ("\n" if count == 0 else ",\n") + _indent(event_json, "    ")
+        count += 1
+    yield "\n  ]" if count else "]"
+
+    if event_count is None:
+        yield f',\n  "event_count": {count}'
+    yield "\n}"
+
+
+@traced
+def write_events_as_json(
+    events: Iterable[Event | dict],
+    fp: IO[str],
+    *,
+    label: Optional[str] = None,
+    event_count: Optional[int] = None,
+) -> None:
+    for chunk in iter_events_as_json(events, label=label, event_count=event_count):
+        fp.write(chunk)
+
+
+@traced
+def write_events_as_msgpack(
+    events: Iterable[Event | dict],
+    fp: IO[bytes],
+    *,
+    event_count: int,
+    label: Optional[str] = None,
+) -> None:
+    """
+    Binary counterpart of `write_events_as_json`: the same schema_version 1
+    document, msgpack-encoded and streamed one event at a time.
+    """
+    header = {
+        "schema_version": 1,
+        "generated_at": datetime.now(timezone.utc),
+        "label": label,
+        "event_count": event_count,
+    }
+    serializers.write_msgpack_document(
+        fp,
+        header,
+        "events",
+        (e if isinstance(e, dict) else event_to_dict(e) for e in events),
+        event_count,
+    )
+
 
-    return json.dumps(payload, indent=2, ensure_ascii=False)
+def _indent(text: str, prefix: str) -> str:
+    return prefix + text.replace("\n", "\n" + prefix)
+
+
+@traced
+def write_events_range_as_msgpack(
+    session: Session,
+    range: TimeRange,
+    fp: IO[bytes],
+    *,
+    label: Optional[str] = None,
+) -> None:
+    write_events_as_msgpack(
+        events.iter_event_dicts_between(session, range),
+        fp,
+        event_count=events.count_events_between(session, range),
+        label=label,
+    )
 
 
 def format_events_today_as_json(session: Session) -> str:
-    today_events = events.select_events_today(session)
+    today_events = events.select_event_dicts_between(session, TimeRange.TODAY)
     return format_events_as_json(today_events, label="today")
 
 
 def format_events_week_as_json(session: Session) -> str:
-    today_events = events.select_events_week(session)
-    return format_events_as_json(today_events, label="today")
+    week_events = events.select_event_dicts_between(session, TimeRange.WEEK)
+    return format_events_as_json(week_events, label="week")
+
+
+@traced
+def write_events_range_as_json(
+    session: Session,
+    range: TimeRange,
+    fp: IO[str],
+    *,
+    label: Optional[str] = None,
+) -> None:
+    """
+    Stream every event in `range` to `fp` without loading the range into memory.
+    """
+    write_events_as_json(
+        events.iter_event_dicts_between(session, range),
+        fp,
+        label=label,
+        event_count=events.count_events_between(session, range),
+    )
+
+
+# --- compact formatter (schema_version 2) ---
+
+# Token-lean variant for LLM payloads. Compared with schema_version 1 it drops
+# ids and created_at fields, emits each tag once in a dictionary, groups
+# events by day with "HH:MM" times, turns metrics into [name, value, unit]
+# tuples and uses no whitespace. Sample series are summarized, not listed:
+# they join the metrics as [name, mean, unit, count, min, max] tuples, and
+# the payload then names those fields in "series_fields".
+
+COMPACT_EVENT_FIELDS = ["time", "type", "title", "notes", "raw_text", "metrics", "tags"]
+COMPACT_SERIES_FIELDS = ["name", "mean", "unit", "count", "min", "max"]
+
+
+@traced
+def format_events_as_compact_json(
+    events: Iterable[Event | dict],
+    *,
+    label: Optional[str] = None,
+    columnar: bool = False,
+) -> str:
+    """
+    Row form:      {"days": [{"date": ..., "events": [[time, type, ...], ...]}]}
+    Columnar form: {"days": [dates], "columns": {"day": [day index], "time": ...}}
+    Tags are indexes into the top-level "tags" list in both forms.
+    Dates and times are local to config.user_timezone.
+    """
+    tag_index: dict[str, int] = {}
+    rows_by_day: dict[date, list[list]] = {}
+    has_series = False
+    for e in events:
+        d = e if isinstance(e, dict) else event_to_dict(e)
+        timestamp = to_local(d["timestamp"])
+        metrics = [
+            [m["name"], _compact_number(m["value"]), m["unit"]] for m in d["metrics"]
+        ]
+        for series in d.get("series", ()):
+            values = series["values"]
+            metrics.append(
+                [
+                    series["name"],
+                    _compact_number(round(sum(values) / len(values), 3)),
+                    series["unit"],
+                    len(values),
+                    _compact_number(min(values)),
+                    _compact_number(max(values)),
+                ]
+            )
+            has_series = True
+        row = [
+            f"{timestamp.hour:02d}:{timestamp.minute:02d}",
+            d["type"],
+            d["title"],
+            d["notes"],
+            d["raw_text"],
+            metrics,
+            [tag_index.setdefault(t["name"], len(tag_index)) for t in d["tags"]],
+        ]
+        rows_by_day.setdefault(timestamp.date(), []).append(row)
+
+    payload: dict = {"schema_version": 2, "label": label, "tags": list(tag_index)}
+    if columnar:
+        days = list(rows_by_day)
+        columns: dict[str, list] = {"day": []}
+        columns.update({field: [] for field in COMPACT_EVENT_FIELDS})
+        for day_idx, rows in enumerate(rows_by_day.values()):
+            for row in rows:
+                columns["day"].append(day_idx)
+                for field, value in zip(COMPACT_EVENT_FIELDS, row):
+                    columns[field].append(value)
+        payload.update(days=days, columns=columns)
+    else:
+        payload.update(
+            event_fields=COMPACT_EVENT_FIELDS,
+            metric_fields=["name", "value", "unit"],
+            days=[{"date": day, "events": rows} for day, rows in rows_by_day.items()],
+        )
+    if has_series:
+        payload["series_fields"] = COMPACT_SERIES_FIELDS
+    return serializers.dumps(payload)
+
+
+def _compact_number(value: float | None) -> float | int | None:
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def payload_stats(text: str) -> dict[str, int]:
+    """
+    Size of a payload in bytes and in approximate LLM tokens (words and
+    punctuation marks, a close proxy for BPE token counts on JSON).
+    """
+    return {
+        "bytes": len(text.encode("utf-8")),
+        "tokens": len(_TOKEN_RE.findall(text)),
+    }
+
+
+# --- import readers ---
+
+
+def read_event_records(path: Path) -> Iterator[dict]:
+    """
+    Stream event records for services.events.bulk_log_events from a file.
+
+    - .json    : a document written by format_events_as_json (ai today, exports)
+    - .msgpack : a document written by write_events_as_msgpack
+    - .jsonl   : one event_to_dict-shaped object per line
+    - .csv     : columns timestamp,type,title,raw_text,notes,metrics,tags where
+                 metrics is "name:value:unit;..." and tags is "name;name"
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".json":
+        yield from serializers.loads(path.read_bytes())["events"]
+    elif suffix == ".msgpack":
+        with path.open("rb") as fp:
+            yield from serializers.iter_msgpack_items(fp, "events")
+    elif suffix == ".jsonl":
+        with path.open(encoding="utf-8") as fp:
+            for line in fp:
+                if line.strip():
+                    yield serializers.loads(line)
+    elif suffix == ".csv":
+        with path.open(encoding="utf-8", newline="") as fp:
+            for row in csv.DictReader(fp):
+                yield _csv_row_to_record(row)
+    else:
+        raise ValueError(f"Unsupported import format: {path.suffix!r}")
+
+
+def _csv_row_to_record(row: dict[str, str]) -> dict:
+    metrics = []
+    for item in filter(None, (row.get("metrics") or "").split(";")):
+        name, value, *unit = item.split(":")
+        metrics.append(
+            {"name": name, "value": float(value), "unit": unit[0] if unit else None}
+        )
+    return {
+        "timestamp": row.get("timestamp") or None,
+        "type": row["type"],
+        "title": row.get("title") or None,
+        "raw_text": row.get("raw_text") or None,
+        "notes": row.get("notes") or None,
+        "metrics": metrics,
+        "tags": [t for t in (row.get("tags") or "").split(";") if t],
+    }
 
 
 # def format_events_today_as_json(session: Session) -> str:
@@ -0,0 +1,176 @@
+"""
+Pluggable encoders for event dumps and caches.
+
+JSON goes through orjson when it is installed and the stdlib otherwise.
+Both backends write the same structure: same key order, datetimes and
+dates as `isoformat()` text, enums as their value, UTF-8 without escaping,
+either `indent=2` or no whitespace, and NaN/Infinity as null. Event dicts
+can therefore carry raw datetime objects; nothing formats them field by
+field. Integers beyond 64 bits, which orjson rejects, fall back to the
+stdlib encoder.
+
+The text is not always byte-identical: floats in exponent notation are
+spelled `1e16` / `1e-7` by orjson and `1e+16` / `1e-07` by the stdlib.
+They decode to the same values.
+
+msgpack (binary) is used for machine-to-machine exports and caches.
+"""
+
+import json
+import math
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, BinaryIO, Callable, Iterator
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _chain_default(fallback: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    def default(obj: Any) -> Any:
+        try:
+            return _default(obj)
+        except TypeError:
+            return fallback(obj)
+
+    return default
+
+
+def _finite(obj: Any) -> Any:
+    """
+    Copy of `obj` with NaN and infinite floats replaced by None.
+    """
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+################
+##### JSON #####
+################
+
+
+def dumps(
+    obj: Any,
+    *,
+    indent: bool = False,
+    sort_keys: bool = False,
+    default: Callable[[Any], Any] | None = None,
+) -> str:
+    """
+    `indent=True` matches json.dumps(indent=2); otherwise no whitespace.
+    `default` encodes objects the built-in rules (datetimes, enums) don't.
+    """
+    if default is not None:
+        default = _chain_default(default)
+    else:
+        default = _default
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=default, option=option).decode("utf-8")
+        except orjson.JSONEncodeError:
+            # e.g. an int beyond 64 bits; a truly unserializable object
+            # raises again below
+            pass
+    kwargs = dict(
+        default=default,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        sort_keys=sort_keys,
+        allow_nan=False,
+    )
+    try:
+        return json.dumps(obj, **kwargs)
+    except ValueError as e:
+        if "Out of range float" not in str(e):
+            raise
+        # NaN/Infinity: write null like orjson instead of invalid JSON
+        return json.dumps(_finite(obj), **kwargs)
+
+
+def loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+###################
+##### MSGPACK #####
+###################
+
+
+def packb(obj: Any) -> bytes:
+    import msgpack
+
+    return msgpack.packb(obj, default=_default, use_bin_type=True)
+
+
+def unpackb(data: bytes) -> Any:
+    import msgpack
+
+    return msgpack.unpackb(data, raw=False)
+
+
+def write_msgpack_document(
+    fp: BinaryIO,
+    header: dict[str, Any],
+    items_key: str,
+    items: Iterator[Any],
+    item_count: int,
+) -> None:
+    """
+    Stream a map of `header` fields plus `items_key` -> array of `items`
+    without building the array in memory (its length must be known).
+    """
+    import msgpack
+
+    packer = msgpack.Packer(default=_default, use_bin_type=True)
+    fp.write(packer.pack_map_header(len(header) + 1))
+    for key, value in header.items():
+        fp.write(packer.pack(key))
+        fp.write(packer.pack(value))
+    fp.write(packer.pack(items_key))
+    fp.write(packer.pack_array_header(item_count))
+    written = 0
+    for item in items:
+        fp.write(packer.pack(item))
+        written += 1
+    if written != item_count:
+        raise ValueError(f"expected {item_count} items, wrote {written}")
+
+
+def iter_msgpack_items(fp: BinaryIO, items_key: str) -> Iterator[Any]:
+    """
+    Stream the `items_key` array back out of a `write_msgpack_document` file.
+    """
+    import msgpack
+
+    unpacker = msgpack.Unpacker(fp, raw=False)
+    for _ in range(unpacker.read_map_header()):
+        if unpacker.unpack() == items_key:
+            for _ in range(unpacker.read_array_header()):
+                yield unpacker.unpack()
+        else:
+            unpacker.skip()
@@ -0,0 +1,192 @@
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from typing import TYPE_CHECKING
+
+import numpy as np
+from sqlalchemy import Integer, cast, func, select
+from sqlalchemy.orm import Session
+
+from config import TimeRange
+from instrumentation import traced
+from model import DailyMetricRollup
+from services.events import get_range_bounds
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# Range analytics are computed from daily_metric_rollup (at most one row per
+# metric per day) loaded straight into NumPy arrays, never from ORM objects.
+# The query also covers the history before the range (the previous period,
+# and at least a rolling window), so period-over-period deltas and rolling
+# means come from the same single round trip.
+
+ROLLING_WINDOW_DAYS = 7
+
+
+@dataclass
+class MetricSummary:
+    name: str
+    unit: str | None
+    total: float
+    count: int
+    daily_mean: float
+    previous_total: float
+    delta: float
+    delta_pct: float | None
+    active_days: int
+    current_streak: int
+    longest_streak: int
+    daily: list[float] = field(repr=False)
+    weekly: list[float] = field(repr=False)
+    rolling_mean: list[float] = field(repr=False)
+
+
+@dataclass
+class RangeAnalysis:
+    label: str
+    start: date
+    end: date
+    metrics: list[MetricSummary]
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+    def to_dict(self) -> dict:
+        """
+        Compact, JSON-ready form for LLM prompts.
+        """
+        return {
+            "label": self.label,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "metrics": [asdict(m) for m in self.metrics],
+        }
+
+
+@traced
+def analyze_range(session: Session, range: TimeRange) -> RangeAnalysis:
+    start, end = get_range_bounds(range)
+    n_days = (end - start).days + 1
+    history = max(n_days, ROLLING_WINDOW_DAYS)
+
+    names, units, day_idx, sums, counts = _load_rollups(
+        session, start - timedelta(days=history), end
+    )
+    label = range.name.lower()
+    if not len(names):
+        return RangeAnalysis(label=label, start=start, end=end, metrics=[])
+
+    metric_names, codes = np.unique(names, return_inverse=True)
+    n_metrics = len(metric_names)
+    total_days = history + n_days
+
+    # (metric, day) matrices over history + current period
+    flat = codes * total_days + day_idx
+    size = n_metrics * total_days
+    daily_all = np.bincount(flat, weights=sums, minlength=size).reshape(
+        n_metrics, total_days
+    )
+    counts_all = np.bincount(flat, weights=counts, minlength=size).reshape(
+        n_metrics, total_days
+    )
+    previous = daily_all[:, history - n_days : history]
+    current = daily_all[:, history:]
+
+    totals = current.sum(axis=1)
+    previous_totals = previous.sum(axis=1)
+    deltas = totals - previous_totals
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta_pcts = np.where(
+            previous_totals != 0, deltas / previous_totals * 100.0, np.nan
+        )
+
+    weekly = np.add.reduceat(current, np.arange(0, n_days, 7), axis=1)
+    rolling = _rolling_mean(daily_all, ROLLING_WINDOW_DAYS)[:, history:]
+    current_streaks, longest_streaks = _streaks(current > 0)
+
+    unit_by_code = np.empty(n_metrics, dtype=object)
+    unit_by_code[codes] = units
+
+    metrics = [
+        MetricSummary(
+            name=str(metric_names[i]),
+            unit=unit_by_code[i],
+            total=float(totals[i]),
+            count=int(counts_all[i, history:].sum()),
+            daily_mean=float(totals[i] / n_days),
+            previous_total=float(previous_totals[i]),
+            delta=float(deltas[i]),
+            delta_pct=None if np.isnan(delta_pcts[i]) else float(delta_pcts[i]),
+            active_days=int((current[i] > 0).sum()),
+            current_streak=int(current_streaks[i]),
+            longest_streak=int(longest_streaks[i]),
+            daily=current[i].tolist(),
+            weekly=weekly[i].tolist(),
+            rolling_mean=rolling[i].round(3).tolist(),
+        )
+        for i in np.flatnonzero((totals != 0) | (previous_totals != 0))
+    ]
+    return RangeAnalysis(label=label, start=start, end=end, metrics=metrics)
+
+
+async def aanalyze_range(session: "AsyncSession", range: TimeRange) -> RangeAnalysis:
+    """
+    asyncio version of `analyze_range`. Use one session per concurrent
+    call; each session reads on its own connection thread.
+    """
+    return await session.run_sync(analyze_range, range)
+
+
+def _load_rollups(session: Session, start: date, end: date):
+    """
+    One query -> columnar arrays (metric name, unit, day index from `start`,
+    daily sum, daily count).
+    """
+    r = DailyMetricRollup.__table__.c
+    day_idx = cast(func.julianday(r.day) - func.julianday(start.isoformat()), Integer)
+    stmt = select(r.metric_name, r.unit, day_idx, r.sum, r["count"]).where(
+        r.day >= start, r.day <= end
+    )
+    rows = session.execute(stmt).all()
+    if not rows:
+        empty = np.array([])
+        return empty, empty, empty.astype(np.int64), empty, empty
+    names, units, days, sums, counts = zip(*rows)
+    return (
+        np.array(names, dtype=object),
+        np.array(units, dtype=object),
+        np.fromiter(days, dtype=np.int64, count=len(rows)),
+        np.fromiter(sums, dtype=np.float64, count=len(rows)),
+        np.fromiter(counts, dtype=np.float64, count=len(rows)),
+    )
+
+
+def _rolling_mean(daily: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing `window`-day mean along axis 1 (days before the data count as 0).
+    """
+    padded = np.concatenate(
+        [np.zeros((daily.shape[0], window)), np.cumsum(daily, axis=1)], axis=1
+    )
+    return (padded[:, window:] - padded[:, :-window]) / window
+
+
+def _streaks(active: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per row of a (metric, day) boolean matrix: the run of active days ending
+    on the last day, and the longest run.
+    """
+    n_rows, n_days = active.shape
+    edges = np.diff(np.pad(active, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+    starts = np.argwhere(edges == 1)
+    ends = np.argwhere(edges == -1)
+    lengths = ends[:, 1] - starts[:, 1]
+
+    longest = np.zeros(n_rows, dtype=np.int64)
+    np.maximum.at(longest, starts[:, 0], lengths)
+
+    current = np.zeros(n_rows, dtype=np.int64)
+    ends_today = ends[:, 1] == n_days
+    current[starts[ends_today, 0]] = lengths[ends_today]
+    return current, longest
@@ -1,16 +1,137 @@
-from datetime import datetime, timezone, timedelta
-from sqlalchemy import select
-from typing import List
+import base64
+import sys
+from array import array
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from itertools import islice
+from sqlalchemy import (
+    String,
+    bindparam,
+    func,
+    insert,
+    select,
+    tuple_,
+    type_coerce,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, Sequence
 from sqlalchemy.orm import Session, selectinload
 
-from config import EventTypes, GuitarFocus, TimeRange, get_date
-from model import Event, EventMetric, EventTag
+from config import (
+    EventTypes,
+    GuitarFocus,
+    TimeRange,
+    get_date,
+    import_batch_size,
+    to_local,
+    today_local,
+    user_timezone,
+)
+from instrumentation import note, traced
+from model import Event, EventMetric, EventMetricSeries, EventTag, MetricName, Tag
+from services import range_cache, rollups
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# Core tables for the bulk write and read-only paths.
+event_table = Event.__table__
+metric_table = EventMetric.__table__
+series_table = EventMetricSeries.__table__
+metric_name_table = MetricName.__table__
+event_tag_table = EventTag.__table__
+tag_table = Tag.__table__
+
 
 ###################
 ##### LOGGING #####
 ###################
 
 
+@dataclass
+class LoggedEvent:
+    """
+    An event as written by `log_events`. Built from INSERT ... RETURNING,
+    server defaults included, so no post-commit refresh is needed.
+    """
+
+    id: int
+    timestamp: datetime
+    local_date: date
+    type: EventTypes
+    title: str | None
+    notes: str | None
+    created_at: datetime
+    metrics: list[dict[str, Any]] = field(default_factory=list)
+    tags: list[str] = field(default_factory=list)
+    series: list[dict[str, Any]] = field(default_factory=list)
+
+
+WORKOUT_UNITS = {
+    "dips": "rep",
+    "planks": "sec",
+    "pushups": "rep",
+    "pullups": "rep",
+    "rows": "rep",
+    "squats": "rep",
+    "situps": "rep",
+}
+
+
+@traced
+def log_event(
+    session: Session,
+    type: EventTypes,
+    metrics: Iterable[dict[str, Any]] = (),
+    tags: Iterable[str | dict[str, Any]] = (),
+    notes: str | None = None,
+    *,
+    title: str | None = None,
+    timestamp: datetime | None = None,
+    series: Iterable[dict[str, Any]] = (),
+) -> LoggedEvent:
+    """
+    Log one event with its metrics ({"name", "value", "unit"} dicts), tags
+    and sample series ({"name", "unit", "start", "interval_s", "values"}
+    dicts, see EventMetricSeries) in a single transaction.
+    """
+    record = {
+        "type": type,
+        "title": title,
+        "notes": notes,
+        "timestamp": timestamp,
+        "metrics": list(metrics),
+        "tags": list(tags),
+        "series": list(series),
+    }
+    return log_events(session, [record])[0]
+
+
+@traced
+def log_events(
+    session: Session, records: Iterable[dict[str, Any]]
+) -> list[LoggedEvent]:
+    """
+    Log event records (shaped like bulk_log_events input) in one
+    transaction: one INSERT ... RETURNING for the events and one
+    executemany each for metrics, tags and tag links, whatever the number
+    of metrics.
+    """
+    records = list(records)
+    rows = _insert_event_batch(session, records)
+    session.commit()
+    return [
+        LoggedEvent(
+            **row._mapping,
+            metrics=list(record.get("metrics") or ()),
+            tags=[_tag_fields(t)["name"] for t in record.get("tags") or ()],
+            series=list(record.get("series") or ()),
+        )
+        for row, record in zip(rows, records)
+    ]
+
+
 def log_workout(
     session: Session,
     *,
@@ -24,62 +145,40 @@ def log_workout(
     situps: int | None,
     squats: int | None,
     notes: str | None,
-) -> Event:
-    title = f"workout {get_date().strftime('%d-%m-%Y')}"
-    event = Event(
-        type=EventTypes.WORKOUT,
-        title=title,
-        raw_text=None,
+) -> LoggedEvent:
+    counts = {
+        "dips": dips,
+        "planks": planks,
+        "pushups": pushups,
+        "pullups": pullups,
+        "rows": rows,
+        "squats": squats,
+        "situps": situps,
+    }
+    metrics = [
+        {"name": name, "value": value, "unit": WORKOUT_UNITS[name]}
+        for name, value in counts.items()
+        if value
+    ]
+    return log_event(
+        session,
+        EventTypes.WORKOUT,
+        metrics,
         notes=notes,
+        title=f"workout {today_local().strftime('%d-%m-%Y')}",
     )
-    session.add(event)
-    session.flush()
-
-    ## create and append metrics
-    if dips:
-        append_workout_metric(event, "dips", dips, "rep")
-    if planks:
-        append_workout_metric(event, "planks", planks, "sec")
-    if pushups:
-        append_workout_metric(event, "pushups", pushups, "rep")
-    if pullups:
-        append_workout_metric(event, "pullups", pullups, "rep")
-    if rows:
-        append_workout_metric(event, "rows", rows, "rep")
-    if squats:
-        append_workout_metric(event, "squats", squats, "rep")
-    if situps:
-        append_workout_metric(event, "situps", situps, "rep")
-
-    session.commit()
-    session.refresh(event)
-    return event
-
-
-def append_workout_metric(event: Event, name: str, value: int, unit: str):
-    event.metrics.append(EventMetric(name=name, value=value, unit=unit))
 
 
 def log_guitar(
     session: Session, name: GuitarFocus, value: float | None, notes: str | None
-) -> Event:
-    title = f"guitar {get_date().strftime('%d-%m-%Y')}"
-    event = Event(
-        type=EventTypes.GUITAR,
-        title=title,
-        raw_text=None,
+) -> LoggedEvent:
+    return log_event(
+        session,
+        EventTypes.GUITAR,
+        [{"name": f"guitar_{name.value}", "value": value, "unit": "min"}],
         notes=notes,
+        title=f"guitar {today_local().strftime('%d-%m-%Y')}",
     )
-    session.add(event)
-    session.flush()
-
-    event.metrics.append(
-        EventMetric(name=f"guitar_{name.value}", value=value, unit="min")
-    )
-
-    session.commit()
-    session.refresh(event)
-    return event
 
 
 def log_activity(
@@ -87,69 +186,579 @@ def log_activity(
     name: str,
     value: float | None,
     notes: str | None,
-) -> Event:
-    title = f"{name} {get_date().strftime('%d-%m-%Y')}"
-    event = Event(
-        type=EventTypes.ACTIVITY,
-        title=title,
-        raw_text=None,
+) -> LoggedEvent:
+    return log_event(
+        session,
+        EventTypes.ACTIVITY,
+        [{"name": name, "value": value, "unit": None}],
         notes=notes,
+        title=f"{name} {today_local().strftime('%d-%m-%Y')}",
     )
-    session.add(event)
-    session.flush()
 
-    event.metrics.append(EventMetric(name=name, value=value))
 
+@traced
+def delete_event(session: Session, event_id: int) -> bool:
+    """
+    Delete an event with its metrics and tag links. Returns False if no
+    event has that id.
+    """
+    event = session.get(Event, event_id)
+    if event is None:
+        return False
+    day = event.local_date
+    session.delete(event)
+    session.flush()
+    rollups.recompute_days(session, [day])
+    range_cache.touch_days(session, [day])
     session.commit()
-    session.refresh(event)
-    return event
+    return True
 
 
-#####################
-##### SELECTING #####
-#####################
+@traced
+def rebuild_local_dates(session: Session) -> int:
+    """
+    Recompute Event.local_date in config.user_timezone, e.g. after the
+    timezone changed. DST rules come from zoneinfo, which SQLite does not
+    have, so the dates are computed here and written back in one
+    executemany. Rebuild the rollups afterwards; the caller commits.
+    Returns the number of events whose date changed.
+    """
+    rows = session.execute(
+        select(event_table.c.id, event_table.c.timestamp, event_table.c.local_date)
+    ).all()
+    changes = [
+        {"event_id": event_id, "day": day}
+        for event_id, timestamp, current in rows
+        if (day := to_local(timestamp).date()) != current
+    ]
+    if changes:
+        session.execute(
+            update(event_table)
+            .where(event_table.c.id == bindparam("event_id"))
+            .values(local_date=bindparam("day")),
+            changes,
+        )
+        # both the day each event left and the one it joined
+        previous = {event_id: current for event_id, _, current in rows}
+        touched = {c["day"] for c in changes}
+        touched.update(previous[c["event_id"]] for c in changes)
+        touched.discard(None)
+        range_cache.touch_days(session, touched)
+    return len(changes)
 
 
-def get_range_bounds(
-    days: int, tz: timezone = timezone.utc
-) -> tuple[datetime, datetime]:
+########################
+##### BULK LOGGING #####
+########################
+
+
+@traced
+def bulk_log_events(
+    session: Session,
+    records: Iterable[dict[str, Any]],
+    *,
+    batch_size: int = import_batch_size,
+) -> int:
     """
-    Return (start, end) such that:
-    - end is end of today (23:59:59.999999)
-    - start is midnight of (today - (days - 1))
+    Insert event records shaped like serialization_helpers.event_to_dict
+    (ids and created_at are ignored), committing every `batch_size` events.
+
+    Each batch is one INSERT ... RETURNING for events plus one executemany
+    each for metrics, tags (upserted by name) and event_tag links.
+    Returns the number of events inserted.
     """
-    now = datetime.now(tz)
-    end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
+    total = 0
+    records = iter(records)
+    while batch := list(islice(records, batch_size)):
+        _insert_event_batch(session, batch)
+        session.commit()
+        total += len(batch)
+    return total
+
+
+def _insert_event_batch(session: Session, records: list[dict[str, Any]]) -> list[Any]:
+    """
+    Write a batch of event records without committing. Returns the inserted
+    event rows (id, timestamp, local_date, type, title, notes, created_at)
+    in record order.
+    """
+    event_rows = []
+    for r in records:
+        timestamp = _parse_timestamp(r.get("timestamp"))
+        event_rows.append(
+            {
+                "timestamp": timestamp,
+                "local_date": to_local(timestamp).date(),
+                "type": EventTypes(r["type"]),
+                "title": r.get("title"),
+                "raw_text": r.get("raw_text"),
+                "notes": r.get("notes"),
+            }
+        )
+    inserted = session.execute(
+        insert(event_table).returning(
+            event_table.c.id,
+            event_table.c.timestamp,
+            event_table.c.local_date,
+            event_table.c.type,
+            event_table.c.title,
+            event_table.c.notes,
+            event_table.c.created_at,
+            sort_by_parameter_order=True,
+        ),
+        event_rows,
+    ).all()
+    event_ids = [row.id for row in inserted]
+    range_cache.touch_days(session, {row.local_date for row in inserted})
+
+    metric_rows = [
+        {
+            "event_id": event_id,
+            "name": m["name"],
+            "value": m["value"],
+            "unit": m.get("unit"),
+        }
+        for event_id, r in zip(event_ids, records)
+        for m in r.get("metrics") or ()
+    ]
+    if metric_rows:
+        session.execute(insert(metric_table), metric_rows)
 
-    start_date = (end - timedelta(days=days - 1)).date()
-    start = datetime(
-        year=start_date.year,
-        month=start_date.month,
-        day=start_date.day,
-        tzinfo=tz,
+    event_series = [
+        (event_id, timestamp, series)
+        for event_id, timestamp, r in zip(
+            event_ids, (row.timestamp for row in inserted), records
+        )
+        for series in r.get("series") or ()
+    ]
+    if event_series:
+        _insert_series(session, event_series)
+
+    if metric_rows or event_series:
+        rollups.add_events(session, event_ids)
+
+    event_tag_names = [
+        (event_id, _tag_fields(t)) for event_id, r in zip(event_ids, records)
+        for t in r.get("tags") or ()
+    ]
+    if event_tag_names:
+        tags = {fields["name"]: fields for _, fields in event_tag_names}
+        session.execute(
+            sqlite_insert(tag_table).on_conflict_do_nothing(index_elements=["name"]),
+            list(tags.values()),
+        )
+        tag_ids = dict(
+            session.execute(
+                select(tag_table.c.name, tag_table.c.id).where(
+                    tag_table.c.name.in_(tags)
+                )
+            ).all()
+        )
+        links = {
+            (event_id, tag_ids[fields["name"]]) for event_id, fields in event_tag_names
+        }
+        session.execute(
+            insert(event_tag_table),
+            [{"event_id": e, "tag_id": t} for e, t in sorted(links)],
+        )
+    return inserted
+
+
+def _insert_series(
+    session: Session, event_series: list[tuple[int, datetime, dict[str, Any]]]
+) -> None:
+    """
+    Pack and insert (event id, event timestamp, series record) triples; a
+    series without a start begins at its event's timestamp.
+    """
+    name_ids = intern_metric_names(
+        session, {(s["name"], s.get("unit")) for _, _, s in event_series}
     )
+    rows = []
+    for event_id, timestamp, s in event_series:
+        samples = array("d", s["values"])
+        if not samples:
+            raise ValueError(f"Metric series {s['name']!r} has no values")
+        rows.append(
+            {
+                "event_id": event_id,
+                "metric_name_id": name_ids[s["name"], s.get("unit")],
+                "start_time": (
+                    _parse_timestamp(s["start"]) if s.get("start") else timestamp
+                ),
+                "interval_s": float(s["interval_s"]),
+                "samples": pack_samples(samples),
+                "count": len(samples),
+                "sum": sum(samples),
+                "min": min(samples),
+                "max": max(samples),
+            }
+        )
+    session.execute(insert(series_table), rows)
+
+
+def intern_metric_names(
+    session: Session, names: Iterable[tuple[str, str | None]]
+) -> dict[tuple[str, str | None], int]:
+    """
+    Ids of (name, unit) pairs in the metric_name dictionary, adding the
+    missing ones. (A unique constraint cannot dedupe NULL units, so this
+    looks them up first; the caller's write transaction keeps it atomic.)
+    """
+    wanted = set(names)
+    ids = {
+        (name, unit): name_id
+        for name, unit, name_id in session.execute(
+            select(
+                metric_name_table.c.name,
+                metric_name_table.c.unit,
+                metric_name_table.c.id,
+            ).where(metric_name_table.c.name.in_({name for name, _ in wanted}))
+        )
+    }
+    missing = sorted(wanted - ids.keys(), key=lambda pair: (pair[0], pair[1] or ""))
+    if missing:
+        inserted = session.execute(
+            insert(metric_name_table).returning(
+                metric_name_table.c.name,
+                metric_name_table.c.unit,
+                metric_name_table.c.id,
+                sort_by_parameter_order=True,
+            ),
+            [{"name": name, "unit": unit} for name, unit in missing],
+        )
+        ids.update(((name, unit), name_id) for name, unit, name_id in inserted)
+    return ids
+
+
+def pack_samples(values: Iterable[float]) -> bytes:
+    """
+    Encode samples as the little-endian float64 blob EventMetricSeries stores.
+    """
+    samples = values if isinstance(values, array) else array("d", values)
+    if sys.byteorder == "big":
+        samples = array("d", samples)
+        samples.byteswap()
+    return samples.tobytes()
 
-    return start, end
 
+def unpack_samples(blob: bytes) -> list[float]:
+    samples = array("d")
+    samples.frombytes(blob)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples.tolist()
 
+
+def _parse_timestamp(value: str | datetime | None) -> datetime:
+    """
+    Timestamps are stored as naive UTC, like the func.now() server default.
+    """
+    if value is None:
+        return get_date().replace(tzinfo=None)
+    ts = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def _tag_fields(tag: str | dict[str, Any]) -> dict[str, Any]:
+    if isinstance(tag, str):
+        return {"name": tag, "color": None}
+    return {"name": tag["name"], "color": tag.get("color")}
+
+
+#####################
+##### SELECTING #####
+#####################
+
+
+def get_range_bounds(days: int, tz: tzinfo = user_timezone) -> tuple[date, date]:
+    """
+    Return the inclusive (first, last) local dates of a range of `days`
+    calendar days ending today in `tz`. Queries compare them against
+    Event.local_date, so both ends are whole days and use its index.
+    """
+    end = datetime.now(tz).date()
+    return end - timedelta(days=days - 1), end
+
+
+@traced
 def select_events_between(
     session: Session,
     range: TimeRange,
 ) -> List[Event]:
     start, end = get_range_bounds(range)
-    print(start)
-    print(end)
+    note("range_bounds", days=int(range), start=start, end=end)
     stmt = (
         select(Event)
-        .where(Event.timestamp >= start, Event.timestamp < end)
+        .where(Event.local_date.between(start, end))
+        .order_by(Event.timestamp, Event.id)
         .options(
             selectinload(Event.metrics),
             selectinload(Event.event_tags).selectinload(EventTag.tag),
+            selectinload(Event.metric_series),
         )
     )
     return list(session.scalars(stmt).all())
 
 
+@traced
+def count_events_between(session: Session, range: TimeRange) -> int:
+    start, end = get_range_bounds(range)
+    stmt = select(func.count(Event.id)).where(Event.local_date.between(start, end))
+    return session.scalar(stmt) or 0
+
+
+############################
+##### SELECTING (CORE) #####
+############################
+
+# Read-only fast path: plain Core selects grouped into dicts shaped like
+# serialization_helpers.event_to_dict, with no identity map or ORM hydration.
+
+
+def iter_event_dicts_between(
+    session: Session,
+    range: TimeRange,
+    *,
+    batch_size: int = 500,
+) -> Iterator[dict[str, Any]]:
+    """
+    Stream the events in the range as plain dicts, in timestamp order.
+
+    Each batch of `batch_size` event rows costs one extra select for its
+    metrics and one for its tags.
+    """
+    start, end = get_range_bounds(range)
+    yield from iter_event_dicts_by_date(session, start, end, batch_size=batch_size)
+
+
+def iter_event_dicts_by_date(
+    session: Session,
+    start: date,
+    end: date,
+    *,
+    batch_size: int = 500,
+) -> Iterator[dict[str, Any]]:
+    """
+    `iter_event_dicts_between` for the inclusive local dates start..end.
+    """
+    stmt = (
+        select(event_table)
+        .where(event_table.c.local_date.between(start, end))
+        .order_by(event_table.c.timestamp, event_table.c.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for rows in session.execute(stmt).partitions():
+        yield from event_rows_to_dicts(session, rows)
+
+
+@traced
+def select_event_dicts_between(
+    session: Session,
+    range: TimeRange,
+) -> List[dict[str, Any]]:
+    return list(iter_event_dicts_between(session, range))
+
+
+@traced
+def event_rows_to_dicts(session: Session, rows: Sequence[Any]) -> List[dict]:
+    """
+    Turn `event` rows into dicts and attach their metrics, tags and series.
+    """
+    by_id = {}
+    for r in rows:
+        by_id[r.id] = {
+            "id": r.id,
+            "timestamp": r.timestamp,
+            "type": r.type.value if hasattr(r.type, "value") else str(r.type),
+            "title": r.title,
+            "raw_text": r.raw_text,
+            "notes": r.notes,
+            "created_at": r.created_at,
+            "metrics": [],
+            "tags": [],
+        }
+    if not by_id:
+        return []
+
+    metric_stmt = (
+        select(metric_table)
+        .where(metric_table.c.event_id.in_(by_id))
+        .order_by(metric_table.c.event_id, metric_table.c.id)
+    )
+    for m in session.execute(metric_stmt):
+        by_id[m.event_id]["metrics"].append(
+            {
+                "id": m.id,
+                "event_id": m.event_id,
+                "name": m.name,
+                "value": m.value,
+                "unit": m.unit,
+                "created_at": m.created_at,
+            }
+        )
+
+    tag_stmt = (
+        select(event_tag_table.c.event_id, tag_table)
+        .join(tag_table, tag_table.c.id == event_tag_table.c.tag_id)
+        .where(event_tag_table.c.event_id.in_(by_id))
+        .order_by(event_tag_table.c.event_id, tag_table.c.id)
+    )
+    for t in session.execute(tag_stmt):
+        by_id[t.event_id]["tags"].append(
+            {
+                "id": t.id,
+                "name": t.name,
+                "color": t.color,
+                "created_at": t.created_at,
+            }
+        )
+
+    series_stmt = (
+        select(
+            series_table.c.id,
+            series_table.c.event_id,
+            metric_name_table.c.name,
+            metric_name_table.c.unit,
+            series_table.c.start_time,
+            series_table.c.interval_s,
+            series_table.c.samples,
+        )
+        .join(metric_name_table)
+        .where(series_table.c.event_id.in_(by_id))
+        .order_by(series_table.c.event_id, series_table.c.id)
+    )
+    # only events that have series get the key, so documents for plain
+    # events stay as they were
+    for s in session.execute(series_stmt):
+        by_id[s.event_id].setdefault("series", []).append(
+            {
+                "id": s.id,
+                "event_id": s.event_id,
+                "name": s.name,
+                "unit": s.unit,
+                "start": s.start_time,
+                "interval_s": s.interval_s,
+                "values": unpack_samples(s.samples),
+            }
+        )
+
+    return list(by_id.values())
+
+
+#########################
+##### KEYSET PAGING #####
+#########################
+
+# Pages are keyed on (timestamp, id): each page starts strictly after (or
+# before, descending) the last row of the previous one, so every fetch is
+# an index seek plus `page_size` rows however deep the listing goes. The
+# cursor carries the stored timestamp text, compared as text, so rows that
+# share a timestamp are never skipped or repeated.
+
+
+@dataclass
+class EventPage:
+    events: list[dict[str, Any]]
+    # pass as `after` to fetch the next page; None on the last page
+    next_cursor: str | None
+
+
+def encode_cursor(timestamp_key: str, event_id: int) -> str:
+    raw = f"{timestamp_key}|{event_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp_key, _, event_id = raw.decode("utf-8").rpartition("|")
+        return timestamp_key, int(event_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError(f"invalid page cursor {cursor!r}") from exc
+
+
+@traced
+def select_event_page(
+    session: Session,
+    *,
+    after: str | None = None,
+    page_size: int = 50,
+    descending: bool = False,
+    types: Iterable[EventTypes] = (),
+    tag: str | None = None,
+    metric: str | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> EventPage:
+    """
+    One page of event dicts in (timestamp, id) order, starting after the
+    `after` cursor. Filters: event types, tag name, metric name and an
+    inclusive local date range.
+    """
+    timestamp_key = type_coerce(event_table.c.timestamp, String)
+    key = tuple_(timestamp_key, event_table.c.id)
+    stmt = select(event_table, timestamp_key.label("timestamp_key"))
+
+    types = list(types)
+    if types:
+        stmt = stmt.where(event_table.c.type.in_(types))
+    if tag:
+        stmt = stmt.where(
+            select(event_tag_table.c.event_id)
+            .join(tag_table, tag_table.c.id == event_tag_table.c.tag_id)
+            .where(
+                event_tag_table.c.event_id == event_table.c.id,
+                tag_table.c.name == tag,
+            )
+            .exists()
+        )
+    if metric:
+        stmt = stmt.where(
+            select(metric_table.c.id)
+            .where(
+                metric_table.c.event_id == event_table.c.id,
+                metric_table.c.name == metric,
+            )
+            .exists()
+        )
+    if start:
+        stmt = stmt.where(event_table.c.local_date >= start)
+    if end:
+        stmt = stmt.where(event_table.c.local_date <= end)
+    if after:
+        bound = tuple_(*decode_cursor(after))
+        stmt = stmt.where(key < bound if descending else key > bound)
+
+    if descending:
+        stmt = stmt.order_by(timestamp_key.desc(), event_table.c.id.desc())
+    else:
+        stmt = stmt.order_by(timestamp_key, event_table.c.id)
+    rows = session.execute(stmt.limit(page_size + 1)).all()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1].timestamp_key, rows[-1].id)
+    return EventPage(events=event_rows_to_dicts(session, rows), next_cursor=next_cursor)
+
+
+def iter_event_pages(
+    session: Session, *, after: str | None = None, **filters: Any
+) -> Iterator[EventPage]:
+    """
+    Lazily yield pages (see `select_event_page`) until the last one.
+    """
+    while True:
+        page = select_event_page(session, after=after, **filters)
+        yield page
+        if page.next_cursor is None:
+            return
+        after = page.next_cursor
+
+
 def select_events_today(session: Session) -> List[Event]:
     events_today = select_events_between(session, TimeRange.TODAY)
     return events_today
@@ -157,6 +766,36 @@ def select_events_today(session: Session) -> List[Event]:
 
 def select_events_week(session: Session) -> List[Event]:
     events_week = select_events_between(session, TimeRange.WEEK)
-    print(TimeRange.WEEK.value)
-    print(events_week)
+    note("events_week", count=len(events_week))
     return events_week
+
+
+#################
+##### ASYNC #####
+#################
+
+# asyncio versions for callers that overlap database reads with network
+# I/O. They run the sync implementations on the AsyncSession's connection
+# (AsyncSession.run_sync), so both paths share one code base.
+
+
+async def alog_event(session: "AsyncSession", *args, **kwargs) -> LoggedEvent:
+    return await session.run_sync(log_event, *args, **kwargs)
+
+
+async def alog_events(
+    session: "AsyncSession", records: Iterable[dict[str, Any]]
+) -> list[LoggedEvent]:
+    return await session.run_sync(log_events, list(records))
+
+
+async def aselect_events_between(
+    session: "AsyncSession", range: TimeRange
+) -> List[Event]:
+    return await session.run_sync(select_events_between, range)
+
+
+async def aselect_event_dicts_between(
+    session: "AsyncSession", range: TimeRange
+) -> List[dict]:
+    return await session.run_sync(select_event_dicts_between, range)
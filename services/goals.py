@@ -0,0 +1,150 @@
+import math
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session
+
+from config import today_local
+from instrumentation import traced
+from model import DailyMetricRollup, Goal
+
+GOAL_PERIODS = ("daily", "weekly", "monthly")
+
+
+@dataclass
+class GoalProgress:
+    goal: Goal
+    period_start: date
+    period_end: date
+    progress: float
+    percent: float
+    remaining: float
+    projected_total: float
+    # None when the current pace will not reach the target this period
+    projected_completion: date | None
+
+
+def add_goal(
+    session: Session,
+    *,
+    name: str,
+    metric_name: str,
+    target_value: float,
+    period: str,
+    description: str | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> Goal:
+    if period not in GOAL_PERIODS:
+        raise ValueError(
+            f"Unknown goal period {period!r}; expected one of {', '.join(GOAL_PERIODS)}"
+        )
+    goal = Goal(
+        name=name,
+        metric_name=metric_name,
+        target_value=target_value,
+        period=period,
+        description=description,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    session.add(goal)
+    session.commit()
+    return goal
+
+
+def period_bounds(period: str, today: date) -> tuple[date, date]:
+    if period == "daily":
+        return today, today
+    if period == "weekly":
+        start = today - timedelta(days=today.weekday())
+        return start, start + timedelta(days=6)
+    start = today.replace(day=1)
+    next_month = (start + timedelta(days=32)).replace(day=1)
+    return start, next_month - timedelta(days=1)
+
+
+@traced
+def evaluate_goals(session: Session, today: date | None = None) -> list[GoalProgress]:
+    """
+    Progress of every active goal in its current period, in one grouped query
+    over daily_metric_rollup. Each goal's window is its current period,
+    clipped to its start/end dates and to today.
+    """
+    today = today or today_local()
+    starts = {period: period_bounds(period, today)[0] for period in GOAL_PERIODS}
+
+    period_start = case(
+        (Goal.period == "daily", starts["daily"]),
+        (Goal.period == "weekly", starts["weekly"]),
+        else_=starts["monthly"],
+    )
+    window_start = func.max(period_start, func.coalesce(Goal.start_date, period_start))
+    window_end = func.min(today, func.coalesce(Goal.end_date, today))
+
+    rollup = DailyMetricRollup.__table__.c
+    progress = func.coalesce(func.sum(rollup.sum), 0.0)
+    stmt = (
+        select(Goal, progress)
+        .outerjoin(
+            DailyMetricRollup.__table__,
+            and_(
+                rollup.metric_name == Goal.metric_name,
+                rollup.day >= window_start,
+                rollup.day <= window_end,
+            ),
+        )
+        .where(Goal.is_active)
+        .group_by(Goal.id)
+        .order_by(Goal.id)
+    )
+    return [_progress(goal, total, today) for goal, total in session.execute(stmt)]
+
+
+def add_progress(
+    progress: GoalProgress, day: date, value: float, today: date
+) -> GoalProgress:
+    """
+    `progress` after `value` more of its metric was logged on `day`,
+    computed without a query (live views folding in new events). Values
+    outside the goal's current window leave it unchanged.
+    """
+    goal = progress.goal
+    window_start = max(progress.period_start, goal.start_date or progress.period_start)
+    window_end = min(progress.period_end, goal.end_date or progress.period_end, today)
+    if not window_start <= day <= window_end:
+        return progress
+    return _progress(goal, progress.progress + value, today)
+
+
+def _progress(goal: Goal, total: float, today: date) -> GoalProgress:
+    period_start, period_end = period_bounds(goal.period, today)
+    window_start = max(period_start, goal.start_date or period_start)
+    window_end = min(period_end, goal.end_date or period_end)
+    target = goal.target_value
+
+    # days after an end_date do not dilute the pace
+    elapsed_days = max((min(today, window_end) - window_start).days + 1, 1)
+    window_days = max((window_end - window_start).days + 1, 1)
+    rate = total / elapsed_days
+
+    if total >= target:
+        completion = today
+    elif rate > 0:
+        completion = window_start + timedelta(days=math.ceil(target / rate) - 1)
+        if completion > window_end:
+            completion = None
+    else:
+        completion = None
+
+    return GoalProgress(
+        goal=goal,
+        period_start=period_start,
+        period_end=period_end,
+        progress=total,
+        percent=total / target * 100.0 if target else 100.0,
+        remaining=max(target - total, 0.0),
+        projected_total=rate * window_days,
+        projected_completion=completion,
+    )
@@ -0,0 +1,203 @@
+import hashlib
+from datetime import timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+import config
+import serializers
+from config import get_date
+from instrumentation import traced
+from model import LlmResponse
+
+# Prompts are built from serialization_helpers event JSON (the compact
+# schema_version 2 by default) or another JSON payload. Responses are cached
+# under a hash of the normalized payload, the model and the prompt template,
+# so re-running a range whose events haven't changed returns instantly.
+
+PROMPT_TEMPLATES = {
+    "blog": (
+        "You are writing a short personal blog post from a self-tracking log.\n"
+        "Write it in markdown with a title, a few sections and an honest, "
+        "encouraging tone. Only use facts present in the data.\n\n"
+        "Events (JSON):\n{payload}\n"
+    ),
+    "chunk": (
+        "Summarize this slice of a self-tracking log in 3-6 markdown bullet "
+        "points. Keep every number that matters (minutes, reps, counts) and "
+        "any notable notes. Only use facts present in the data.\n\n"
+        "Events (JSON):\n{payload}\n"
+    ),
+    "reduce": (
+        "You are writing a personal blog post from summaries of consecutive "
+        "periods of a self-tracking log. Write it in markdown with a title, a "
+        "few sections covering trends across the periods and an honest, "
+        "encouraging tone. Only use facts present in the summaries.\n\n"
+        "Period summaries (JSON):\n{payload}\n"
+    ),
+    "analysis": (
+        "Summarize this self-tracking analysis in a few markdown bullet points: "
+        "what went well, what slipped compared to the previous period, and one "
+        "concrete suggestion. Only use facts present in the data.\n\n"
+        "Analysis (JSON):\n{payload}\n"
+    ),
+}
+
+
+def normalize_payload(payload_json: str) -> str:
+    """
+    Canonical form of a JSON payload for hashing and prompting: volatile
+    envelope fields dropped, keys sorted, no whitespace.
+    """
+    data = serializers.loads(payload_json)
+    if isinstance(data, dict):
+        data.pop("generated_at", None)
+    return serializers.dumps(data, sort_keys=True)
+
+
+def cache_key(normalized_payload: str, model: str, template: str) -> str:
+    digest = hashlib.sha256()
+    for part in (model, template, normalized_payload):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@traced
+def generate(prompt: str, *, model: str, host: str = config.ollama_host) -> str:
+    """
+    One non-streaming completion from the ollama HTTP API at `host`.
+    """
+    import httpx
+    import ollama
+
+    client = ollama.Client(host=host, timeout=config.llm_timeout_s)
+    try:
+        return client.generate(model=model, prompt=prompt)["response"]
+    except (ollama.ResponseError, httpx.HTTPError, ConnectionError) as exc:
+        raise RuntimeError(f"LLM request to {host} failed: {exc}") from exc
+
+
+@traced
+async def agenerate(
+    prompt: str, *, model: str, host: str = config.ollama_host
+) -> str:
+    """
+    Async variant of `generate`, for overlapping several requests.
+    """
+    import httpx
+    import ollama
+
+    client = ollama.AsyncClient(host=host, timeout=config.llm_timeout_s)
+    try:
+        return (await client.generate(model=model, prompt=prompt))["response"]
+    except (ollama.ResponseError, httpx.HTTPError, ConnectionError) as exc:
+        raise RuntimeError(f"LLM request to {host} failed: {exc}") from exc
+
+
+def lookup(cache_session: Session, key: str) -> str | None:
+    cached = cache_session.get(LlmResponse, key)
+    if cached is None:
+        return None
+    cached.last_used_at = get_date()
+    return cached.response
+
+
+def store(cache_session: Session, key: str, model: str, response: str) -> None:
+    """
+    Add a response to the cache and evict; the caller commits.
+    """
+    cache_session.merge(
+        LlmResponse(
+            key=key,
+            model=model,
+            response=response,
+            size_bytes=len(response.encode("utf-8")),
+            last_used_at=get_date(),
+        )
+    )
+    cache_session.flush()
+    evict(cache_session)
+
+
+def _prompt_and_key(template_name: str, payload_json: str, model: str):
+    template = PROMPT_TEMPLATES[template_name]
+    normalized = normalize_payload(payload_json)
+    return template.format(payload=normalized), cache_key(normalized, model, template)
+
+
+@traced
+def generate_cached(
+    cache_session: Session,
+    template_name: str,
+    payload_json: str,
+    *,
+    model: str = config.llm_model,
+    host: str = config.ollama_host,
+) -> tuple[str, bool]:
+    """
+    Render `template_name` with the payload and return (markdown, cache_hit).
+    `cache_session` must be bound to db.get_cache_engine().
+    """
+    prompt, key = _prompt_and_key(template_name, payload_json, model)
+    cached = lookup(cache_session, key)
+    if cached is not None:
+        cache_session.commit()
+        return cached, True
+
+    response = generate(prompt, model=model, host=host)
+    store(cache_session, key, model, response)
+    cache_session.commit()
+    return response, False
+
+
+@traced
+async def agenerate_cached(
+    cache_session: Session,
+    template_name: str,
+    payload_json: str,
+    *,
+    model: str = config.llm_model,
+    host: str = config.ollama_host,
+) -> tuple[str, bool]:
+    """
+    Async variant of `generate_cached`. The cache lookups are local and
+    short, so they stay synchronous; only the LLM request is awaited.
+    """
+    prompt, key = _prompt_and_key(template_name, payload_json, model)
+    cached = lookup(cache_session, key)
+    if cached is not None:
+        cache_session.commit()
+        return cached, True
+
+    response = await agenerate(prompt, model=model, host=host)
+    store(cache_session, key, model, response)
+    cache_session.commit()
+    return response, False
+
+
+@traced
+def evict(
+    cache_session: Session,
+    *,
+    max_age_days: int = config.llm_cache_max_age_days,
+    max_bytes: int = config.llm_cache_max_bytes,
+) -> None:
+    """
+    Drop entries older than `max_age_days`, then the least recently used
+    entries beyond `max_bytes` in total.
+    """
+    table = LlmResponse.__table__
+    cutoff = get_date() - timedelta(days=max_age_days)
+    cache_session.execute(delete(table).where(table.c.created_at < cutoff))
+
+    running = (
+        select(
+            table.c.key,
+            func.sum(table.c.size_bytes)
+            .over(order_by=(table.c.last_used_at.desc(), table.c.key))
+            .label("running_bytes"),
+        )
+    ).subquery()
+    over_budget = select(running.c.key).where(running.c.running_bytes > max_bytes)
+    cache_session.execute(delete(table).where(table.c.key.in_(over_budget)))
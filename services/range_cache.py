@@ -0,0 +1,250 @@
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Iterable, Iterator
+
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+import serializers
+from config import TimeRange, get_date, range_cache_max_bytes
+from instrumentation import note, traced
+from model import DayGeneration, Event, RangeCacheDay
+from services import events
+
+# Range reads are cached one local day at a time in the cache database
+# (range_cache_day), as msgpack blobs of the day's event dicts. Every write
+# bumps the generation of the days it touches (day_generation, in the main
+# database, same transaction), and a cached day is reused only while its
+# generation still matches. Past days rarely change, so a year-long read
+# after logging today recomputes one day and unpacks the other 364.
+
+generation_table = DayGeneration.__table__
+cache_table = RangeCacheDay.__table__
+event_table = Event.__table__
+
+# Bump when the cached payload layout changes.
+CACHE_FORMAT = 1
+
+# Datetime fields restored after a msgpack round trip (stored as isoformat).
+_EVENT_DATETIMES = ("timestamp", "created_at")
+
+
+#######################
+##### GENERATIONS #####
+#######################
+
+
+def touch_days(session: Session, days: Iterable[date]) -> None:
+    """
+    Invalidate cached results for `days`; writers call this inside their
+    own transaction.
+    """
+    days = set(days)
+    if not days:
+        return
+    now = time.time_ns() // 1000
+    stmt = sqlite_insert(generation_table).values(
+        [{"day": day, "generation": now} for day in sorted(days)]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day"],
+        set_={
+            "generation": func.max(
+                generation_table.c.generation + 1, stmt.excluded.generation
+            )
+        },
+    )
+    session.execute(stmt)
+
+
+def day_generations(session: Session, start: date, end: date) -> dict[date, int]:
+    stmt = select(generation_table.c.day, generation_table.c.generation).where(
+        generation_table.c.day.between(start, end)
+    )
+    return dict(session.execute(stmt).all())
+
+
+###################
+##### READING #####
+###################
+
+
+def _variant() -> str:
+    from migrations import SCHEMA_VERSION
+
+    return f"event_dicts:schema{SCHEMA_VERSION}:format{CACHE_FORMAT}"
+
+
+def _days(start: date, end: date) -> Iterator[date]:
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+@traced
+def iter_cached_event_dicts_between(
+    session: Session,
+    cache_session: Session,
+    range: TimeRange,
+) -> Iterator[dict[str, Any]]:
+    """
+    Same events, in the same order, as events.iter_event_dicts_between,
+    with every unchanged day served from the cache and only stale or
+    missing days read from `session`. `cache_session` must be bound to
+    db.get_cache_engine(); it is committed before the first event is
+    yielded.
+    """
+    start, end = events.get_range_bounds(range)
+    variant = _variant()
+    # Generations first: a write landing after this read only makes the
+    # stored entry look stale next time, never fresh with old data.
+    generations = day_generations(session, start, end)
+    cached = {
+        day: (generation, payload)
+        for day, generation, payload in cache_session.execute(
+            select(cache_table.c.day, cache_table.c.generation, cache_table.c.payload)
+            .where(cache_table.c.variant == variant)
+            .where(cache_table.c.day.between(start, end))
+        )
+    }
+    stale = [
+        day
+        for day in _days(start, end)
+        if day not in cached or cached[day][0] != generations.get(day, 0)
+    ]
+    n_days = (end - start).days + 1
+    note("range_cache", days=n_days, reused=n_days - len(stale), recomputed=len(stale))
+
+    fresh = _load_days(session, stale) if stale else {}
+    now = get_date()
+    if fresh:
+        store(cache_session, variant, fresh, generations, now)
+    if len(stale) < n_days:
+        cache_session.execute(
+            update(cache_table)
+            .where(cache_table.c.variant == variant)
+            .where(cache_table.c.day.between(start, end))
+            .values(last_used_at=now)
+        )
+    cache_session.commit()
+
+    for day in _days(start, end):
+        if day in fresh:
+            yield from fresh[day]
+        else:
+            yield from _unpack(cached[day][1])
+
+
+def _load_days(session: Session, days: list[date]) -> dict[date, list[dict]]:
+    """
+    Event dicts of `days` from the main database, grouped by local day in
+    timestamp order (every requested day is present, possibly empty).
+    """
+    by_day: dict[date, list[dict]] = {day: [] for day in days}
+    stmt = (
+        select(event_table)
+        .where(event_table.c.local_date.in_(days))
+        .order_by(event_table.c.timestamp, event_table.c.id)
+        .execution_options(yield_per=500)
+    )
+    for rows in session.execute(stmt).partitions():
+        local_dates = {row.id: row.local_date for row in rows}
+        for event in events.event_rows_to_dicts(session, rows):
+            by_day[local_dates[event["id"]]].append(event)
+    return by_day
+
+
+def _unpack(payload: bytes) -> list[dict]:
+    day_events = serializers.unpackb(payload)
+    for event in day_events:
+        for name in _EVENT_DATETIMES:
+            event[name] = datetime.fromisoformat(event[name])
+        for item in event["metrics"] + event["tags"]:
+            item["created_at"] = datetime.fromisoformat(item["created_at"])
+        for series in event.get("series", ()):
+            series["start"] = datetime.fromisoformat(series["start"])
+    return day_events
+
+
+###################
+##### STORING #####
+###################
+
+
+def store(
+    cache_session: Session,
+    variant: str,
+    days: dict[date, list[dict]],
+    generations: dict[date, int],
+    now: datetime,
+) -> None:
+    """
+    Save freshly read days, then evict; the caller commits.
+    """
+    rows = []
+    for day, day_events in days.items():
+        payload = serializers.packb(day_events)
+        rows.append(
+            {
+                "variant": variant,
+                "day": day,
+                "generation": generations.get(day, 0),
+                "payload": payload,
+                "size_bytes": len(payload),
+                "last_used_at": now,
+            }
+        )
+    stmt = sqlite_insert(cache_table)
+    cache_session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["variant", "day"],
+            set_={
+                column: stmt.excluded[column]
+                for column in ("generation", "payload", "size_bytes", "last_used_at")
+            },
+        ),
+        rows,
+    )
+    evict(cache_session)
+
+
+@traced
+def evict(cache_session: Session, *, max_bytes: int = range_cache_max_bytes) -> None:
+    """
+    Drop the least recently used days beyond `max_bytes` in total.
+    """
+    total = cache_session.scalar(select(func.sum(cache_table.c.size_bytes))) or 0
+    if total <= max_bytes:
+        return
+    running = (
+        select(
+            cache_table.c.variant,
+            cache_table.c.day,
+            func.sum(cache_table.c.size_bytes)
+            .over(
+                order_by=(
+                    cache_table.c.last_used_at.desc(),
+                    cache_table.c.variant,
+                    cache_table.c.day.desc(),
+                )
+            )
+            .label("running_bytes"),
+        )
+    ).subquery()
+    over_budget = select(running.c.variant, running.c.day).where(
+        running.c.running_bytes > max_bytes
+    )
+    cache_session.execute(
+        delete(cache_table).where(
+            tuple_(cache_table.c.variant, cache_table.c.day).in_(over_budget)
+        )
+    )
+
+
+def clear(cache_session: Session) -> int:
+    """
+    Drop every cached day; the caller commits. Returns the number dropped.
+    """
+    return cache_session.execute(delete(cache_table)).rowcount
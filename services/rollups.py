@@ -0,0 +1,144 @@
+from datetime import date
+from typing import Iterable
+
+from sqlalchemy import delete, func, literal, select, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from instrumentation import traced
+from model import DailyMetricRollup, Event, EventMetric, EventMetricSeries, MetricName
+
+# daily_metric_rollup holds (day, event_type, metric_name) -> count/sum/min/max,
+# where day is the event's local_date (config.user_timezone), over both
+# single values (event_metric) and sample series (event_metric_series, one
+# sample = one count).
+# Writers call these inside their own transaction so the rollup never drifts
+# from the metric tables; rebuild_rollups recomputes everything from scratch.
+
+rollup_table = DailyMetricRollup.__table__
+event_table = Event.__table__
+metric_table = EventMetric.__table__
+series_table = EventMetricSeries.__table__
+metric_name_table = MetricName.__table__
+
+ROLLUP_COLUMNS = [
+    "day",
+    "event_type",
+    "metric_name",
+    "unit",
+    "count",
+    "sum",
+    "min",
+    "max",
+]
+
+
+def _aggregate_metrics(*, event_ids=None, days=None):
+    """
+    (day, type, metric, unit, count, sum, min, max) rows from both metric
+    stores: one per EventMetric value, and one per EventMetricSeries with
+    its precomputed sample aggregates. Optionally limited to some events or
+    local days.
+    """
+
+    def limit(stmt):
+        if event_ids is not None:
+            stmt = stmt.where(event_table.c.id.in_(event_ids))
+        if days is not None:
+            stmt = stmt.where(event_table.c.local_date.in_(days))
+        return stmt
+
+    values = limit(
+        select(
+            event_table.c.local_date.label("day"),
+            event_table.c.type,
+            metric_table.c.name,
+            metric_table.c.unit,
+            literal(1).label("count"),
+            metric_table.c.value.label("sum"),
+            metric_table.c.value.label("min"),
+            metric_table.c.value.label("max"),
+        ).select_from(metric_table.join(event_table))
+    )
+    series = limit(
+        select(
+            event_table.c.local_date,
+            event_table.c.type,
+            metric_name_table.c.name,
+            metric_name_table.c.unit,
+            series_table.c["count"],
+            series_table.c.sum,
+            series_table.c.min,
+            series_table.c.max,
+        ).select_from(series_table.join(event_table).join(metric_name_table))
+    )
+    rows = union_all(values, series).subquery()
+    return select(
+        rows.c.day,
+        rows.c.type,
+        rows.c.name,
+        func.max(rows.c.unit),
+        func.sum(rows.c["count"]),
+        func.sum(rows.c.sum),
+        func.min(rows.c.min),
+        func.max(rows.c.max),
+    ).group_by(rows.c.day, rows.c.type, rows.c.name)
+
+
+@traced
+def add_events(session: Session, event_ids: Iterable[int]) -> None:
+    """
+    Fold the metrics of newly inserted events into the rollup.
+    The events and their metrics must already be flushed.
+    """
+    event_ids = list(event_ids)
+    if not event_ids:
+        return
+    stmt = sqlite_insert(rollup_table).from_select(
+        ROLLUP_COLUMNS,
+        _aggregate_metrics(event_ids=event_ids),
+    )
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day", "event_type", "metric_name"],
+        set_={
+            "unit": func.coalesce(excluded.unit, rollup_table.c.unit),
+            "count": rollup_table.c["count"] + excluded["count"],
+            "sum": rollup_table.c.sum + excluded.sum,
+            "min": func.min(rollup_table.c.min, excluded.min),
+            "max": func.max(rollup_table.c.max, excluded.max),
+        },
+    )
+    session.execute(stmt)
+
+
+@traced
+def recompute_days(session: Session, days: Iterable[date]) -> None:
+    """
+    Recompute the rollup for whole days, e.g. after events were deleted
+    (min/max cannot be decremented in place).
+    """
+    days = sorted(set(days))
+    if not days:
+        return
+    session.execute(delete(rollup_table).where(rollup_table.c.day.in_(days)))
+    session.execute(
+        rollup_table.insert().from_select(
+            ROLLUP_COLUMNS,
+            _aggregate_metrics(days=days),
+        )
+    )
+
+
+@traced
+def rebuild_rollups(session: Session) -> int:
+    """
+    Recompute the whole rollup table from event_metric and
+    event_metric_series.
+    Returns the number of rollup rows.
+    """
+    session.execute(delete(rollup_table))
+    session.execute(
+        rollup_table.insert().from_select(ROLLUP_COLUMNS, _aggregate_metrics())
+    )
+    return session.scalar(select(func.count()).select_from(rollup_table)) or 0
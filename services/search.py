@@ -0,0 +1,264 @@
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Iterable
+
+from sqlalchemy import Connection, Float, String, bindparam, text
+from sqlalchemy.orm import Session
+
+from config import EventTypes, search_rank_limit
+from instrumentation import traced
+from model import Event
+
+# event_fts is an external-content FTS5 index over event.title, notes and
+# raw_text: it stores only the index, and reads the text back from `event`
+# by rowid (= event.id) for snippets. Triggers keep it in sync with every
+# insert, delete and text update; rebuild_search_index recreates it from
+# scratch. Created by migrations (step 4) from its own frozen copy of
+# SEARCH_DDL; changing the DDL here needs a new migration step too.
+
+FTS_COLUMNS = ("title", "notes", "raw_text")
+# bm25 column weights, in FTS_COLUMNS order: a hit in the title counts most
+BM25_WEIGHTS = (10.0, 4.0, 1.0)
+
+event_table = Event.__table__
+
+SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS event_fts USING fts5(
+        title, notes, raw_text,
+        content='event', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2',
+        prefix='2 3 4'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_fts_ai AFTER INSERT ON event BEGIN
+        INSERT INTO event_fts (rowid, title, notes, raw_text)
+        VALUES (new.id, new.title, new.notes, new.raw_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_fts_ad AFTER DELETE ON event BEGIN
+        INSERT INTO event_fts (event_fts, rowid, title, notes, raw_text)
+        VALUES ('delete', old.id, old.title, old.notes, old.raw_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_fts_au
+    AFTER UPDATE OF title, notes, raw_text ON event BEGIN
+        INSERT INTO event_fts (event_fts, rowid, title, notes, raw_text)
+        VALUES ('delete', old.id, old.title, old.notes, old.raw_text);
+        INSERT INTO event_fts (rowid, title, notes, raw_text)
+        VALUES (new.id, new.title, new.notes, new.raw_text);
+    END
+    """,
+]
+
+
+@dataclass
+class SearchHit:
+    id: int
+    timestamp: datetime
+    local_date: date
+    type: EventTypes
+    title: str | None
+    snippet: str
+    rank: float
+
+
+@dataclass
+class SearchPage:
+    hits: list[SearchHit]
+    page: int
+    page_size: int
+    has_more: bool
+    # False when there were too many matches to rank: most recently added
+    # (highest event id) first instead
+    ranked: bool
+
+
+########################
+##### SEARCH INDEX #####
+########################
+
+
+def create_search_index(conn: Connection) -> None:
+    for ddl in SEARCH_DDL:
+        conn.exec_driver_sql(ddl)
+
+
+@traced
+def rebuild_search_index(session: Session) -> int:
+    """
+    Recreate the index (picking up SEARCH_DDL changes) and re-index every
+    event from the `event` table; the caller commits. Returns the number of
+    indexed events.
+    """
+    conn = session.connection()
+    conn.exec_driver_sql("DROP TABLE IF EXISTS event_fts")
+    create_search_index(conn)
+    conn.exec_driver_sql("INSERT INTO event_fts (event_fts) VALUES ('rebuild')")
+    conn.exec_driver_sql("INSERT INTO event_fts (event_fts) VALUES ('optimize')")
+    return session.scalar(text("SELECT count(*) FROM event")) or 0
+
+
+#####################
+##### SEARCHING #####
+#####################
+
+_TERM = re.compile(r"[\w']+\*?")
+
+
+def to_fts_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query that cannot be a syntax error: every
+    word must match (implicit AND), a trailing `*` keeps a prefix search,
+    and "quoted phrases" stay phrases.
+    """
+    parts = []
+    for phrase, words in re.findall(r'"([^"]*)"|([^"]+)', query):
+        if phrase.strip():
+            terms = _TERM.findall(phrase)
+            parts.append('"' + " ".join(t.rstrip("*") for t in terms) + '"')
+        for term in _TERM.findall(words):
+            prefix = "*" if term.endswith("*") else ""
+            parts.append(f'"{term.rstrip("*")}"{prefix}')
+    return " ".join(parts)
+
+
+@traced
+def search_events(
+    session: Session,
+    query: str,
+    *,
+    types: Iterable[EventTypes] = (),
+    tag: str | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    page: int = 1,
+    page_size: int = 20,
+    raw: bool = False,
+) -> SearchPage:
+    """
+    Events matching `query` with a highlighted snippet, best bm25 rank
+    first. Filters narrow by event type, tag name and inclusive local date
+    range. `raw=True` passes the query to FTS5 unchanged (operators, column
+    filters); invalid FTS5 syntax raises sqlalchemy.exc.OperationalError.
+
+    bm25 has to score every match before the first result, so queries
+    matching more than config.search_rank_limit events come back most
+    recently added first instead (FTS5 walks its rowids backwards and stops
+    at the page), with `ranked=False` on the page. That is event id order,
+    not timestamp order: `ai import` gives old history the highest ids.
+    Sorting by timestamp would mean reading every match first, which is
+    what this fallback avoids.
+    """
+    match = query if raw else to_fts_query(query)
+    if not match:
+        return SearchPage(
+            hits=[], page=page, page_size=page_size, has_more=False, ranked=True
+        )
+
+    matches = session.scalar(
+        text(
+            "SELECT count(*) FROM (SELECT rowid FROM event_fts "
+            "WHERE event_fts MATCH :match LIMIT :cap)"
+        ),
+        {"match": match, "cap": search_rank_limit + 1},
+    )
+    ranked = matches <= search_rank_limit
+
+    filters = ["event_fts MATCH :match"]
+    params: dict = {
+        "match": match,
+        "limit": page_size + 1,
+        "offset": (page - 1) * page_size,
+    }
+    types = [t.name for t in types]  # Enum columns store the member name
+    if types:
+        filters.append("e.type IN :types")
+        params["types"] = types
+    if tag:
+        filters.append(
+            "EXISTS (SELECT 1 FROM event_tag et JOIN tag t ON t.id = et.tag_id "
+            "WHERE et.event_id = e.id AND t.name = :tag)"
+        )
+        params["tag"] = tag
+    if start or end:
+        # Bound the rowids by the ids of the events in the date range (via
+        # the local_date index), so FTS5 skips the rest of its doclists.
+        params["start"] = start or date.min
+        params["end"] = end or date.max
+        filters.append("e.local_date BETWEEN :start AND :end")
+        filters.append(
+            "event_fts.rowid BETWEEN "
+            "(SELECT min(id) FROM event WHERE local_date BETWEEN :start AND :end) "
+            "AND (SELECT max(id) FROM event WHERE local_date BETWEEN :start AND :end)"
+        )
+
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    columns = (
+        "e.id, e.timestamp, e.local_date, e.type, e.title, "
+        "snippet(event_fts, -1, '[', ']', '...', 12) AS snippet"
+    )
+    if ranked:
+        # Rank and page on the index alone, then build snippets for the page
+        # rows only; the CROSS JOINs make SQLite look each of them up by
+        # rowid instead of rescanning the match.
+        sql = f"""
+            WITH hits AS (
+                SELECT event_fts.rowid AS id, bm25(event_fts, {weights}) AS rank
+                FROM event_fts JOIN event e ON e.id = event_fts.rowid
+                WHERE {" AND ".join(filters)}
+                ORDER BY rank, event_fts.rowid DESC
+                LIMIT :limit OFFSET :offset
+            )
+            SELECT {columns}, hits.rank AS rank
+            FROM hits CROSS JOIN event_fts CROSS JOIN event e
+            WHERE event_fts MATCH :match
+              AND event_fts.rowid = hits.id AND e.id = hits.id
+            ORDER BY hits.rank, e.id DESC
+        """
+    else:
+        # No sort: FTS5 walks rowids backwards and stops after the page.
+        sql = f"""
+            SELECT {columns}, bm25(event_fts, {weights}) AS rank
+            FROM event_fts JOIN event e ON e.id = event_fts.rowid
+            WHERE {" AND ".join(filters)}
+            ORDER BY event_fts.rowid DESC
+            LIMIT :limit OFFSET :offset
+        """
+    stmt = text(sql)
+    if types:
+        stmt = stmt.bindparams(bindparam("types", expanding=True))
+    stmt = stmt.columns(
+        event_table.c.id,
+        event_table.c.timestamp,
+        event_table.c.local_date,
+        event_table.c.type,
+        event_table.c.title,
+        snippet=String,
+        rank=Float,
+    )
+
+    rows = session.execute(stmt, params).all()
+    hits = [
+        SearchHit(
+            id=row.id,
+            timestamp=row.timestamp,
+            local_date=row.local_date,
+            type=row.type,
+            title=row.title,
+            snippet=row.snippet,
+            rank=row.rank,
+        )
+        for row in rows[:page_size]
+    ]
+    return SearchPage(
+        hits=hits,
+        page=page,
+        page_size=page_size,
+        has_more=len(rows) > page_size,
+        ranked=ranked,
+    )
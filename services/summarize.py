@@ -0,0 +1,187 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import groupby
+from typing import Any, Iterable
+
+from sqlalchemy.orm import Session
+
+import config
+import serializers
+from instrumentation import traced
+from serialization_helpers import format_events_as_compact_json
+from services import llm
+
+# Map-reduce summarization for ranges too long for one prompt: events are
+# split into day or week chunks, each chunk is summarized (concurrently, at
+# most config.llm_concurrency requests in flight) and the summaries are
+# reduced into the final post. Chunk summaries are memoized in the LLM cache
+# by their content hash, so adding an event to a past week only
+# re-summarizes that week.
+
+GRANULARITIES = ("day", "week")
+
+
+@dataclass
+class Chunk:
+    label: str
+    payload: str  # compact (schema_version 2) JSON for the chunk
+    key: str = ""
+    summary: str | None = None
+
+
+@dataclass
+class SummaryStats:
+    chunks: int
+    cached: int
+    generated: int
+
+
+def chunk_key(day: date, granularity: str) -> str:
+    if granularity == "day":
+        return day.isoformat()
+    monday = day - timedelta(days=day.weekday())
+    return f"week of {monday.isoformat()}"
+
+
+def split_events(
+    event_dicts: Iterable[dict[str, Any]], granularity: str
+) -> list[Chunk]:
+    """
+    Group time-ordered event dicts into one Chunk per day or ISO week.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+
+    def key(e: dict[str, Any]) -> str:
+        return chunk_key(config.to_local(e["timestamp"]).date(), granularity)
+
+    return [
+        Chunk(label=label, payload=format_events_as_compact_json(group, label=label))
+        for label, group in groupby(event_dicts, key=key)
+    ]
+
+
+# Partitions for split_range: whole chunks only, so per-partition results
+# concatenate into exactly what split_events gives for the whole range.
+WEEKS_PER_PARTITION = 4
+
+
+def partition_dates(
+    start: date, end: date, granularity: str
+) -> list[tuple[date, date]]:
+    """
+    Cut the inclusive local dates start..end into calendar months (day
+    chunks) or blocks of WEEKS_PER_PARTITION ISO weeks (week chunks).
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    partitions = []
+    first = start
+    while first <= end:
+        if granularity == "day":
+            following = (first.replace(day=1) + timedelta(days=32)).replace(day=1)
+        else:
+            monday = first - timedelta(days=first.weekday())
+            following = monday + timedelta(weeks=WEEKS_PER_PARTITION)
+        last = min(following - timedelta(days=1), end)
+        partitions.append((first, last))
+        first = last + timedelta(days=1)
+    return partitions
+
+
+def _split_partition(partition: tuple[date, date], granularity: str) -> list[Chunk]:
+    # runs in a pool process, on that process's own read-only engine
+    import db
+    from services import events
+
+    with Session(db.get_read_engine()) as session:
+        return split_events(
+            events.iter_event_dicts_by_date(session, *partition), granularity
+        )
+
+
+@traced
+def split_range(
+    start: date, end: date, granularity: str, *, workers: int
+) -> list[Chunk]:
+    """
+    `split_events` over every event from start to end (local dates), with the
+    reading and compact formatting spread over `workers` processes, one
+    partition (see partition_dates) at a time. Chunks come back in date
+    order whatever order the partitions finish in.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import repeat
+
+    import db
+
+    partitions = partition_dates(start, end, granularity)
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(partitions)), initializer=db.reset_after_fork
+    ) as pool:
+        parts = pool.map(_split_partition, partitions, repeat(granularity))
+        return [chunk for part in parts for chunk in part]
+
+
+@traced
+async def summarize_chunks(
+    cache_session: Session,
+    chunks: list[Chunk],
+    *,
+    label: str,
+    model: str = config.llm_model,
+    host: str = config.ollama_host,
+    concurrency: int = config.llm_concurrency,
+) -> tuple[str, SummaryStats]:
+    """
+    Map every chunk to a (cached) summary, then reduce the summaries into
+    one markdown post. Returns (markdown, stats).
+    """
+    chunk_template = llm.PROMPT_TEMPLATES["chunk"]
+    missing = []
+    for chunk in chunks:
+        normalized = llm.normalize_payload(chunk.payload)
+        chunk.key = llm.cache_key(normalized, model, chunk_template)
+        chunk.summary = llm.lookup(cache_session, chunk.key)
+        if chunk.summary is None:
+            missing.append((chunk, chunk_template.format(payload=normalized)))
+    cache_session.commit()
+
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def summarize(chunk: Chunk, prompt: str) -> None:
+        async with semaphore:
+            chunk.summary = await llm.agenerate(prompt, model=model, host=host)
+        # stored as soon as it arrives, so a failed run keeps its progress
+        llm.store(cache_session, chunk.key, model, chunk.summary)
+
+    try:
+        await asyncio.gather(*(summarize(chunk, prompt) for chunk, prompt in missing))
+    finally:
+        cache_session.commit()
+
+    reduce_payload = serializers.dumps(
+        {
+            "label": label,
+            "periods": [{"period": c.label, "summary": c.summary} for c in chunks],
+        }
+    )
+    stats = SummaryStats(
+        chunks=len(chunks),
+        cached=len(chunks) - len(missing),
+        generated=len(missing),
+    )
+    # The reduce step is cached like any other prompt: unchanged chunk
+    # summaries give an unchanged reduce payload.
+    reduce_template = llm.PROMPT_TEMPLATES["reduce"]
+    normalized = llm.normalize_payload(reduce_payload)
+    reduce_key = llm.cache_key(normalized, model, reduce_template)
+    markdown = llm.lookup(cache_session, reduce_key)
+    if markdown is None:
+        markdown = await llm.agenerate(
+            reduce_template.format(payload=normalized), model=model, host=host
+        )
+        llm.store(cache_session, reduce_key, model, markdown)
+    cache_session.commit()
+    return markdown, stats
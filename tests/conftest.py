@@ -0,0 +1,22 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import migrations
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """
+    A migrated database of the current schema in a temporary file.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'forgelog.sqlite'}")
+    migrations.migrate(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    with Session(engine) as session:
+        yield session
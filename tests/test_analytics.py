@@ -0,0 +1,161 @@
+"""
+NumPy range analytics checked against a plain-Python reference.
+"""
+
+import random
+from datetime import date, datetime, time, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from config import EventTypes, TimeRange, user_timezone
+from services import analytics, events
+
+
+def rolling_reference(daily: list[float], window: int) -> list[float]:
+    return [
+        sum(daily[max(0, day - window + 1) : day + 1]) / window
+        for day in range(len(daily))
+    ]
+
+
+def streaks_reference(active: list[bool]) -> tuple[int, int]:
+    current = longest = 0
+    for is_active in active:
+        current = current + 1 if is_active else 0
+        longest = max(longest, current)
+    return current, longest
+
+
+MATRICES = [
+    [[0.0]],
+    [[3.0]],
+    [[0.0] * 9],
+    [[1.0] * 9],
+    [[2, 0, 0, 0, 0, 0, 0, 0, 5]],  # active only at both edges
+    [[0, 4, 4, 0, 1, 1, 1, 0, 0]],  # gaps at both edges
+    [[1, 1, 0, 1], [0, 0, 0, 0], [0, 1, 1, 1]],
+]
+
+
+@pytest.mark.parametrize("matrix", MATRICES)
+@pytest.mark.parametrize("window", [1, 3, 7])
+def test_rolling_mean(matrix, window):
+    daily = np.array(matrix, dtype=np.float64)
+    result = analytics._rolling_mean(daily, window)
+    expected = [rolling_reference(row, window) for row in matrix]
+    assert np.allclose(result, expected)
+
+
+def test_rolling_mean_random():
+    rng = random.Random(7)
+    matrix = [[rng.choice([0, 0, 1.5, 3]) for _ in range(40)] for _ in range(5)]
+    result = analytics._rolling_mean(np.array(matrix), 7)
+    assert np.allclose(result, [rolling_reference(row, 7) for row in matrix])
+
+
+@pytest.mark.parametrize("matrix", MATRICES)
+def test_streaks(matrix):
+    active = np.array(matrix) > 0
+    current, longest = analytics._streaks(active)
+    expected = [streaks_reference(list(row)) for row in active]
+    assert list(zip(current.tolist(), longest.tolist())) == expected
+
+
+def test_streaks_random():
+    rng = random.Random(11)
+    active = np.array([[rng.random() < 0.6 for _ in range(50)] for _ in range(8)])
+    current, longest = analytics._streaks(active)
+    expected = [streaks_reference(list(row)) for row in active]
+    assert list(zip(current.tolist(), longest.tolist())) == expected
+
+
+def _noon_utc(day: date) -> datetime:
+    local = datetime.combine(day, time(12), tzinfo=user_timezone)
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _log(session, values: dict[str, dict[date, list[float]]]) -> None:
+    records = [
+        {
+            "type": EventTypes.WORKOUT,
+            "timestamp": _noon_utc(day),
+            "metrics": [{"name": name, "value": value, "unit": "reps"}],
+        }
+        for name, by_day in values.items()
+        for day, day_values in by_day.items()
+        for value in day_values
+    ]
+    events.bulk_log_events(session, records)
+
+
+def reference(values: dict[date, list[float]], start: date, end: date) -> dict:
+    n_days = (end - start).days + 1
+    history = max(n_days, analytics.ROLLING_WINDOW_DAYS)
+    days = [start + timedelta(days=i) for i in range(-history, n_days)]
+    daily_all = [sum(values.get(day, [])) for day in days]
+    daily = daily_all[history:]
+    previous = daily_all[history - n_days : history]
+    total, previous_total = sum(daily), sum(previous)
+    current_streak, longest_streak = streaks_reference([v > 0 for v in daily])
+    rolling = rolling_reference(daily_all, analytics.ROLLING_WINDOW_DAYS)[history:]
+    return {
+        "total": total,
+        "count": sum(len(values.get(day, [])) for day in days[history:]),
+        "daily_mean": total / n_days,
+        "previous_total": previous_total,
+        "delta": total - previous_total,
+        "delta_pct": (
+            (total - previous_total) / previous_total * 100 if previous_total else None
+        ),
+        "active_days": sum(v > 0 for v in daily),
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "daily": daily,
+        "weekly": [sum(daily[i : i + 7]) for i in range(0, n_days, 7)],
+        "rolling_mean": [round(v, 3) for v in rolling],
+    }
+
+
+@pytest.mark.parametrize(
+    "time_range", [TimeRange.TODAY, TimeRange.WEEK, TimeRange.MONTH]
+)
+def test_analyze_range_matches_reference(session, time_range):
+    start, end = events.get_range_bounds(time_range)
+    n_days = (end - start).days + 1
+    history = max(n_days, analytics.ROLLING_WINDOW_DAYS)
+    rng = random.Random(int(time_range))
+    values = {
+        # sparse, including both range edges and the day before the range
+        "pushups": {
+            start: [10.0],
+            end: [5.0, 7.0],
+            start - timedelta(days=1): [3.0],
+            start - timedelta(days=history): [1.0],
+            **{
+                start + timedelta(days=rng.randrange(n_days)): [rng.randint(1, 30)]
+                for _ in range(n_days // 3)
+            },
+        },
+        # only logged before the range: reported with a zero total
+        "dips": {start - timedelta(days=1): [4.0]},
+        # outside the loaded history entirely: not reported
+        "squats": {start - timedelta(days=history + 1): [9.0]},
+    }
+    _log(session, values)
+
+    analysis = analytics.analyze_range(session, time_range)
+    assert (analysis.start, analysis.end) == (start, end)
+    by_name = {m.name: m for m in analysis.metrics}
+    assert sorted(by_name) == ["dips", "pushups"]
+    for name, summary in by_name.items():
+        expected = reference(values[name], start, end)
+        for field, value in expected.items():
+            actual = getattr(summary, field)
+            assert actual == pytest.approx(value), (name, field)
+        assert summary.unit == "reps"
+
+
+def test_analyze_empty_range(session):
+    analysis = analytics.analyze_range(session, TimeRange.WEEK)
+    assert analysis.metrics == []
@@ -0,0 +1,99 @@
+"""
+Keyset pagination over (timestamp, id) with select_event_page.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from config import EventTypes
+from services import events
+
+# Timestamps deliberately out of id order, with several ties.
+TIMESTAMPS = [
+    datetime(2024, 5, 2, 9),
+    datetime(2024, 5, 1, 9),
+    datetime(2024, 5, 2, 9),
+    datetime(2024, 5, 1, 9),
+    datetime(2024, 5, 1, 9, 0, 0, 500),
+    datetime(2024, 5, 2, 9),
+    datetime(2024, 5, 1, 8),
+    datetime(2024, 5, 2, 9),
+    datetime(2024, 5, 1, 9),
+    datetime(2024, 5, 3, 7),
+    datetime(2024, 5, 2, 9),
+]
+
+
+@pytest.fixture
+def logged(session):
+    events.bulk_log_events(
+        session,
+        [
+            {
+                "type": EventTypes.GUITAR if i % 2 else EventTypes.NOTE,
+                "timestamp": timestamp,
+                "title": f"event {i}",
+            }
+            for i, timestamp in enumerate(TIMESTAMPS)
+        ],
+    )
+    rows = [(e["timestamp"], e["id"], e["type"]) for e in _all(session)]
+    return session, rows
+
+
+def _all(session, **filters) -> list[dict]:
+    page = events.select_event_page(session, page_size=len(TIMESTAMPS), **filters)
+    assert page.next_cursor is None
+    return page.events
+
+
+def _paged(session, **filters) -> list[int]:
+    ids = []
+    for page in events.iter_event_pages(session, **filters):
+        assert len(page.events) <= filters["page_size"]
+        ids.extend(e["id"] for e in page.events)
+    return ids
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 5])
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_cover_every_event_once(logged, page_size, descending):
+    session, rows = logged
+    expected = [event_id for _, event_id, _ in sorted(rows, reverse=descending)]
+    assert len(expected) == len(TIMESTAMPS)
+
+    ids = _paged(session, page_size=page_size, descending=descending)
+    assert ids == expected
+
+
+def test_pages_with_filter(logged):
+    session, rows = logged
+    expected = [
+        event_id
+        for _, event_id, type in sorted(rows)
+        if type == EventTypes.GUITAR.value
+    ]
+    ids = _paged(session, page_size=2, types=[EventTypes.GUITAR])
+    assert ids == expected
+
+
+def test_cursor_round_trip():
+    cursor = events.encode_cursor("2024-05-01 09:00:00.000000", 42)
+    assert events.decode_cursor(cursor) == ("2024-05-01 09:00:00.000000", 42)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "!!!",  # not base64
+        "_w",  # not UTF-8
+        events.encode_cursor("2024-05-01", 1)[:-2],  # truncated id
+        "bm90LWEtY3Vyc29y",  # "not-a-cursor": no id
+    ],
+)
+def test_malformed_cursor(session, cursor):
+    with pytest.raises(ValueError, match="invalid page cursor"):
+        events.decode_cursor(cursor)
+    with pytest.raises(ValueError, match="invalid page cursor"):
+        events.select_event_page(session, after=cursor)
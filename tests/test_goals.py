@@ -0,0 +1,140 @@
+"""
+Goal progress: windows clipped to start/end dates, metrics summed across
+event types, and add_progress agreeing with a fresh evaluate_goals.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+
+from config import EventTypes, user_timezone
+from services import events, goals
+
+# a Wednesday, so the weekly period (Mon 12th - Sun 18th) has days either side
+TODAY = date(2026, 10, 14)
+WEEK_START = date(2026, 10, 12)
+
+
+def _log(session, event_type: EventTypes, day: date, value: float) -> None:
+    local = datetime.combine(day, time(12), tzinfo=user_timezone)
+    events.bulk_log_events(
+        session,
+        [
+            {
+                "type": event_type,
+                "timestamp": local.astimezone(timezone.utc).replace(tzinfo=None),
+                "metrics": [{"name": "minutes", "value": value, "unit": "min"}],
+            }
+        ],
+    )
+
+
+def _evaluate(session, goal) -> goals.GoalProgress:
+    (progress,) = [
+        p for p in goals.evaluate_goals(session, TODAY) if p.goal.id == goal.id
+    ]
+    return progress
+
+
+@pytest.fixture
+def logged(session):
+    # one metric under several event types, on both sides of the week start
+    _log(session, EventTypes.GUITAR, WEEK_START - timedelta(days=1), 100)
+    _log(session, EventTypes.GUITAR, WEEK_START, 10)
+    _log(session, EventTypes.STUDY, WEEK_START, 20)
+    _log(session, EventTypes.STUDY, WEEK_START + timedelta(days=1), 5)
+    _log(session, EventTypes.WORKOUT, TODAY, 7)
+    return session
+
+
+def test_sums_metric_across_event_types(logged):
+    goal = goals.add_goal(
+        logged, name="practice", metric_name="minutes", target_value=60, period="weekly"
+    )
+    progress = _evaluate(logged, goal)
+    assert (progress.period_start, progress.period_end) == (
+        WEEK_START,
+        WEEK_START + timedelta(days=6),
+    )
+    assert progress.progress == 10 + 20 + 5 + 7
+    assert progress.remaining == 60 - 42
+    assert progress.percent == pytest.approx(70.0)
+    # 42 minutes over 3 elapsed days, projected over the 7-day week
+    assert progress.projected_total == pytest.approx(42 / 3 * 7)
+
+
+def test_future_start_date(logged):
+    goal = goals.add_goal(
+        logged,
+        name="later",
+        metric_name="minutes",
+        target_value=30,
+        period="weekly",
+        start_date=TODAY + timedelta(days=2),
+    )
+    progress = _evaluate(logged, goal)
+    assert progress.progress == 0
+    assert progress.percent == 0
+    assert progress.projected_total == 0
+    assert progress.projected_completion is None
+
+    # nothing logged before the goal starts counts towards it
+    assert goals.add_progress(progress, TODAY, 50, TODAY) is progress
+
+
+def test_end_date_before_today(logged):
+    end = WEEK_START + timedelta(days=1)
+    goal = goals.add_goal(
+        logged,
+        name="ended",
+        metric_name="minutes",
+        target_value=30,
+        period="weekly",
+        end_date=end,
+    )
+    progress = _evaluate(logged, goal)
+    # today's 7 minutes fall after the goal ended
+    assert progress.progress == 10 + 20 + 5
+    assert progress.projected_total == pytest.approx(35)
+    assert progress.projected_completion == TODAY
+
+    assert goals.add_progress(progress, TODAY, 50, TODAY) is progress
+    assert goals.add_progress(progress, end, 5, TODAY).progress == 40
+
+
+def test_end_date_before_period(logged):
+    goal = goals.add_goal(
+        logged,
+        name="last week",
+        metric_name="minutes",
+        target_value=30,
+        period="weekly",
+        end_date=WEEK_START - timedelta(days=1),
+    )
+    progress = _evaluate(logged, goal)
+    assert progress.progress == 0
+    assert progress.projected_total == 0
+    assert progress.projected_completion is None
+    assert goals.add_progress(progress, TODAY, 50, TODAY) is progress
+
+
+@pytest.mark.parametrize(
+    "event_type", [EventTypes.GUITAR, EventTypes.STUDY, EventTypes.WORKOUT]
+)
+def test_add_progress_matches_evaluate(logged, event_type):
+    goal = goals.add_goal(
+        logged,
+        name="practice",
+        metric_name="minutes",
+        target_value=120,
+        period="weekly",
+        start_date=WEEK_START + timedelta(days=1),
+    )
+    before = _evaluate(logged, goal)
+    folded = goals.add_progress(before, TODAY, 15, TODAY)
+
+    _log(logged, event_type, TODAY, 15)
+    after = _evaluate(logged, goal)
+    assert folded.progress == after.progress == 5 + 7 + 15
+    assert folded.projected_total == pytest.approx(after.projected_total)
+    assert folded.projected_completion == after.projected_completion
@@ -0,0 +1,122 @@
+"""
+Exported events re-import unchanged from every import format.
+"""
+
+import csv
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+import migrations
+import serialization_helpers as sh
+import serializers
+from config import EventTypes, TimeRange, get_date
+from model import Event
+from services import events
+
+NOW = get_date().replace(tzinfo=None)
+
+RECORDS = [
+    {
+        "type": EventTypes.WORKOUT,
+        "timestamp": NOW - timedelta(days=5, microseconds=123456),
+        "title": "Long run",
+        "notes": 'windy, "hilly"\nlegs tired',
+        "metrics": [
+            {"name": "distance", "value": 21.1, "unit": "km"},
+            {"name": "pace", "value": 1 / 3, "unit": None},
+        ],
+        "tags": ["outdoor", "race-prep"],
+    },
+    {
+        "type": EventTypes.GUITAR,
+        "timestamp": NOW - timedelta(days=2, hours=3),
+        "title": "Scales – Dorian",
+        "raw_text": "played scales for 45 min",
+        "metrics": [{"name": "minutes", "value": 45.0, "unit": "min"}],
+        "tags": ["outdoor"],
+    },
+    {
+        "type": EventTypes.STUDY,
+        "timestamp": NOW - timedelta(minutes=5),
+        "metrics": [],
+        "tags": [],
+    },
+]
+
+
+def _state(session: Session) -> list[dict]:
+    """Everything an import must reproduce, without ids and created_at."""
+    return [
+        {
+            "timestamp": e.timestamp,
+            "local_date": e.local_date,
+            "type": e.type,
+            "title": e.title,
+            "raw_text": e.raw_text,
+            "notes": e.notes,
+            "metrics": [(m.name, m.value, m.unit) for m in e.metrics],
+            "tags": sorted(et.tag.name for et in e.event_tags),
+        }
+        for e in session.scalars(select(Event).order_by(Event.timestamp))
+    ]
+
+
+def _export(session: Session, path) -> None:
+    """
+    Write the week in `path`'s format: json and msgpack through the export
+    writers, jsonl and csv in the layouts read_event_records documents.
+    """
+    dicts = events.select_event_dicts_between(session, TimeRange.WEEK)
+    if path.suffix == ".json":
+        with path.open("w", encoding="utf-8") as fp:
+            sh.write_events_range_as_json(session, TimeRange.WEEK, fp, label="week")
+    elif path.suffix == ".msgpack":
+        with path.open("wb") as fp:
+            sh.write_events_range_as_msgpack(session, TimeRange.WEEK, fp, label="week")
+    elif path.suffix == ".jsonl":
+        with path.open("w", encoding="utf-8") as fp:
+            for event in dicts:
+                fp.write(serializers.dumps(event) + "\n")
+    else:
+        with path.open("w", encoding="utf-8", newline="") as fp:
+            writer = csv.DictWriter(
+                fp,
+                ["timestamp", "type", "title", "raw_text", "notes", "metrics", "tags"],
+            )
+            writer.writeheader()
+            for event in dicts:
+                writer.writerow(
+                    {
+                        "timestamp": event["timestamp"].isoformat(),
+                        "type": event["type"],
+                        "title": event["title"],
+                        "raw_text": event["raw_text"],
+                        "notes": event["notes"],
+                        "metrics": ";".join(
+                            f"{m['name']}:{m['value']!r}"
+                            + (f":{m['unit']}" if m["unit"] else "")
+                            for m in event["metrics"]
+                        ),
+                        "tags": ";".join(t["name"] for t in event["tags"]),
+                    }
+                )
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl", ".csv", ".msgpack"])
+def test_round_trip(session, tmp_path, suffix):
+    events.bulk_log_events(session, RECORDS)
+    expected = _state(session)
+    assert len(expected) == len(RECORDS)
+
+    path = tmp_path / f"export{suffix}"
+    _export(session, path)
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'imported.sqlite'}")
+    migrations.migrate(engine)
+    with Session(engine) as imported:
+        records = sh.read_event_records(path)
+        assert events.bulk_log_events(imported, records, batch_size=2) == len(RECORDS)
+        assert _state(imported) == expected
@@ -0,0 +1,138 @@
+"""
+Spans recorded by `traced` for plain, coroutine and generator functions.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+
+import instrumentation
+from instrumentation import traced
+
+
+@pytest.fixture
+def trace():
+    trace = instrumentation.start("test")
+    yield trace
+    instrumentation.stop()
+
+
+@pytest.fixture
+def conn():
+    with create_engine("sqlite://").connect() as conn:
+        yield conn
+
+
+def _spans(trace) -> dict[str, dict]:
+    return {row["name"]: row for row in trace.span_rows()}
+
+
+def test_function(trace, conn):
+    @traced
+    def query():
+        return conn.exec_driver_sql("SELECT 1").scalar()
+
+    assert query() == 1
+    span = _spans(trace)["test_instrumentation.query"]
+    assert (span["calls"], span["statements"]) == (1, 1)
+
+
+def test_generator_span_stays_open_until_exhausted(trace, conn):
+    @traced
+    def numbers(n):
+        for i in range(n):
+            yield conn.exec_driver_sql(f"SELECT {i}").scalar()
+        return "done"
+
+    gen = numbers(3)
+    assert next(gen) == 0
+    # the consumer's own statements stay outside the span
+    conn.exec_driver_sql("SELECT 'consumer'").scalar()
+    assert list(gen) == [1, 2]
+
+    span = _spans(trace)["test_instrumentation.numbers"]
+    assert (span["calls"], span["statements"]) == (1, 3)
+    assert [s.span for s in trace.statements] == [
+        "test_instrumentation.numbers",
+        None,
+        "test_instrumentation.numbers",
+        "test_instrumentation.numbers",
+    ]
+
+
+def test_generator_return_send_throw_close(trace):
+    cleaned = []
+
+    @traced
+    def echo():
+        try:
+            received = yield "ready"
+            while True:
+                try:
+                    received = yield received * 2
+                except ValueError:
+                    received = yield "caught"
+        finally:
+            cleaned.append(True)
+
+    gen = echo()
+    assert next(gen) == "ready"
+    assert gen.send(2) == 4
+    assert gen.throw(ValueError) == "caught"
+    gen.close()
+    assert cleaned == [True]
+    assert _spans(trace)["test_instrumentation.echo"]["calls"] == 1
+
+    @traced
+    def returns():
+        yield 1
+        return "value"
+
+    def delegate():
+        result = yield from returns()
+        yield result
+
+    assert list(delegate()) == [1, "value"]
+
+
+def test_generator_untraced():
+    @traced
+    def numbers():
+        yield 1
+        yield 2
+
+    assert not instrumentation.active()
+    assert list(numbers()) == [1, 2]
+
+
+def test_async_generator(trace, conn):
+    @traced
+    async def numbers(n):
+        for i in range(n):
+            await asyncio.sleep(0)
+            yield conn.exec_driver_sql(f"SELECT {i}").scalar()
+
+    async def consume():
+        return [i async for i in numbers(3)]
+
+    assert asyncio.run(consume()) == [0, 1, 2]
+    span = _spans(trace)["test_instrumentation.numbers"]
+    assert (span["calls"], span["statements"]) == (1, 3)
+
+
+def test_async_generator_asend_aclose():
+    @traced
+    async def echo():
+        received = yield "ready"
+        while True:
+            received = yield received + 1
+
+    async def drive():
+        gen = echo()
+        first = await gen.asend(None)
+        second = await gen.asend(41)
+        await gen.aclose()
+        return first, second
+
+    assert asyncio.run(drive()) == ("ready", 42)
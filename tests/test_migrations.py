@@ -0,0 +1,196 @@
+"""
+Upgrading databases created by earlier versions of ForgeLog.
+
+Each fixture schema is the DDL those versions wrote, not the current models,
+so a step that depends on a later schema fails here.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+
+import migrations
+from config import to_local
+from model import DailyMetricRollup
+from services import rollups
+
+# Baseline schema (before migrations existed, user_version 0).
+V0_SCHEMA = [
+    """
+    CREATE TABLE event (
+        id INTEGER NOT NULL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        type VARCHAR(9) NOT NULL,
+        title VARCHAR(100),
+        raw_text TEXT,
+        notes TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE goal (
+        id INTEGER NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        description TEXT,
+        metric_name VARCHAR(50) NOT NULL,
+        period VARCHAR(20) NOT NULL,
+        target_value FLOAT NOT NULL,
+        is_active BOOLEAN DEFAULT '1' NOT NULL,
+        start_date DATE,
+        end_date DATE,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE tag (
+        id INTEGER NOT NULL,
+        name VARCHAR(50) NOT NULL,
+        color VARCHAR(20),
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        PRIMARY KEY (id),
+        UNIQUE (name)
+    )
+    """,
+    """
+    CREATE TABLE event_metric (
+        id INTEGER NOT NULL,
+        event_id INTEGER NOT NULL,
+        name VARCHAR(25) NOT NULL,
+        value FLOAT NOT NULL,
+        unit VARCHAR(10),
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(event_id) REFERENCES event (id)
+    )
+    """,
+    "CREATE INDEX ix_event_metric_event_id ON event_metric (event_id)",
+    """
+    CREATE TABLE event_tag (
+        event_id INTEGER NOT NULL,
+        tag_id INTEGER NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        PRIMARY KEY (event_id, tag_id),
+        FOREIGN KEY(event_id) REFERENCES event (id),
+        FOREIGN KEY(tag_id) REFERENCES tag (id)
+    )
+    """,
+]
+
+# Version 1 (user_version 1) added these indexes.
+V1_SCHEMA = V0_SCHEMA + [
+    "CREATE INDEX ix_event_timestamp ON event (timestamp)",
+    "CREATE INDEX ix_event_type_timestamp ON event (type, timestamp)",
+    "CREATE INDEX ix_event_metric_name_event_id ON event_metric (name, event_id)",
+    "CREATE INDEX ix_event_tag_tag_id ON event_tag (tag_id)",
+]
+
+EVENTS = [
+    (1, "2024-03-01 06:30:00.000000", "WORKOUT", "morning run", "easy pace"),
+    (2, "2024-03-01 23:45:00.000000", "GUITAR", "scales", None),
+    (3, "2024-03-02 12:00:00", "WORKOUT", "pushups", None),
+]
+METRICS = [
+    (1, "distance", 5.2, "km"),
+    (1, "duration", 31.0, "min"),
+    (2, "duration", 20.0, "min"),
+    (3, "pushups", 40.0, None),
+    (3, "pushups", 35.0, None),
+]
+
+
+def _old_database(path, schema: list[str], version: int):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        for ddl in schema:
+            conn.exec_driver_sql(ddl)
+        conn.exec_driver_sql(
+            "INSERT INTO event (id, timestamp, type, title, notes) "
+            "VALUES (?, ?, ?, ?, ?)",
+            EVENTS,
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO event_metric (event_id, name, value, unit) "
+            "VALUES (?, ?, ?, ?)",
+            METRICS,
+        )
+        conn.exec_driver_sql("INSERT INTO tag (id, name) VALUES (1, 'outdoor')")
+        conn.exec_driver_sql("INSERT INTO event_tag (event_id, tag_id) VALUES (1, 1)")
+        conn.exec_driver_sql(f"PRAGMA user_version = {version}")
+    return engine
+
+
+def _rollup_rows(session: Session) -> list[tuple]:
+    return [
+        tuple(row)
+        for row in session.execute(
+            select(
+                DailyMetricRollup.day,
+                DailyMetricRollup.event_type,
+                DailyMetricRollup.metric_name,
+                DailyMetricRollup.unit,
+                DailyMetricRollup.count,
+                DailyMetricRollup.sum,
+                DailyMetricRollup.min,
+                DailyMetricRollup.max,
+            ).order_by(DailyMetricRollup.day, DailyMetricRollup.metric_name)
+        )
+    ]
+
+
+@pytest.mark.parametrize("schema, version", [(V0_SCHEMA, 0), (V1_SCHEMA, 1)])
+def test_migrate_old_database(tmp_path, schema, version):
+    engine = _old_database(tmp_path / "old.sqlite", schema, version)
+
+    assert migrations.migrate(engine) == migrations.SCHEMA_VERSION
+
+    with engine.connect() as conn:
+        assert migrations.get_schema_version(conn) == migrations.SCHEMA_VERSION
+        local_dates = dict(
+            conn.exec_driver_sql("SELECT id, local_date FROM event").all()
+        )
+        assert local_dates == {
+            event_id: to_local(datetime.fromisoformat(ts)).date().isoformat()
+            for event_id, ts, *_ in EVENTS
+        }
+        hits = conn.execute(
+            text("SELECT rowid FROM event_fts WHERE event_fts MATCH 'pace'")
+        ).scalars()
+        assert list(hits) == [1]
+        generations = conn.exec_driver_sql("SELECT day FROM day_generation").all()
+        assert {day for (day,) in generations} == set(local_dates.values())
+    assert migrations.check_query_plans(engine) == []
+
+    # the backfilled rollups are what the current code computes
+    with Session(engine) as session:
+        migrated = _rollup_rows(session)
+        rollups.rebuild_rollups(session)
+        assert _rollup_rows(session) == migrated
+        assert sum(row[4] for row in migrated) == len(METRICS)
+
+    # a second run is a no-op
+    assert migrations.migrate(engine) == migrations.SCHEMA_VERSION
+
+
+def test_migrate_new_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'new.sqlite'}")
+    assert migrations.migrate(engine) == migrations.SCHEMA_VERSION
+    assert migrations.check_query_plans(engine) == []
+
+
+def test_check_query_plans_flags_only_table_scans(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plans.sqlite'}")
+    migrations.migrate(engine)
+    monkeypatch.setattr(
+        migrations,
+        "PLAN_CHECKS",
+        {
+            "covering index scan": ("SELECT name FROM tag ORDER BY name", {}),
+            "index search": ("SELECT * FROM tag WHERE name = :name", {"name": "x"}),
+            "table scan": ("SELECT * FROM tag WHERE color = :c", {"c": "red"}),
+        },
+    )
+    assert migrations.check_query_plans(engine) == ["table scan: SCAN tag"]
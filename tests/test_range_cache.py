@@ -0,0 +1,81 @@
+"""
+Per-day range cache: results match the uncached read, and the cached read
+shows up as a traced span.
+"""
+
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import instrumentation
+import migrations
+from config import EventTypes, TimeRange, get_date
+from model import CacheBase
+from services import events, range_cache
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'main.sqlite'}")
+    migrations.migrate(engine)
+    cache_engine = create_engine(f"sqlite:///{tmp_path / 'cache.sqlite'}")
+    CacheBase.metadata.create_all(cache_engine)
+    with Session(engine) as session, Session(cache_engine) as cache_session:
+        now = get_date().replace(tzinfo=None)
+        events.bulk_log_events(
+            session,
+            [
+                {
+                    "type": EventTypes.WORKOUT,
+                    "timestamp": now - timedelta(days=days, hours=1),
+                    "title": f"run {days}",
+                    "metrics": [{"name": "distance", "value": days, "unit": "km"}],
+                    "tags": ["outdoor"],
+                }
+                for days in range(0, 10, 2)
+            ],
+        )
+        yield session, cache_session
+
+
+def test_matches_uncached_read(sessions):
+    session, cache_session = sessions
+    expected = list(events.iter_event_dicts_between(session, TimeRange.WEEK))
+    assert len(expected) == 4
+    for _ in range(2):
+        cached = range_cache.iter_cached_event_dicts_between(
+            session, cache_session, TimeRange.WEEK
+        )
+        assert list(cached) == expected
+
+
+def test_traced_span(sessions):
+    session, cache_session = sessions
+    name = "range_cache.iter_cached_event_dicts_between"
+    trace = instrumentation.start("test")
+    try:
+        list(
+            range_cache.iter_cached_event_dicts_between(
+                session, cache_session, TimeRange.WEEK
+            )
+        )
+    finally:
+        instrumentation.stop()
+
+    span = {row["name"]: row for row in trace.span_rows()}[name]
+    assert span["calls"] == 1
+    assert span["statements"] > 0
+    assert [(s, n) for s, n, _ in trace.notes] == [(name, "range_cache")]
+
+
+def test_clear(sessions):
+    session, cache_session = sessions
+    list(
+        range_cache.iter_cached_event_dicts_between(
+            session, cache_session, TimeRange.WEEK
+        )
+    )
+    assert range_cache.clear(cache_session) == 7
+    assert range_cache.clear(cache_session) == 0
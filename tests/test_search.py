@@ -0,0 +1,67 @@
+"""
+Full-text search: ranked results and the unranked fallback.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import migrations
+from config import EventTypes
+from services import events, search
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.sqlite'}")
+    migrations.migrate(engine)
+    with Session(engine) as session:
+        # logged first, then older history imported after it
+        events.bulk_log_events(
+            session,
+            [
+                {
+                    "type": EventTypes.NOTE,
+                    "timestamp": datetime(2024, 6, day, 12),
+                    "title": f"scales day {day}",
+                    "notes": "practiced scales" + " scales" * day,
+                }
+                for day in (10, 11)
+            ],
+        )
+        events.bulk_log_events(
+            session,
+            [
+                {
+                    "type": EventTypes.NOTE,
+                    "timestamp": datetime(2020, 1, day, 12),
+                    "title": f"old scales {day}",
+                    "notes": "practiced scales",
+                }
+                for day in (1, 2)
+            ],
+        )
+        yield session
+
+
+def test_ranked(session):
+    page = search.search_events(session, "scales")
+    assert page.ranked
+    assert len(page.hits) == 4
+    assert [h.rank for h in page.hits] == sorted(h.rank for h in page.hits)
+    assert all("[scales]" in h.snippet for h in page.hits)
+
+
+def test_unranked_fallback_is_most_recently_added_first(session, monkeypatch):
+    monkeypatch.setattr(search, "search_rank_limit", 2)
+    page = search.search_events(session, "scales", page_size=3)
+    assert not page.ranked
+    assert page.has_more
+    assert [h.title for h in page.hits] == [
+        "old scales 2",
+        "old scales 1",
+        "scales day 11",
+    ]
+    assert all("[scales]" in h.snippet for h in page.hits)
@@ -0,0 +1,86 @@
+"""
+orjson and stdlib JSON backends of serializers.dumps side by side.
+"""
+
+import json
+import math
+from datetime import date, datetime, timezone
+
+import pytest
+
+import serializers
+from config import EventTypes
+
+pytest.importorskip("orjson")
+
+
+@pytest.fixture
+def stdlib(monkeypatch):
+    monkeypatch.setattr(serializers, "orjson", None)
+
+
+def both(obj, **kwargs) -> tuple[str, str]:
+    fast = serializers.dumps(obj, **kwargs)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(serializers, "orjson", None)
+        slow = serializers.dumps(obj, **kwargs)
+    return fast, slow
+
+
+@pytest.mark.parametrize("indent", [False, True])
+@pytest.mark.parametrize("sort_keys", [False, True])
+def test_same_text(indent, sort_keys):
+    obj = {
+        "b": [1, 2.5, -0.0, 0.1, 5e-324, None, True, "ünï €"],
+        "a": {
+            "at": datetime(2024, 3, 1, 6, 30, tzinfo=timezone.utc),
+            "day": date(2024, 3, 1),
+        },
+        "type": EventTypes.WORKOUT,
+        "counts": {1: "one", 2: "two"},
+    }
+    fast, slow = both(obj, indent=indent, sort_keys=sort_keys)
+    assert fast == slow
+
+
+@pytest.mark.parametrize("value", [1e16, 1e-7, 1.5e300, 1.2345678901234568e17])
+def test_exponent_floats_differ_only_in_spelling(value):
+    fast, slow = both([value])
+    assert slow == json.dumps([value], separators=(",", ":"))
+    assert serializers.loads(fast) == serializers.loads(slow) == [value]
+    assert json.loads(fast) == [value]
+
+
+@pytest.mark.parametrize("value", [2**64, -(2**63) - 1, 10**30])
+def test_big_ints(value):
+    fast, slow = both({"n": value})
+    assert fast == slow == f'{{"n":{value}}}'
+    assert json.loads(fast) == {"n": value}
+
+
+@pytest.mark.parametrize("value", [math.nan, math.inf, -math.inf])
+def test_non_finite_floats_are_null(value):
+    obj = {"x": value, "y": [value, (1.0, value)]}
+    fast, slow = both(obj)
+    assert fast == slow == '{"x":null,"y":[null,[1.0,null]]}'
+    assert serializers.loads(fast) == {"x": None, "y": [None, [1.0, None]]}
+
+
+def test_unserializable_raises(stdlib):
+    with pytest.raises(TypeError):
+        serializers.dumps({"x": object()})
+
+
+def test_unserializable_raises_with_orjson():
+    with pytest.raises(TypeError):
+        serializers.dumps({"x": object()})
+
+
+def test_default_fallback():
+    class Opaque:
+        def __str__(self):
+            return "opaque"
+
+    obj = {"at": date(2024, 3, 1), "x": Opaque()}
+    fast, slow = both(obj, default=str)
+    assert fast == slow == '{"at":"2024-03-01","x":"opaque"}'
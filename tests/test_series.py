@@ -0,0 +1,172 @@
+"""
+Metric sample series: packed float64 blobs round-trip exactly, and the
+rollups kept incrementally over values and series match a full rebuild.
+"""
+
+import math
+import struct
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from config import EventTypes, user_timezone
+from model import DailyMetricRollup, Event
+from services import events, rollups
+
+SAMPLES = [
+    0.0,
+    -0.0,
+    0.1,
+    -1.5,
+    1 / 3,
+    1e308,
+    5e-324,  # smallest subnormal
+    math.inf,
+    -math.inf,
+    math.nan,
+]
+
+
+def _bits(values) -> list[bytes]:
+    return [struct.pack("<d", v) for v in values]
+
+
+def test_pack_samples_is_little_endian_float64():
+    blob = events.pack_samples(SAMPLES)
+    assert blob == struct.pack(f"<{len(SAMPLES)}d", *SAMPLES)
+    assert _bits(events.unpack_samples(blob)) == _bits(SAMPLES)
+    assert events.unpack_samples(events.pack_samples([])) == []
+
+
+def test_series_round_trip(session):
+    start = datetime(2026, 3, 1, 9, 30)
+    values = [v for v in SAMPLES if math.isfinite(v)]
+    logged = events.log_event(
+        session,
+        EventTypes.WORKOUT,
+        metrics=[{"name": "distance", "value": 5.0, "unit": "km"}],
+        timestamp=start,
+        series=[
+            {"name": "heart_rate", "unit": "bpm", "interval_s": 1, "values": values},
+            # no start: begins at the event's timestamp
+            {"name": "cadence", "unit": None, "interval_s": 0.5, "values": [88.0]},
+        ],
+    )
+
+    (event,) = events.event_rows_to_dicts(session, [session.get(Event, logged.id)])
+    heart_rate, cadence = event["series"]
+    assert (heart_rate["name"], heart_rate["unit"]) == ("heart_rate", "bpm")
+    assert _bits(heart_rate["values"]) == _bits(values)
+    assert heart_rate["interval_s"] == 1.0
+    assert (cadence["name"], cadence["unit"], cadence["values"]) == (
+        "cadence",
+        None,
+        [88.0],
+    )
+    assert cadence["start"].replace(tzinfo=None) == start
+
+
+def test_empty_series_is_rejected(session):
+    with pytest.raises(ValueError, match="has no values"):
+        events.log_event(
+            session,
+            EventTypes.WORKOUT,
+            series=[{"name": "heart_rate", "interval_s": 1, "values": []}],
+        )
+
+
+def _rollup_rows(session) -> list[tuple]:
+    return [
+        tuple(row)
+        for row in session.execute(
+            select(
+                DailyMetricRollup.day,
+                DailyMetricRollup.event_type,
+                DailyMetricRollup.metric_name,
+                DailyMetricRollup.unit,
+                DailyMetricRollup.count,
+                DailyMetricRollup.sum,
+                DailyMetricRollup.min,
+                DailyMetricRollup.max,
+            ).order_by(
+                DailyMetricRollup.day,
+                DailyMetricRollup.event_type,
+                DailyMetricRollup.metric_name,
+            )
+        )
+    ]
+
+
+def test_incremental_rollups_match_rebuild(session):
+    # local 10:00, so a few hours later is still the same local day
+    base = (
+        datetime(2026, 3, 1, 10, tzinfo=user_timezone)
+        .astimezone(timezone.utc)
+        .replace(tzinfo=None)
+    )
+    # the same (day, type, metric) fed by plain values and by series, over
+    # several batches, single logs and a delete
+    events.bulk_log_events(
+        session,
+        [
+            {
+                "type": EventTypes.WORKOUT,
+                "timestamp": base + timedelta(days=day, hours=hour),
+                "metrics": [{"name": "heart_rate", "value": 120.0, "unit": "bpm"}],
+                "series": [
+                    {
+                        "name": "heart_rate",
+                        "unit": "bpm",
+                        "interval_s": 1,
+                        "values": [100.0 + day, 150.5, 90.25 - hour],
+                    }
+                ],
+            }
+            for day in range(3)
+            for hour in range(2)
+        ],
+        batch_size=4,
+    )
+    events.log_event(
+        session,
+        EventTypes.WORKOUT,
+        timestamp=base + timedelta(days=1, hours=3),
+        series=[
+            {"name": "heart_rate", "unit": "bpm", "interval_s": 2, "values": [80.0]}
+        ],
+    )
+    events.log_event(
+        session,
+        EventTypes.GUITAR,
+        metrics=[{"name": "minutes", "value": 30.0, "unit": "min"}],
+        timestamp=base + timedelta(days=1),
+        series=[
+            {"name": "tempo", "unit": "bpm", "interval_s": 60, "values": [90.0, 95.0]}
+        ],
+    )
+    extreme = events.log_event(
+        session,
+        EventTypes.WORKOUT,
+        timestamp=base + timedelta(days=2, hours=4),
+        series=[
+            {
+                "name": "heart_rate",
+                "unit": "bpm",
+                "interval_s": 1,
+                "values": [200.0, 40.0],
+            }
+        ],
+    )
+    # min/max of day 2 must be recomputed without the deleted samples
+    assert events.delete_event(session, extreme.id)
+
+    incremental = _rollup_rows(session)
+    by_key = {row[:3]: row for row in incremental}
+    day1 = by_key[(date(2026, 3, 2), EventTypes.WORKOUT, "heart_rate")]
+    # 2 values + 2 series of 3 samples + 1 single-sample series
+    assert day1[4] == 2 + 6 + 1
+    assert (day1[6], day1[7]) == (80.0, 150.5)
+
+    assert rollups.rebuild_rollups(session) == len(incremental)
+    assert _rollup_rows(session) == incremental
@@ -0,0 +1,81 @@
+"""
+Local stand-in for the ollama HTTP API, for exercising the LLM pipeline
+without a model:
+
+    python tools/fake_ollama.py --port 11500 --delay 0.5
+    OLLAMA_HOST=http://127.0.0.1:11500 python main.py blog generate week
+
+Responses are deterministic (they echo a hash and the size of the prompt).
+GET /_stats reports how many generations were served and the peak number
+in flight at once.
+"""
+
+import argparse
+import asyncio
+import hashlib
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+
+def make_app(delay: float) -> web.Application:
+    stats = {"generate": 0, "chat": 0, "in_flight": 0, "max_in_flight": 0}
+
+    async def respond(prompt: str, kind: str) -> str:
+        stats[kind] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            stats["in_flight"] -= 1
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        return f"## Fake summary {digest}\n\nPrompt was {len(prompt)} characters.\n"
+
+    def envelope(model: str) -> dict:
+        return {
+            "model": model,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "done": True,
+            "done_reason": "stop",
+        }
+
+    async def generate(request: web.Request) -> web.Response:
+        body = await request.json()
+        text = await respond(body.get("prompt", ""), "generate")
+        return web.json_response({**envelope(body["model"]), "response": text})
+
+    async def chat(request: web.Request) -> web.Response:
+        body = await request.json()
+        prompt = "\n".join(m.get("content", "") for m in body.get("messages", []))
+        text = await respond(prompt, "chat")
+        return web.json_response(
+            {
+                **envelope(body["model"]),
+                "message": {"role": "assistant", "content": text},
+            }
+        )
+
+    async def tags(_request: web.Request) -> web.Response:
+        return web.json_response({"models": [{"name": "fake", "model": "fake"}]})
+
+    async def get_stats(_request: web.Request) -> web.Response:
+        return web.json_response(stats)
+
+    app = web.Application()
+    app.router.add_post("/api/generate", generate)
+    app.router.add_post("/api/chat", chat)
+    app.router.add_get("/api/tags", tags)
+    app.router.add_get("/_stats", get_stats)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument(
+        "--delay", type=float, default=0.0, help="Seconds per generation."
+    )
+    args = parser.parse_args()
+    web.run_app(make_app(args.delay), host=args.host, port=args.port)